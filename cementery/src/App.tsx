@@ -31,7 +31,7 @@ export default function App() {
   const [reservationOpen, setReservationOpen] = useState(false);
 
   useEffect(() => {
-    fetch('/api/graves')
+    fetch('/api/graves?all=1')
       .then(res => res.json())
       .then(data => {
         // Ensure ID is string
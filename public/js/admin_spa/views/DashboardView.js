@@ -22,9 +22,18 @@ export class DashboardView extends Component {
         this.loadData();
     }
 
+    // Inclusive YYYY-MM-DD bounds of the month shown in the calendar
+    visibleRange() {
+        const pad = (n) => String(n).padStart(2, '0');
+        const month = `${this.state.currentYear}-${pad(this.state.currentMonth + 1)}`;
+        const lastDay = new Date(this.state.currentYear, this.state.currentMonth + 1, 0).getDate();
+        return { from: `${month}-01`, to: `${month}-${pad(lastDay)}` };
+    }
+
     async loadData() {
         try {
-            const data = await API.get('/api/admin/dashboard');
+            const { from, to } = this.visibleRange();
+            const data = await API.get(`/api/admin/dashboard?from=${from}&to=${to}`);
             this.state.stats = data.stats;
             this.state.events = data.events;
             this.state.loading = false;
@@ -243,5 +252,6 @@ export class DashboardView extends Component {
         this.state.currentMonth = newMonth;
         this.state.currentYear = newYear;
         this.refresh();
+        this.loadData();
     }
 }
\ No newline at end of file
@@ -20,7 +20,7 @@ export class GravesView extends Component {
     async loadData() {
         try {
             const [graves, sections] = await Promise.all([
-                API.get('/api/admin/graves'),
+                API.get('/api/admin/graves?all=1'),
                 API.get('/api/sections')
             ]);
             this.state.graves = graves;
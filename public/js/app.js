@@ -101,7 +101,7 @@ function setupContactForm() {
 async function loadData() {
   try {
     const [gravesRes, servicesRes, sectionsRes, articlesRes] = await Promise.all([
-      fetch(`${API_BASE}/api/graves`),
+      fetch(`${API_BASE}/api/graves?all=1`),
       fetch(`${API_BASE}/api/services`),
       fetch(`${API_BASE}/api/sections`),
       fetch(`${API_BASE}/api/articles`)
@@ -221,6 +221,30 @@ function switchTab(tabName) {
   });
 }
 
+let suggestTimer = null;
+
+async function loadSuggestions(term) {
+  const datalist = document.getElementById('search-suggestions');
+  if (!datalist) return;
+  if (term.trim().length < 2) {
+    datalist.innerHTML = '';
+    return;
+  }
+  try {
+    const res = await fetch(`${API_BASE}/api/graves/suggest?q=${encodeURIComponent(term)}&limit=8`);
+    if (!res.ok) return;
+    const data = await res.json();
+    datalist.replaceChildren(...data.suggestions.map(s => {
+      const option = document.createElement('option');
+      option.value = s.term;
+      option.label = `${s.term} (${s.count})`;
+      return option;
+    }));
+  } catch (error) {
+    console.error('Failed to load suggestions', error);
+  }
+}
+
 function setupSearch() {
   searchInput.addEventListener('input', (e) => {
     const term = e.target.value.toLowerCase();
@@ -228,6 +252,9 @@ function setupSearch() {
       grave.name.toLowerCase().includes(term)
     );
     renderGraves(filtered);
+
+    clearTimeout(suggestTimer);
+    suggestTimer = setTimeout(() => loadSuggestions(e.target.value), 150);
   });
 }
 
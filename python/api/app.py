@@ -1,17 +1,41 @@
 import os
 import json
+import base64
+import csv
+import io
+import gzip
+import hashlib
+import math
+import heapq
 import subprocess
 import sys
 import platform
-from datetime import datetime
+import re
+import socket
+import sqlite3
+import struct
+import threading
+import time
+import unicodedata
+import zlib
+from array import array
+from html import escape
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, OrderedDict, namedtuple
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+from functools import wraps
 from typing import Dict, Optional
-from urllib.parse import quote_plus
+from urllib.parse import quote_plus, urlencode, urlsplit
 import mysql.connector
-from flask import Flask, request, jsonify, send_from_directory, Response, stream_with_context
+from flask import Flask, request, jsonify, send_from_directory, redirect, make_response, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import text, inspect
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import text, inspect, or_, and_, event, DDL
+from sqlalchemy.orm import validates
+from sqlalchemy.orm.base import NO_VALUE
+from werkzeug.http import http_date
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.exceptions import HTTPException
 
@@ -122,7 +146,14 @@ def ensure_mysql_database(raw_connection: Optional[str], drop_flag: bool = False
 
 
 def resolve_database_uri():
-    """Detect Azure MySQL settings or fall back to local SQLite for dev/tests."""
+    """Detect Azure MySQL settings or fall back to local SQLite for dev/tests.
+
+    ``DATABASE_URI`` overrides both, so test runs can point the app at a
+    scratch database before it is imported (and seeded).
+    """
+    override = os.getenv("DATABASE_URI")
+    if override:
+        return override
     azure_conn = os.getenv("AZURE_MYSQL_CONNECTIONSTRING")
     mysql_uri = parse_mysql_connection_string(azure_conn)
     if mysql_uri:
@@ -138,6 +169,19 @@ if azure_conn_raw:
 
 app.config["SQLALCHEMY_DATABASE_URI"] = resolve_database_uri()
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# In-process grave search index (serves /api/graves without a DB round-trip)
+app.config["GRAVE_SEARCH_INDEX"] = os.getenv("GRAVE_SEARCH_INDEX") == "1"
+# Content-addressed cache of rendered section map tiles
+app.config["MAP_TILE_DIR"] = os.getenv("MAP_TILE_DIR", os.path.join(basedir, "tile_cache"))
+# Public GET response cache (entries, seconds); size 0 disables it
+app.config["RESPONSE_CACHE_SIZE"] = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+app.config["RESPONSE_CACHE_TTL"] = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+# Where cached responses and table versions live: "local" (one worker), "sqlite[:///<file>]"
+# (workers of one host) or "redis://host:port/db" (any number of hosts). Table versions
+# drive ETags and the in-memory grave indexes, so "local" is only correct for a single
+# worker; with WEB_CONCURRENCY (gunicorn's worker count) above 1 the default is "sqlite".
+app.config["CACHE_BACKEND"] = os.getenv(
+    "CACHE_BACKEND", "sqlite" if int(os.getenv("WEB_CONCURRENCY") or 1) > 1 else "local")
 
 static_root = app.static_folder or ""
 
@@ -192,6 +236,15 @@ def init_db_and_seed():
                         if "scheduled_date" not in columns:
                             print("Migrating: Adding 'scheduled_date' to service_request")
                             conn.execute(text("ALTER TABLE service_request ADD COLUMN scheduled_date VARCHAR(20)"))
+                        if "status_code" not in columns:
+                            print("Migrating: Adding 'status_code' to service_request")
+                            conn.execute(text("ALTER TABLE service_request ADD COLUMN status_code VARCHAR(20)"))
+                            backfill_request_status_codes(conn)
+                        indexes = [i["name"] for i in inspector.get_indexes("service_request")]
+                        if "ix_service_request_status_code" not in indexes:
+                            print("Migrating: Adding index 'ix_service_request_status_code' to service_request")
+                            conn.execute(text("CREATE INDEX ix_service_request_status_code "
+                                              "ON service_request (status_code)"))
 
                     # 2. Section migrations (update_schema_v7.py)
                     if inspector.has_table("section"):
@@ -220,6 +273,75 @@ def init_db_and_seed():
                             print("Migrating: Adding 'is_visible' to service")
                             conn.execute(text("ALTER TABLE service ADD COLUMN is_visible BOOLEAN DEFAULT 1"))
 
+                    # 5. Grave indexes (keyset pagination, name search)
+                    if inspector.has_table("grave"):
+                        columns = [c["name"] for c in inspector.get_columns("grave")]
+                        indexes = [i["name"] for i in inspector.get_indexes("grave")]
+                        if "ix_grave_name_id" not in indexes:
+                            print("Migrating: Adding index 'ix_grave_name_id' to grave")
+                            conn.execute(text("CREATE INDEX ix_grave_name_id ON grave (name, id)"))
+                        if "search_name" not in columns:
+                            print("Migrating: Adding 'search_name' to grave")
+                            conn.execute(text("ALTER TABLE grave ADD COLUMN search_name VARCHAR(100)"))
+                        if "ix_grave_search_name" not in indexes:
+                            print("Migrating: Adding index 'ix_grave_search_name' to grave")
+                            conn.execute(text("CREATE INDEX ix_grave_search_name ON grave (search_name)"))
+                        date_columns = {
+                            "born_on": "DATE", "died_on": "DATE",
+                            "birth_year": "INTEGER", "death_year": "INTEGER"
+                        }
+                        added_dates = False
+                        for column, column_type in date_columns.items():
+                            if column not in columns:
+                                print(f"Migrating: Adding '{column}' to grave")
+                                conn.execute(text(f"ALTER TABLE grave ADD COLUMN {column} {column_type}"))
+                                added_dates = True
+                            if f"ix_grave_{column}" not in indexes:
+                                print(f"Migrating: Adding index 'ix_grave_{column}' to grave")
+                                conn.execute(text(f"CREATE INDEX ix_grave_{column} ON grave ({column})"))
+                        if added_dates:
+                            backfill_grave_dates(conn)
+                        if "search_section" not in columns:
+                            print("Migrating: Adding 'search_section' to grave")
+                            conn.execute(text("ALTER TABLE grave ADD COLUMN search_section VARCHAR(10)"))
+                            backfill_grave_sections(conn)
+                        location = next((i for i in inspector.get_indexes("grave") if i["name"] == "ix_grave_location"), None)
+                        if location and location["column_names"][0] != "search_section":
+                            # Built on the raw section before search_section existed
+                            print("Migrating: Rebuilding index 'ix_grave_location' on search_section")
+                            on_table = " ON grave" if conn.dialect.name == "mysql" else ""
+                            conn.execute(text(f"DROP INDEX ix_grave_location{on_table}"))
+                            location = None
+                        if location is None:
+                            print("Migrating: Adding index 'ix_grave_location' to grave")
+                            conn.execute(text("CREATE INDEX ix_grave_location ON grave (search_section, `row`, plot)"))
+                        if "ix_grave_coords" not in indexes:
+                            print("Migrating: Adding index 'ix_grave_coords' to grave")
+                            conn.execute(text("CREATE INDEX ix_grave_coords ON grave (coord_x, coord_y)"))
+                        backfill_grave_search_names(conn)
+                        ensure_grave_fulltext(conn, inspector)
+                        ensure_grave_spatial_index(conn, inspector)
+
+                    # 6. Typed calendar dates (indexed range queries)
+                    for table in ("service_request", "reservation"):
+                        if not inspector.has_table(table):
+                            continue
+                        columns = [c["name"] for c in inspector.get_columns(table)]
+                        indexes = [i["name"] for i in inspector.get_indexes(table)]
+                        if "scheduled_on" not in columns:
+                            print(f"Migrating: Adding 'scheduled_on' to {table}")
+                            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN scheduled_on DATE"))
+                            backfill_scheduled_dates(conn, table)
+                        if f"ix_{table}_calendar" not in indexes:
+                            print(f"Migrating: Adding index 'ix_{table}_calendar' to {table}")
+                            conn.execute(text(f"CREATE INDEX ix_{table}_calendar ON {table} (scheduled_on, created_at)"))
+                    if inspector.has_table("contact_message"):
+                        indexes = [i["name"] for i in inspector.get_indexes("contact_message")]
+                        if "ix_contact_message_created_at" not in indexes:
+                            print("Migrating: Adding index 'ix_contact_message_created_at' to contact_message")
+                            conn.execute(text("CREATE INDEX ix_contact_message_created_at "
+                                              "ON contact_message (created_at)"))
+
                     conn.commit()
             except Exception as e:
                 print(f"Migration warning: {e}")
@@ -248,6 +370,85 @@ def init_db_and_seed():
 # Note: init_db_and_seed() call moved to the end of file 
 # to ensure all models are defined before db.create_all() runs.
 
+# --- Wyszukiwanie (normalizacja nazwisk) ---
+
+POLISH_FOLD = str.maketrans("ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ")
+
+# FTS5 trigram tokenizer (substring search) needs SQLite >= 3.34
+SQLITE_TRIGRAM = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def sqlite_has_rtree():
+    """R*Tree is a compile-time option of SQLite; probe it once at import."""
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE probe USING rtree(id, x0, x1)")
+        return True
+    except sqlite3.Error:
+        return False
+
+
+SQLITE_RTREE = sqlite_has_rtree()
+
+
+def fold_text(value):
+    """Lowercase and strip diacritics so "Wiśniewski" matches "wisniewski"."""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value.translate(POLISH_FOLD))
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return " ".join(value.lower().split())
+
+
+def section_key(name):
+    """Case-insensitive key for matching Grave.section against Section.name."""
+    return (name or "").strip().lower()
+
+
+GRAVE_DATE_FORMATS = ["%Y-%m-%d", "%d.%m.%Y", "%d-%m-%Y", "%Y/%m/%d", "%d/%m/%Y"]
+YEAR_ONLY = re.compile(r"^\d{4}$")
+
+
+def parse_grave_date(value):
+    """Parse free-form grave date string into (date or None, year or None)."""
+    value = (value or "").strip()
+    if not value:
+        return None, None
+    if YEAR_ONLY.match(value):
+        return None, int(value)
+    for fmt in GRAVE_DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt).date()
+            return parsed, parsed.year
+        except ValueError:
+            continue
+    return None, None
+
+
+# Canonical service request statuses and the spellings clients have sent over time
+REQUEST_STATUS_ALIASES = {
+    "pending": ("pending", "new", "nowe", "oczekujące", "oczekujace"),
+    "in_progress": ("in_progress", "in-progress", "in progress", "w trakcie"),
+    "completed": ("completed", "zakończone", "zakonczone"),
+    "cancelled": ("cancelled", "canceled", "anulowane"),
+}
+REQUEST_STATUS_CODES = {alias: code for code, aliases in REQUEST_STATUS_ALIASES.items() for alias in aliases}
+
+
+def normalize_request_status(value):
+    """Canonical code for a status spelling; unknown values are kept as sent."""
+    raw = (value or "").strip() if isinstance(value, str) else ""
+    if not raw:
+        return "pending"
+    return REQUEST_STATUS_CODES.get(raw.lower(), raw)
+
+
+def parse_scheduled_date(value):
+    """Typed day of a free-form scheduled_date; None unless it is a full date."""
+    if not isinstance(value, str):
+        return None
+    return parse_grave_date(value)[0]
+
+
 class Grave(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -258,6 +459,55 @@ class Grave(db.Model):
     plot = db.Column(db.String(10))
     coord_x = db.Column(db.Integer)
     coord_y = db.Column(db.Integer)
+    search_name = db.Column(db.String(100), index=True)
+    # section_key(section); leads ix_grave_location so section matches ignore case
+    search_section = db.Column(db.String(10))
+    # Parsed copies of birth_date/death_date for indexed range filters
+    born_on = db.Column(db.Date, index=True)
+    died_on = db.Column(db.Date, index=True)
+    birth_year = db.Column(db.Integer, index=True)
+    death_year = db.Column(db.Integer, index=True)
+
+    # API field -> columns needed to serialize it (fields= projection)
+    API_FIELD_COLUMNS = {
+        "birthDate": ("birth_date",),
+        "deathDate": ("death_date",),
+        "coordinates": ("coord_x", "coord_y"),
+        "location": ("coord_x", "coord_y"),
+        "x": ("coord_x",),
+        "y": ("coord_y",),
+        "lat": ("coord_x",),
+        "lng": ("coord_y",),
+    }
+    # profile=compact drops the legacy coordinate aliases
+    COMPACT_FIELDS = ["id", "name", "birthDate", "deathDate", "section", "row", "plot", "x", "y"]
+
+    __table_args__ = (
+        db.Index("ix_grave_name_id", "name", "id"),
+        db.Index("ix_grave_location", "search_section", "row", "plot"),
+        db.Index("ix_grave_coords", "coord_x", "coord_y"),
+    )
+
+    @validates("name")
+    def sync_search_name(self, key, value):
+        # Runs on every assignment (also via constructor), so bulk_save_objects stays in sync
+        self.search_name = fold_text(value)
+        return value
+
+    @validates("section")
+    def sync_search_section(self, key, value):
+        self.search_section = section_key(value) or None
+        return value
+
+    @validates("birth_date")
+    def sync_birth_date(self, key, value):
+        self.born_on, self.birth_year = parse_grave_date(value)
+        return value
+
+    @validates("death_date")
+    def sync_death_date(self, key, value):
+        self.died_on, self.death_year = parse_grave_date(value)
+        return value
 
     def to_dict(self):
         return {
@@ -273,47 +523,274 @@ class Grave(db.Model):
                 "x": self.coord_x if self.coord_x is not None else 0,
                 "y": self.coord_y if self.coord_y is not None else 0
             },
-            "x": self.coord_x if self.coord_x is not None else 0,
-            "y": self.coord_y if self.coord_y is not None else 0
             "x": self.coord_x if self.coord_x is not None else 0, # For image maps
             "y": self.coord_y if self.coord_y is not None else 0, # For image maps
             "lat": self.coord_x if self.coord_x is not None else 0, # For Leaflet/Geo maps (using x as lat)
             "lng": self.coord_y if self.coord_y is not None else 0  # For Leaflet/Geo maps (using y as lng)
         }
 
+GRAVE_FTS_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS grave_fts USING fts5("
+    "search_name, content='grave', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS grave_fts_ai AFTER INSERT ON grave BEGIN "
+    "INSERT INTO grave_fts(rowid, search_name) VALUES (new.id, new.search_name); END",
+    "CREATE TRIGGER IF NOT EXISTS grave_fts_ad AFTER DELETE ON grave BEGIN "
+    "INSERT INTO grave_fts(grave_fts, rowid, search_name) VALUES ('delete', old.id, old.search_name); END",
+    "CREATE TRIGGER IF NOT EXISTS grave_fts_au AFTER UPDATE OF search_name ON grave BEGIN "
+    "INSERT INTO grave_fts(grave_fts, rowid, search_name) VALUES ('delete', old.id, old.search_name); "
+    "INSERT INTO grave_fts(rowid, search_name) VALUES (new.id, new.search_name); END",
+]
+GRAVE_FTS_MYSQL = "ALTER TABLE grave ADD FULLTEXT INDEX ft_grave_search_name (search_name) WITH PARSER ngram"
+
+# Keep the full-text index alongside the table for db.create_all()/drop_all()
+if SQLITE_TRIGRAM:
+    for statement in GRAVE_FTS_SQLITE:
+        event.listen(Grave.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(Grave.__table__, "before_drop", DDL("DROP TABLE IF EXISTS grave_fts").execute_if(dialect="sqlite"))
+event.listen(Grave.__table__, "after_create", DDL(GRAVE_FTS_MYSQL).execute_if(dialect="mysql"))
+
+# Spatial index for viewport queries; graves without coordinates are not indexed
+GRAVE_RTREE_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS grave_rtree USING rtree(id, min_x, max_x, min_y, max_y)",
+    "CREATE TRIGGER IF NOT EXISTS grave_rtree_ai AFTER INSERT ON grave "
+    "WHEN new.coord_x IS NOT NULL AND new.coord_y IS NOT NULL BEGIN "
+    "INSERT INTO grave_rtree VALUES (new.id, new.coord_x, new.coord_x, new.coord_y, new.coord_y); END",
+    "CREATE TRIGGER IF NOT EXISTS grave_rtree_ad AFTER DELETE ON grave BEGIN "
+    "DELETE FROM grave_rtree WHERE id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS grave_rtree_au AFTER UPDATE OF coord_x, coord_y ON grave BEGIN "
+    "DELETE FROM grave_rtree WHERE id = old.id; "
+    "INSERT INTO grave_rtree SELECT new.id, new.coord_x, new.coord_x, new.coord_y, new.coord_y "
+    "WHERE new.coord_x IS NOT NULL AND new.coord_y IS NOT NULL; END",
+]
+GRAVE_RTREE_BACKFILL = (
+    "INSERT INTO grave_rtree SELECT id, coord_x, coord_x, coord_y, coord_y FROM grave "
+    "WHERE coord_x IS NOT NULL AND coord_y IS NOT NULL"
+)
+grave_rtree = db.table("grave_rtree", db.column("id"), db.column("min_x"), db.column("max_x"),
+                       db.column("min_y"), db.column("max_y"))
+# MySQL: a stored POINT kept by the server itself (a SPATIAL index needs NOT NULL, so
+# graves without coordinates sit at 0,0 and are trimmed by the exact comparison)
+GRAVE_SPATIAL_MYSQL = (
+    "ALTER TABLE grave ADD COLUMN coord_point POINT "
+    "GENERATED ALWAYS AS (POINT(IFNULL(coord_x, 0), IFNULL(coord_y, 0))) STORED NOT NULL SRID 0, "
+    "ADD SPATIAL INDEX sp_grave_coords (coord_point)"
+)
+grave_point = db.literal_column("grave.coord_point")
+
+if SQLITE_RTREE:
+    for statement in GRAVE_RTREE_SQLITE:
+        event.listen(Grave.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(Grave.__table__, "before_drop", DDL("DROP TABLE IF EXISTS grave_rtree").execute_if(dialect="sqlite"))
+event.listen(Grave.__table__, "after_create", DDL(GRAVE_SPATIAL_MYSQL).execute_if(dialect="mysql"))
+
+
+def backfill_grave_search_names(conn, batch_size=1000):
+    """Fill search_name for rows created before the column existed."""
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, name FROM grave WHERE search_name IS NULL LIMIT :limit"
+        ), {"limit": batch_size}).fetchall()
+        if not rows:
+            break
+        print(f"Migrating: Backfilling 'search_name' for {len(rows)} graves")
+        conn.execute(
+            text("UPDATE grave SET search_name = :search_name WHERE id = :id"),
+            [{"id": r.id, "search_name": fold_text(r.name)} for r in rows]
+        )
+
+
+def backfill_grave_sections(conn, batch_size=1000):
+    """Fill search_section for rows created before the column existed."""
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, section FROM grave WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": batch_size}).fetchall()
+        if not rows:
+            break
+        print(f"Migrating: Backfilling 'search_section' for {len(rows)} graves")
+        conn.execute(text("UPDATE grave SET search_section = :search_section WHERE id = :id"),
+                     [{"id": r.id, "search_section": section_key(r.section) or None} for r in rows])
+        last_id = rows[-1].id
+
+
+def backfill_grave_dates(conn, batch_size=1000):
+    """Parse birth_date/death_date strings into the typed date/year columns."""
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, birth_date, death_date FROM grave WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": batch_size}).fetchall()
+        if not rows:
+            break
+        print(f"Migrating: Backfilling parsed dates for {len(rows)} graves")
+        params = []
+        for r in rows:
+            born_on, birth_year = parse_grave_date(r.birth_date)
+            died_on, death_year = parse_grave_date(r.death_date)
+            params.append({
+                "id": r.id,
+                "born_on": born_on.isoformat() if born_on else None,
+                "died_on": died_on.isoformat() if died_on else None,
+                "birth_year": birth_year,
+                "death_year": death_year
+            })
+        conn.execute(text(
+            "UPDATE grave SET born_on = :born_on, died_on = :died_on, "
+            "birth_year = :birth_year, death_year = :death_year WHERE id = :id"
+        ), params)
+        last_id = rows[-1].id
+
+
+def backfill_request_status_codes(conn, batch_size=1000):
+    """Normalise service_request.status into status_code, one executemany per id batch.
+
+    Done in Python rather than per DISTINCT status: a case-insensitive collation
+    (MySQL) would fold spellings that differ only in case into one group.
+    """
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, status FROM service_request WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": batch_size}).fetchall()
+        if not rows:
+            break
+        print(f"Migrating: Normalising status of {len(rows)} service_request rows")
+        conn.execute(text("UPDATE service_request SET status_code = :code WHERE id = :id"),
+                     [{"id": r.id, "code": normalize_request_status(r.status)} for r in rows])
+        last_id = rows[-1].id
+
+
+def backfill_scheduled_dates(conn, table, batch_size=1000):
+    """Parse scheduled_date strings of `table` into the typed scheduled_on column."""
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            f"SELECT id, scheduled_date FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": batch_size}).fetchall()
+        if not rows:
+            break
+        params = [{"id": r.id, "scheduled_on": scheduled_on.isoformat()}
+                  for r in rows if (scheduled_on := parse_scheduled_date(r.scheduled_date))]
+        if params:
+            print(f"Migrating: Backfilling scheduled dates for {len(params)} rows of {table}")
+            conn.execute(text(f"UPDATE {table} SET scheduled_on = :scheduled_on WHERE id = :id"), params)
+        last_id = rows[-1].id
+
+
+def ensure_grave_fulltext(conn, inspector):
+    """Create the dialect-specific full-text index on grave.search_name if missing."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite" and SQLITE_TRIGRAM:
+        if not inspector.has_table("grave_fts"):
+            print("Migrating: Creating FTS5 index 'grave_fts'")
+            for statement in GRAVE_FTS_SQLITE:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO grave_fts(grave_fts) VALUES ('rebuild')"))
+    elif dialect == "mysql":
+        indexes = [i["name"] for i in inspector.get_indexes("grave")]
+        if "ft_grave_search_name" not in indexes:
+            print("Migrating: Adding FULLTEXT index 'ft_grave_search_name' to grave")
+            conn.execute(text(GRAVE_FTS_MYSQL))
+
+
+def ensure_grave_spatial_index(conn, inspector):
+    """Create the dialect-specific spatial index over grave coordinates if missing.
+
+    SQLite gets the R*Tree (filled from the table), MySQL the generated
+    coord_point column with its SPATIAL index (filled by the ALTER itself).
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite" and SQLITE_RTREE:
+        if not inspector.has_table("grave_rtree"):
+            print("Migrating: Creating R*Tree index 'grave_rtree'")
+            for statement in GRAVE_RTREE_SQLITE:
+                conn.execute(text(statement))
+            conn.execute(text(GRAVE_RTREE_BACKFILL))
+    elif dialect == "mysql":
+        columns = [c["name"] for c in inspector.get_columns("grave")]
+        if "coord_point" not in columns:
+            print("Migrating: Adding 'coord_point' with SPATIAL index 'sp_grave_coords' to grave")
+            conn.execute(text(GRAVE_SPATIAL_MYSQL))
+
+
+def filter_grave_name(query, term):
+    """Diacritic-insensitive substring filter on Grave.search_name.
+
+    Uses FTS5 (trigram) on SQLite and FULLTEXT (ngram) on MySQL; terms shorter
+    than the tokenizer's gram size fall back to LIKE on the folded column.
+    """
+    folded = fold_text(term)
+    if not folded:
+        return query
+    phrase = '"' + folded.replace('"', '""') + '"'
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite" and SQLITE_TRIGRAM and len(folded) >= 3:
+        return query.filter(text(
+            "grave.id IN (SELECT rowid FROM grave_fts WHERE grave_fts MATCH :name_match)"
+        )).params(name_match=phrase)
+    if dialect == "mysql" and len(folded) >= 2:
+        return query.filter(text(
+            "MATCH (grave.search_name) AGAINST (:name_match IN BOOLEAN MODE)"
+        )).params(name_match=phrase)
+    return query.filter(Grave.search_name.contains(folded, autoescape=True))
+
+
 class ServiceRequest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     grave_id = db.Column(db.Integer, db.ForeignKey("grave.id"), nullable=False)
     service_type = db.Column(db.String(50), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default="pending")
+    # normalize_request_status(status); filters and counts use this indexed copy
+    status_code = db.Column(db.String(20), default="pending", index=True)
     customer_name = db.Column(db.String(100))
     email = db.Column(db.String(100))
     phone = db.Column(db.String(20))
     notes = db.Column(db.Text)
     scheduled_date = db.Column(db.String(20))
+    # Parsed copy of scheduled_date; with created_at it orders the calendar index
+    scheduled_on = db.Column(db.Date)
     services = db.Column(db.Text)
     total_cost = db.Column(db.Float)
     discount = db.Column(db.Float)
     admin_notes = db.Column(db.Text)
 
-    def to_dict(self):
-        raw_status = (self.status or "pending").lower()
-        if raw_status in ["oczekujące", "oczekujace"]:
-            status_value = "pending"
-        elif raw_status in ["w trakcie", "in-progress", "in progress"]:
-            status_value = "in_progress"
-        elif raw_status in ["zakończone", "zakonczone"]:
-            status_value = "completed"
-        else:
-            status_value = self.status or "pending"
+    API_FIELD_COLUMNS = {
+        "graveId": ("grave_id",),
+        "serviceType": ("service_type",),
+        "date": ("created_at",),
+        "contactName": ("customer_name",),
+        "contactEmail": ("email",),
+        "contactPhone": ("phone",),
+    }
+    # Column -> (source column, derivation) for writes that bypass the validators
+    DERIVED_FROM = {
+        "scheduled_on": ("scheduled_date", parse_scheduled_date),
+        "status_code": ("status", normalize_request_status),
+    }
+
+    __table_args__ = (
+        db.Index("ix_service_request_calendar", "scheduled_on", "created_at"),
+    )
+
+    @validates("scheduled_date")
+    def sync_scheduled_on(self, key, value):
+        self.scheduled_on = parse_scheduled_date(value)
+        return value
 
+    @validates("status")
+    def sync_status_code(self, key, value):
+        self.status_code = normalize_request_status(value)
+        return value
+
+    def to_dict(self):
         return {
             "id": self.id,
             "graveId": self.grave_id,
             "serviceType": self.service_type,
             "date": self.created_at.strftime("%Y-%m-%d") if self.created_at else "",
-            "status": status_value,
+            "status": self.status_code or normalize_request_status(self.status),
             "contactName": self.customer_name,
             "contactEmail": self.email,
             "contactPhone": self.phone,
@@ -337,8 +814,20 @@ class Reservation(db.Model):
     admin_notes = db.Column(db.Text)
     status = db.Column(db.String(20), default="Nowa")
     scheduled_date = db.Column(db.String(20))
+    scheduled_on = db.Column(db.Date)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    DERIVED_FROM = {"scheduled_on": ("scheduled_date", parse_scheduled_date)}
+
+    __table_args__ = (
+        db.Index("ix_reservation_calendar", "scheduled_on", "created_at"),
+    )
+
+    @validates("scheduled_date")
+    def sync_scheduled_on(self, key, value):
+        self.scheduled_on = parse_scheduled_date(value)
+        return value
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -362,6 +851,11 @@ class Section(db.Model):
     total_rows = db.Column(db.Integer)
     total_cols = db.Column(db.Integer)
 
+    API_FIELD_COLUMNS = {
+        "rows": ("total_rows",),
+        "cols": ("total_cols",),
+    }
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -381,6 +875,11 @@ class Article(db.Model):
     read_time = db.Column(db.String(20))
     is_visible = db.Column(db.Boolean, default=True)
 
+    API_FIELD_COLUMNS = {
+        "readTime": ("read_time",),
+        "isVisible": ("is_visible",),
+    }
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -399,10 +898,13 @@ class Service(db.Model):
     slug = db.Column(db.String(100))
     price = db.Column(db.Float)
     category = db.Column(db.String(50))
-    type = db.Column(db.String(20), default="basic")
     type = db.Column(db.String(20), default="main")
     is_visible = db.Column(db.Boolean, default=True)
 
+    API_FIELD_COLUMNS = {
+        "isVisible": ("is_visible",),
+    }
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -410,7 +912,6 @@ class Service(db.Model):
             "slug": self.slug,
             "price": self.price,
             "category": self.category,
-            "type": self.type or "basic"
             "type": self.type or "main",
             "isVisible": self.is_visible
         }
@@ -423,7 +924,7 @@ class ContactMessage(db.Model):
     message = db.Column(db.Text)
     status = db.Column(db.String(20), default="Nowa")
     admin_notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     def to_dict(self):
         return {
@@ -461,6 +962,2076 @@ class Category(db.Model):
             "name": self.name
         }
 
+class DashboardCounter(db.Model):
+    """Row counts shown on the dashboard, kept in step with writes (see DASHBOARD_COUNTERS)."""
+    name = db.Column(db.String(30), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+# --- Indeksy grobów w pamięci ---
+
+# Immutable copy of a grave row, taken at flush time (ORM objects expire on commit)
+GraveSnapshot = namedtuple("GraveSnapshot", [
+    "id", "name", "search_name", "section", "row", "plot",
+    "coord_x", "coord_y", "death_year", "doc"
+])
+
+
+def grave_snapshot(grave):
+    return GraveSnapshot(
+        grave.id, grave.name, grave.search_name or fold_text(grave.name),
+        grave.section, grave.row, grave.plot, grave.coord_x, grave.coord_y,
+        grave.death_year, grave.to_dict()
+    )
+
+
+def deep_sizeof(obj):
+    """Approximate memory footprint of nested containers (bytes)."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+# Every structure registered here is rebuilt at startup and fed grave writes
+grave_indexes = []
+
+
+def register_grave_index(index):
+    grave_indexes.append(index)
+    return index
+
+
+def rebuild_grave_indexes(indexes=None):
+    """Full rebuild; used at startup and after bulk writes that bypass the session."""
+    active = [index for index in (indexes or grave_indexes) if index.enabled]
+    snapshots = None
+    for index in active:
+        # Caches that only need to be dropped don't pay for a full snapshot
+        if getattr(index, "invalidate_only", False):
+            index.rebuild(None)
+            continue
+        if snapshots is None:
+            snapshots = [grave_snapshot(g) for g in Grave.query.order_by(Grave.id).yield_per(1000)]
+        index.rebuild(snapshots)
+
+
+grave_rebuild_lock = threading.Lock()
+
+
+def rebuild_stale_grave_indexes():
+    """Rebuild every enabled index that isn't ready, all from one snapshot."""
+    with grave_rebuild_lock:
+        stale = [index for index in grave_indexes if index.enabled and not getattr(index, "ready", True)]
+        if stale:
+            rebuild_grave_indexes(stale)
+
+
+def mark_grave_indexes_stale():
+    """Changes this process can't replay: leave every index to rebuild_stale_grave_indexes."""
+    for index in grave_indexes:
+        if not index.enabled:
+            continue
+        if getattr(index, "invalidate_only", False):
+            index.rebuild(None)
+        else:
+            with index.lock:
+                index.ready = False
+
+
+@event.listens_for(db.session, "after_flush")
+def collect_grave_changes(session, flush_context):
+    if not any(index.enabled for index in grave_indexes):
+        return
+    changes = session.info.setdefault("grave_changes", {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Grave):
+            changes[obj.id] = grave_snapshot(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Grave):
+            changes[obj.id] = None
+
+
+@event.listens_for(db.session, "after_commit")
+def apply_grave_changes(session):
+    changes = session.info.pop("grave_changes", None)
+    if not changes:
+        return
+    for index in grave_indexes:
+        if index.enabled:
+            index.apply(changes)
+
+
+@event.listens_for(db.session, "after_rollback")
+def discard_grave_changes(session):
+    session.info.pop("grave_changes", None)
+
+
+class GraveSearchIndex:
+    """Inverted index over folded names (trigrams), sections and death years.
+
+    Matches the semantics of the SQL filters in get_graves: substring on the
+    folded name, case-insensitive section, exact death year.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.ready = False
+        self.lock = threading.RLock()
+        self.docs = {}
+        self.trigrams = {}
+        self.sections = {}
+        self.years = {}
+        self.build_seconds = 0.0
+        self.built_at = None
+
+    @staticmethod
+    def grams(value):
+        return {value[i:i + 3] for i in range(len(value) - 2)}
+
+    def _add(self, snap):
+        self.docs[snap.id] = snap
+        for gram in self.grams(snap.search_name or ""):
+            self.trigrams.setdefault(gram, set()).add(snap.id)
+        if section_key(snap.section):
+            self.sections.setdefault(section_key(snap.section), set()).add(snap.id)
+        if snap.death_year is not None:
+            self.years.setdefault(snap.death_year, set()).add(snap.id)
+
+    def _remove(self, grave_id):
+        snap = self.docs.pop(grave_id, None)
+        if snap is None:
+            return
+        postings = [(self.trigrams, gram) for gram in self.grams(snap.search_name or "")]
+        if section_key(snap.section):
+            postings.append((self.sections, section_key(snap.section)))
+        if snap.death_year is not None:
+            postings.append((self.years, snap.death_year))
+        for table, key in postings:
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(grave_id)
+                if not ids:
+                    del table[key]
+
+    def rebuild(self, snapshots):
+        start = time.perf_counter()
+        with self.lock:
+            self.docs, self.trigrams, self.sections, self.years = {}, {}, {}, {}
+            for snap in snapshots:
+                self._add(snap)
+            self.ready = True
+            self.build_seconds = time.perf_counter() - start
+            self.built_at = datetime.utcnow()
+
+    def apply(self, changes):
+        with self.lock:
+            for grave_id, snap in changes.items():
+                self._remove(grave_id)
+                if snap is not None:
+                    self._add(snap)
+
+    def ensure_ready(self):
+        """Rebuild after the index was marked stale (see mark_grave_indexes_stale)."""
+        if self.enabled and not self.ready:
+            rebuild_stale_grave_indexes()
+        return self.ready
+
+    def search(self, name=None, section=None, year=None):
+        """Return matching snapshots (unordered)."""
+        with self.lock:
+            candidates = None
+            folded = fold_text(name) if name else ""
+            filters = []
+            if section:
+                filters.append(self.sections.get(section_key(section), set()))
+            if year is not None:
+                filters.append(self.years.get(year, set()))
+            if len(folded) >= 3:
+                filters.extend(self.trigrams.get(gram, set()) for gram in self.grams(folded))
+            for ids in sorted(filters, key=len):
+                candidates = set(ids) if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+            snaps = self.docs.values() if candidates is None else [self.docs[i] for i in candidates]
+            if folded:
+                snaps = [snap for snap in snaps if folded in (snap.search_name or "")]
+            return list(snaps)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "ready": self.ready,
+                "documents": len(self.docs),
+                "terms": len(self.trigrams) + len(self.sections) + len(self.years),
+                "memory_bytes": deep_sizeof([self.docs, self.trigrams, self.sections, self.years]),
+                "build_seconds": round(self.build_seconds, 4),
+                "built_at": self.built_at.strftime("%Y-%m-%d %H:%M:%S") if self.built_at else None
+            }
+
+
+grave_search_index = register_grave_index(GraveSearchIndex(enabled=app.config["GRAVE_SEARCH_INDEX"]))
+
+
+NAME_TOKEN_SPLIT = re.compile(r"[\s\-]+")
+PHONETIC_RULES = [
+    ("sky", "ski"), ("rz", "z"), ("sz", "s"), ("cz", "c"), ("ch", "h"),
+    ("ck", "k"), ("ph", "f"), ("qu", "kw"), ("q", "k"), ("x", "ks"),
+    ("w", "v"), ("y", "i"),
+]
+
+
+def name_tokens(name):
+    """Split a name into (folded, original) token pairs."""
+    pairs = []
+    for raw in NAME_TOKEN_SPLIT.split(name or ""):
+        folded = fold_text(raw)
+        if folded:
+            pairs.append((folded, raw))
+    return pairs
+
+
+def phonetic_key(token):
+    """Coarse sound-alike key for common Polish/English spelling swaps (Kowalsky ~ Kowalski)."""
+    for src, dst in PHONETIC_RULES:
+        token = token.replace(src, dst)
+    collapsed = []
+    for ch in token:
+        if not collapsed or collapsed[-1] != ch:
+            collapsed.append(ch)
+    return "".join(collapsed)
+
+
+def bounded_levenshtein(a, b, max_distance):
+    """Levenshtein distance, or max_distance + 1 once the bound is exceeded.
+
+    Only the diagonal band |i - j| <= max_distance is computed.
+    """
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+    previous = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        ca = a[i - 1]
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            value = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            current[j] = value if value < too_far else too_far
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return too_far
+        previous = current
+    return previous[-1]
+
+
+class LazyGraveIndex:
+    """Grave index that is built on first use and then follows grave writes."""
+
+    def __init__(self):
+        self.enabled = False
+        self.ready = False
+        self.lock = threading.RLock()
+
+    def ensure_ready(self):
+        if not self.ready:
+            self.enabled = True
+            # Any other stale index is rebuilt along, from the same snapshot
+            rebuild_stale_grave_indexes()
+
+
+class GraveFuzzyIndex(LazyGraveIndex):
+    """Name-token vocabulary for "did you mean" suggestions.
+
+    Candidates come from padded trigrams (prefix-filtered on the rarest grams)
+    and a phonetic bucket, then are verified with bounded Levenshtein, so only
+    a small part of the vocabulary is ever compared. Built on first use.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.token_ids = {}
+        self.token_display = {}
+        self.gram_tokens = {}
+        self.phonetic_tokens = {}
+        self.id_tokens = {}
+
+    @staticmethod
+    def grams(token):
+        padded = f" {token} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def max_distance(token):
+        return 1 if len(token) <= 8 else 2
+
+    def _add(self, grave_id, name):
+        tokens = name_tokens(name)
+        self.id_tokens[grave_id] = tuple(t for t, _ in tokens)
+        for token, raw in tokens:
+            ids = self.token_ids.get(token)
+            if ids is None:
+                ids = self.token_ids[token] = set()
+                self.token_display[token] = raw
+                for gram in self.grams(token):
+                    self.gram_tokens.setdefault(gram, set()).add(token)
+                self.phonetic_tokens.setdefault(phonetic_key(token), set()).add(token)
+            ids.add(grave_id)
+
+    def _remove(self, grave_id):
+        for token in self.id_tokens.pop(grave_id, ()):
+            ids = self.token_ids.get(token)
+            if ids is None:
+                continue
+            ids.discard(grave_id)
+            if ids:
+                continue
+            del self.token_ids[token]
+            del self.token_display[token]
+            for gram in self.grams(token):
+                bucket = self.gram_tokens.get(gram)
+                if bucket is not None:
+                    bucket.discard(token)
+                    if not bucket:
+                        del self.gram_tokens[gram]
+            bucket = self.phonetic_tokens.get(phonetic_key(token))
+            if bucket is not None:
+                bucket.discard(token)
+                if not bucket:
+                    del self.phonetic_tokens[phonetic_key(token)]
+
+    def rebuild(self, snapshots):
+        with self.lock:
+            self.token_ids, self.token_display = {}, {}
+            self.gram_tokens, self.phonetic_tokens, self.id_tokens = {}, {}, {}
+            for snap in snapshots:
+                self._add(snap.id, snap.name)
+            self.ready = True
+
+    def apply(self, changes):
+        with self.lock:
+            for grave_id, snap in changes.items():
+                self._remove(grave_id)
+                if snap is not None:
+                    self._add(grave_id, snap.name)
+
+    def match_token(self, token):
+        """Return {vocab_token: distance} within the token's edit-distance bound.
+
+        Sound-alikes are kept whatever their distance, but at their real
+        (unbounded) one, so an exact spelling still ranks first.
+        """
+        limit = self.max_distance(token)
+        matches = {t: bounded_levenshtein(token, t, max(len(token), len(t)))
+                   for t in self.phonetic_tokens.get(phonetic_key(token), ())}
+        postings = sorted((self.gram_tokens.get(g, set()) for g in self.grams(token)), key=len)
+        # Each edit destroys at most 3 padded trigrams; a match must share the rest,
+        # so it has to appear in one of the rarest len - required + 1 posting lists
+        required = max(1, len(postings) - 3 * limit)
+        split = len(postings) - required + 1
+        shared = Counter()
+        for tokens in postings[:split]:
+            shared.update(tokens)
+        for candidate, count in shared.items():
+            if candidate in matches or abs(len(candidate) - len(token)) > limit:
+                continue
+            count += sum(1 for tokens in postings[split:] if candidate in tokens)
+            if count < required:
+                continue
+            distance = bounded_levenshtein(token, candidate, limit)
+            if distance <= limit:
+                matches[candidate] = distance
+        return matches
+
+    def suggest(self, name, limit=10):
+        """Ranked suggestions plus (grave_id, total distance) for graves matching every token."""
+        with self.lock:
+            suggestions = []
+            did_you_mean = []
+            per_token = []
+            for token, raw in name_tokens(name):
+                matches = self.match_token(token)
+                # On equal distance a sound-alike beats a plain typo neighbour
+                sound = phonetic_key(token)
+                ranked = sorted(matches.items(), key=lambda m: (
+                    m[1], phonetic_key(m[0]) != sound, -len(self.token_ids[m[0]]), m[0]))
+                for term, distance in ranked[:limit]:
+                    suggestions.append({
+                        "query": raw,
+                        "term": self.token_display[term],
+                        "distance": distance,
+                        "count": len(self.token_ids[term])
+                    })
+                did_you_mean.append(self.token_display[ranked[0][0]] if ranked else raw)
+                per_token.append(matches)
+            suggestions.sort(key=lambda s: (s["distance"], -s["count"]))
+
+            graves = []
+            if per_token and all(per_token):
+                # Walk the query token with the fewest matching graves, cheapest terms first
+                anchor = min(per_token, key=lambda m: sum(len(self.token_ids[t]) for t in m))
+                others = [m for m in per_token if m is not anchor]
+                level = None
+                for term, distance in sorted(anchor.items(), key=lambda m: m[1]):
+                    if level is not None and distance > level and len(graves) >= limit:
+                        break
+                    level = distance
+                    if not others:
+                        graves.extend((grave_id, distance) for grave_id in self.token_ids[term])
+                        continue
+                    for grave_id in self.token_ids[term]:
+                        tokens = self.id_tokens.get(grave_id, ())
+                        total = distance
+                        for matches in others:
+                            best = min((matches[t] for t in tokens if t in matches), default=None)
+                            if best is None:
+                                break
+                            total += best
+                        else:
+                            graves.append((grave_id, total))
+
+            return {
+                "didYouMean": " ".join(did_you_mean),
+                "suggestions": suggestions[:limit],
+                "graves": heapq.nsmallest(limit, graves, key=lambda item: (item[1], item[0]))
+            }
+
+
+grave_fuzzy_index = register_grave_index(GraveFuzzyIndex())
+
+
+class SortedTermCounts:
+    """Sorted array of distinct terms with counts; prefix ranges via bisect."""
+
+    def __init__(self):
+        self.terms = []
+        self.counts = {}
+        self.display = {}
+
+    def add(self, term, display, keep_sorted=True):
+        count = self.counts.get(term, 0)
+        if count == 0:
+            if keep_sorted:
+                insort(self.terms, term)
+            self.display[term] = display
+        self.counts[term] = count + 1
+
+    def resort(self):
+        self.terms = sorted(self.counts)
+
+    def remove(self, term):
+        count = self.counts.get(term, 0)
+        if count <= 1:
+            self.counts.pop(term, None)
+            self.display.pop(term, None)
+            i = bisect_left(self.terms, term)
+            if i < len(self.terms) and self.terms[i] == term:
+                del self.terms[i]
+        else:
+            self.counts[term] = count - 1
+
+    def prefix(self, prefix, limit):
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + "\uffff", lo=start)
+        top = heapq.nsmallest(limit, self.terms[start:end], key=lambda t: (-self.counts[t], t))
+        return [{"term": self.display[t], "count": self.counts[t]} for t in top]
+
+
+class GraveSuggestIndex(LazyGraveIndex):
+    """Prefix autocomplete over folded name tokens (first names, surnames) and full names."""
+
+    def __init__(self):
+        super().__init__()
+        self.tokens = SortedTermCounts()
+        self.names = SortedTermCounts()
+        self.id_names = {}
+
+    def _add(self, grave_id, name, keep_sorted=True):
+        self.id_names[grave_id] = name
+        for token, raw in name_tokens(name):
+            self.tokens.add(token, raw, keep_sorted)
+        folded = fold_text(name)
+        if folded:
+            self.names.add(folded, name, keep_sorted)
+
+    def _remove(self, grave_id):
+        name = self.id_names.pop(grave_id, None)
+        if name is None:
+            return
+        for token, _ in name_tokens(name):
+            self.tokens.remove(token)
+        folded = fold_text(name)
+        if folded:
+            self.names.remove(folded)
+
+    def rebuild(self, snapshots):
+        with self.lock:
+            self.tokens, self.names, self.id_names = SortedTermCounts(), SortedTermCounts(), {}
+            for snap in snapshots:
+                self._add(snap.id, snap.name, keep_sorted=False)
+            self.tokens.resort()
+            self.names.resort()
+            self.ready = True
+
+    def apply(self, changes):
+        with self.lock:
+            for grave_id, snap in changes.items():
+                self._remove(grave_id)
+                if snap is not None:
+                    self._add(grave_id, snap.name)
+
+    def suggest(self, query, limit=10):
+        """Single word completes tokens ("kow" -> Kowalski); several words complete full names."""
+        folded = fold_text(query)
+        if not folded:
+            return []
+        with self.lock:
+            terms = self.names if " " in folded else self.tokens
+            return terms.prefix(folded, limit)
+
+
+grave_suggest_index = register_grave_index(GraveSuggestIndex())
+
+
+class GraveMapCache:
+    """Pre-rendered map payloads (id, x, y, section per grave), dropped on any grave write.
+
+    Binary layout (little-endian, every array 4-byte aligned for typed arrays):
+      header  4s magic "GMP1", uint32 count, uint32 section_count, uint32 names_length
+      ids     Int32Array(count)
+      xs      Int32Array(count)
+      ys      Int32Array(count)
+      codes   Uint16Array(count) - index into section names, 0xFFFF when missing;
+              zero-padded to a multiple of 4 bytes
+      names   UTF-8 JSON array of section names (names_length bytes)
+    """
+
+    invalidate_only = True
+    MAGIC = b"GMP1"
+    NO_SECTION = 0xFFFF
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.RLock()
+        self.payloads = {}
+
+    def rebuild(self, snapshots):
+        self.invalidate()
+
+    def apply(self, changes):
+        self.invalidate()
+
+    def invalidate(self):
+        with self.lock:
+            self.payloads = {}
+
+    @staticmethod
+    def columns():
+        rows = db.session.query(Grave.id, Grave.coord_x, Grave.coord_y, Grave.section).order_by(Grave.id).all()
+        ids = [r.id for r in rows]
+        xs = [r.coord_x if r.coord_x is not None else 0 for r in rows]
+        ys = [r.coord_y if r.coord_y is not None else 0 for r in rows]
+        sections = [r.section for r in rows]
+        return ids, xs, ys, sections
+
+    def render_json(self):
+        ids, xs, ys, sections = self.columns()
+        body = {"count": len(ids), "ids": ids, "xs": xs, "ys": ys, "sections": sections}
+        return json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def render_binary(self):
+        ids, xs, ys, sections = self.columns()
+        names = sorted({s for s in sections if s is not None})
+        codes_by_name = {name: i for i, name in enumerate(names)}
+        codes = array("H", [codes_by_name.get(s, self.NO_SECTION) for s in sections])
+        arrays = [array("i", ids), array("i", xs), array("i", ys), codes]
+        if sys.byteorder == "big":
+            for values in arrays:
+                values.byteswap()
+        names_bytes = json.dumps(names, ensure_ascii=False).encode("utf-8")
+        codes_bytes = codes.tobytes()
+        codes_bytes += b"\0" * (-len(codes_bytes) % 4)
+        header = struct.pack("<4sIII", self.MAGIC, len(ids), len(names), len(names_bytes))
+        return b"".join([header, arrays[0].tobytes(), arrays[1].tobytes(), arrays[2].tobytes(),
+                         codes_bytes, names_bytes])
+
+    def get(self, fmt):
+        """Return (raw, gzipped, etag) for "json" or "bin", rendering at most once per change."""
+        with self.lock:
+            self.enabled = True
+            if fmt not in self.payloads:
+                raw = self.render_binary() if fmt == "bin" else self.render_json()
+                etag = f"{fmt}-{hashlib.sha1(raw).hexdigest()[:20]}"
+                self.payloads[fmt] = (raw, gzip.compress(raw, compresslevel=6), etag)
+            return self.payloads[fmt]
+
+
+grave_map_cache = register_grave_index(GraveMapCache())
+
+
+class GraveClusterIndex(LazyGraveIndex):
+    """Grid clusters of grave markers for every zoom level, kept up to date per write.
+
+    Zoom z uses square cells of BASE_CELL / 2**z map units, so each cell is
+    the union of four cells one level deeper. Clusters never mix sections.
+    A cluster holds running sums (count, x, y, id), so a write touches one
+    cluster per level. Each level maps a cell to its clusters by section, so
+    a bbox request only visits the cells overlapping it. Graves without
+    coordinates are left out.
+    """
+
+    BASE_CELL = 256
+    MAX_ZOOM = 8
+
+    def __init__(self):
+        super().__init__()
+        self.levels = [{} for _ in range(self.MAX_ZOOM + 1)]
+        self.points = {}
+
+    def cell(self, x, y):
+        size = self.BASE_CELL / 2 ** self.MAX_ZOOM
+        return math.floor(x / size), math.floor(y / size)
+
+    def _update(self, point, grave_id, sign):
+        cx, cy, x, y, section = point
+        for zoom, cells in enumerate(self.levels):
+            shift = self.MAX_ZOOM - zoom
+            key = (cx >> shift, cy >> shift)
+            clusters = cells.setdefault(key, {})
+            cluster = clusters.get(section)
+            if cluster is None:
+                cluster = clusters[section] = [0, 0, 0, 0]
+            cluster[0] += sign
+            cluster[1] += sign * x
+            cluster[2] += sign * y
+            cluster[3] += sign * grave_id
+            if cluster[0] == 0:
+                del clusters[section]
+                if not clusters:
+                    del cells[key]
+
+    def _add(self, snap):
+        if snap.coord_x is None or snap.coord_y is None:
+            return
+        point = self.cell(snap.coord_x, snap.coord_y) + (snap.coord_x, snap.coord_y, snap.section)
+        self.points[snap.id] = point
+        self._update(point, snap.id, 1)
+
+    def _remove(self, grave_id):
+        point = self.points.pop(grave_id, None)
+        if point is not None:
+            self._update(point, grave_id, -1)
+
+    def rebuild(self, snapshots):
+        with self.lock:
+            self.levels = [{} for _ in range(self.MAX_ZOOM + 1)]
+            self.points = {}
+            for snap in snapshots:
+                self._add(snap)
+            self.ready = True
+
+    def apply(self, changes):
+        with self.lock:
+            for grave_id, snap in changes.items():
+                self._remove(grave_id)
+                if snap is not None:
+                    self._add(snap)
+
+    def _cells_in(self, zoom, bbox):
+        """Occupied cells of `zoom` overlapping bbox (a centroid never leaves its cell)."""
+        cells = self.levels[zoom]
+        size = self.BASE_CELL / 2 ** zoom
+        min_cx, max_cx = math.floor(bbox["minx"] / size), math.floor(bbox["maxx"] / size)
+        min_cy, max_cy = math.floor(bbox["miny"] / size), math.floor(bbox["maxy"] / size)
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(cells):
+            # A bbox wider than the occupied area: cheaper to filter the occupied cells
+            return [clusters for (cx, cy), clusters in cells.items()
+                    if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy]
+        return [cells[key] for key in ((cx, cy) for cx in range(min_cx, max_cx + 1)
+                                       for cy in range(min_cy, max_cy + 1)) if key in cells]
+
+    def clusters(self, zoom, bbox=None):
+        """Clusters at `zoom` (centroid, count, section; id for single graves), optionally within bbox."""
+        with self.lock:
+            cells = self._cells_in(zoom, bbox) if bbox else self.levels[zoom].values()
+            items = [(section, tuple(sums)) for clusters in cells for section, sums in clusters.items()]
+        result = []
+        for section, (count, sum_x, sum_y, sum_id) in items:
+            x, y = sum_x / count, sum_y / count
+            if bbox and not (bbox["minx"] <= x <= bbox["maxx"] and bbox["miny"] <= y <= bbox["maxy"]):
+                continue
+            cluster = {"x": round(x, 2), "y": round(y, 2), "count": count, "section": section}
+            if count == 1:
+                cluster["id"] = sum_id
+            result.append(cluster)
+        result.sort(key=lambda c: (-c["count"], c["x"], c["y"]))
+        return result
+
+
+grave_cluster_index = register_grave_index(GraveClusterIndex())
+
+
+def plot_cell(row, plot):
+    """0-based (row, col) of a grave in its section grid, or None unless both are positive integers."""
+    try:
+        cell = int(str(row).strip()) - 1, int(str(plot).strip()) - 1
+    except (TypeError, ValueError):
+        return None
+    return cell if min(cell) >= 0 else None
+
+
+class GraveTileCache(LazyGraveIndex):
+    """SVG tiles of each section's plot grid, stored on disk by content hash.
+
+    At zoom z a tile covers TILE_BASE >> z rows and columns (cell units in
+    the viewBox). The manifest maps (section, z, tx, ty) to a SHA-256 digest;
+    the file itself lives at MAP_TILE_DIR/<digest[:2]>/<digest>.svg and never
+    changes, so it can be cached forever. A grave write only drops the
+    manifest entries of the tiles covering its old and new plot; a section
+    write drops that section's entries.
+
+    Tiles are rendered outside the lock; a render only reaches the manifest
+    if no write touched its section meanwhile (per-section generations).
+    After a rebuild, files no manifest entry points at and not written for
+    GC_GRACE seconds are deleted.
+    """
+
+    TILE_BASE = 64
+    MAX_ZOOM = 2
+    GC_GRACE = 24 * 3600
+
+    def __init__(self):
+        super().__init__()
+        self.manifest = {}
+        self.locations = {}
+        self.generations = Counter()
+        self.epoch = 0
+
+    @staticmethod
+    def directory():
+        return app.config["MAP_TILE_DIR"]
+
+    def tile_size(self, zoom):
+        return self.TILE_BASE >> zoom
+
+    def _locate(self, snap):
+        cell = plot_cell(snap.row, snap.plot)
+        if cell is None or not snap.section:
+            return None
+        return (section_key(snap.section),) + cell
+
+    def _invalidate_cell(self, location):
+        key, row, col = location
+        self.generations[key] += 1
+        tiles = self.manifest.get(key)
+        if not tiles:
+            return
+        for zoom in range(self.MAX_ZOOM + 1):
+            size = self.tile_size(zoom)
+            tiles.pop((zoom, col // size, row // size), None)
+
+    def rebuild(self, snapshots):
+        with self.lock:
+            self.manifest = {}
+            self.locations = {}
+            self.epoch += 1
+            for snap in snapshots:
+                location = self._locate(snap)
+                if location is not None:
+                    self.locations[snap.id] = location
+            self.ready = True
+        self.collect_garbage()
+
+    def apply(self, changes):
+        with self.lock:
+            for grave_id, snap in changes.items():
+                old = self.locations.pop(grave_id, None)
+                if old is not None:
+                    self._invalidate_cell(old)
+                new = self._locate(snap) if snap is not None else None
+                if new is not None:
+                    self.locations[grave_id] = new
+                    self._invalidate_cell(new)
+
+    def sections_changed(self, changes):
+        with self.lock:
+            for name in changes:
+                self.generations[section_key(name)] += 1
+                self.manifest.pop(section_key(name), None)
+
+    def grid(self, section, zoom):
+        """(columns, rows) of tiles needed to cover the section at `zoom`."""
+        size = self.tile_size(zoom)
+        cols, rows = section.total_cols or 0, section.total_rows or 0
+        return -(-cols // size), -(-rows // size)
+
+    def render(self, section, zoom, tx, ty, graves):
+        size = self.tile_size(zoom)
+        x0, y0 = tx * size, ty * size
+        width = max(0, min(section.total_cols or 0, x0 + size) - x0)
+        height = max(0, min(section.total_rows or 0, y0 + size) - y0)
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{x0} {y0} {size} {size}" '
+            f'data-section="{escape(section.name)}" data-zoom="{zoom}">',
+            "<style>.plots{fill:#eef2e6;stroke:#b7c2a5;stroke-width:.05}.grave{fill:#5b6b4e}</style>",
+        ]
+        if width and height:
+            parts.append(f'<rect class="plots" x="{x0}" y="{y0}" width="{width}" height="{height}"/>')
+        for grave in graves:
+            row, col = grave["cell"]
+            if not (x0 <= col < x0 + size and y0 <= row < y0 + size):
+                continue
+            attrs = f'class="grave" x="{col}" y="{row}" width="1" height="1" data-id="{grave["id"]}"'
+            if zoom == self.MAX_ZOOM:
+                # Full detail: names and map coordinates of every grave
+                attrs += f' data-x="{grave["x"]}" data-y="{grave["y"]}"'
+                parts.append(f"<rect {attrs}><title>{escape(grave['name'] or '')}</title></rect>")
+            else:
+                parts.append(f"<rect {attrs}/>")
+        parts.append("</svg>")
+        return "".join(parts).encode("utf-8")
+
+    def store(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        folder = os.path.join(self.directory(), digest[:2])
+        path = os.path.join(folder, f"{digest}.svg")
+        try:
+            # Still in use: keep it out of collect_garbage's reach
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(folder, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return digest
+
+    def collect_garbage(self, grace=None):
+        """Delete tile files unreferenced by the manifest and older than `grace` seconds; returns the count.
+
+        The grace period spares files another process (sharing MAP_TILE_DIR)
+        has just written or still points at.
+        """
+        with self.lock:
+            referenced = {digest for tiles in self.manifest.values() for digest in tiles.values()}
+        cutoff = time.time() - (self.GC_GRACE if grace is None else grace)
+        removed = 0
+        try:
+            folders = [entry.path for entry in os.scandir(self.directory()) if entry.is_dir()]
+        except FileNotFoundError:
+            return 0
+        for folder in folders:
+            for entry in os.scandir(folder):
+                digest = entry.name.split(".", 1)[0]
+                if digest in referenced and entry.name.endswith(".svg"):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def section_graves(self, section):
+        rows = db.session.query(
+            Grave.id, Grave.name, Grave.row, Grave.plot, Grave.coord_x, Grave.coord_y
+        ).filter(section_filter(section.name)).order_by(Grave.id).all()
+        graves = []
+        for r in rows:
+            cell = plot_cell(r.row, r.plot)
+            if cell is not None:
+                graves.append({"id": r.id, "name": r.name, "cell": cell,
+                               "x": r.coord_x if r.coord_x is not None else 0,
+                               "y": r.coord_y if r.coord_y is not None else 0})
+        return graves
+
+    def tiles(self, section, zoom, coords):
+        """Digests for the requested (tx, ty) tiles, rendering only the missing ones."""
+        self.ensure_ready()
+        key = section_key(section.name)
+        with self.lock:
+            cached = self.manifest.get(key, {})
+            found = {c: cached[(zoom,) + c] for c in coords if (zoom,) + c in cached}
+            generation = (self.epoch, self.generations[key])
+        # A peer process may have collected a file this manifest still names
+        missing = [c for c in coords if c not in found or not os.path.exists(self.path(found[c]))]
+        if missing:
+            graves = self.section_graves(section)
+            rendered = {(tx, ty): self.store(self.render(section, zoom, tx, ty, graves)) for tx, ty in missing}
+            with self.lock:
+                # A write since the read above may not be in these tiles: serve them, don't keep them
+                if (self.epoch, self.generations[key]) == generation:
+                    tiles = self.manifest.setdefault(key, {})
+                    for (tx, ty), digest in rendered.items():
+                        tiles[(zoom, tx, ty)] = digest
+            found.update(rendered)
+        return found
+
+    def path(self, digest):
+        return os.path.join(self.directory(), digest[:2], f"{digest}.svg")
+
+
+grave_tile_cache = register_grave_index(GraveTileCache())
+
+
+class SectionOccupancyIndex(LazyGraveIndex):
+    """Bitset of occupied plots per section (rows x cols, row-major, LSB first).
+
+    A plot is occupied while at least one grave points at its
+    (section, row, plot); graves outside the section grid are only counted.
+    Grave writes flip single bits; a section write (e.g. a resize in
+    update_section) rebuilds that section's bitmap from the per-plot counts.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.grids = {}
+        self.bitmaps = {}
+        self.counts = {}
+        self.locations = {}
+
+    def _bitmap(self, key):
+        rows, cols = self.grids.get(key, (0, 0))
+        bitmap = bytearray(-(-rows * cols // 8))
+        for (row, col), count in self.counts.get(key, {}).items():
+            if count and row < rows and col < cols:
+                bit = row * cols + col
+                bitmap[bit >> 3] |= 1 << (bit & 7)
+        self.bitmaps[key] = bitmap
+
+    def _set(self, location, delta):
+        key, row, col = location
+        counts = self.counts.setdefault(key, Counter())
+        counts[(row, col)] += delta
+        count = counts[(row, col)]
+        if count <= 0:
+            del counts[(row, col)]
+        rows, cols = self.grids.get(key, (0, 0))
+        if not (0 <= row < rows and 0 <= col < cols) or count > 1 or (count == 1 and delta < 0):
+            return
+        bit = row * cols + col
+        if count == 1:
+            self.bitmaps[key][bit >> 3] |= 1 << (bit & 7)
+        else:
+            self.bitmaps[key][bit >> 3] &= ~(1 << (bit & 7))
+
+    @staticmethod
+    def _locate(snap):
+        cell = plot_cell(snap.row, snap.plot)
+        if cell is None or not snap.section:
+            return None
+        return (section_key(snap.section),) + cell
+
+    def _load_grids(self):
+        grids = {}
+        for name, rows, cols in db.session.query(Section.name, Section.total_rows, Section.total_cols).all():
+            grids.setdefault(section_key(name), (rows or 0, cols or 0))
+        self.grids = grids
+        return set(grids)
+
+    def rebuild(self, snapshots):
+        with self.lock:
+            self.bitmaps, self.counts, self.locations = {}, {}, {}
+            keys = self._load_grids()
+            for snap in snapshots:
+                location = self._locate(snap)
+                if location is not None:
+                    self.locations[snap.id] = location
+                    key, row, col = location
+                    self.counts.setdefault(key, Counter())[(row, col)] += 1
+            for key in keys:
+                self._bitmap(key)
+            self.ready = True
+
+    def apply(self, changes):
+        with self.lock:
+            for grave_id, snap in changes.items():
+                old = self.locations.pop(grave_id, None)
+                if old is not None:
+                    self._set(old, -1)
+                new = self._locate(snap) if snap is not None else None
+                if new is not None:
+                    self.locations[grave_id] = new
+                    self._set(new, 1)
+
+    def sections_changed(self, changes):
+        with self.lock:
+            for name, grid in changes.items():
+                key = section_key(name)
+                if grid is None:
+                    self.grids.pop(key, None)
+                    self.bitmaps.pop(key, None)
+                else:
+                    self.grids[key] = grid
+                    self._bitmap(key)
+
+    def occupancy(self, name):
+        """(rows, cols, bitmap copy, graves outside the grid) for a section."""
+        self.ensure_ready()
+        key = section_key(name)
+        with self.lock:
+            rows, cols = self.grids.get(key, (0, 0))
+            bitmap = bytes(self.bitmaps.get(key, b""))
+            outside = sum(1 for row, col in self.counts.get(key, {}) if row >= rows or col >= cols)
+            return rows, cols, bitmap, outside
+
+    @staticmethod
+    def free_cells(bitmap, total, start=0):
+        """Yield free bit numbers >= start, skipping full bytes."""
+        bit = start
+        while bit < total:
+            byte = bitmap[bit >> 3]
+            if byte == 0xFF and bit & 7 == 0:
+                bit += 8
+                continue
+            if not byte & (1 << (bit & 7)):
+                yield bit
+            bit += 1
+
+    @staticmethod
+    def row_mask(bitmap, row, cols):
+        """Occupied plots of one row as an int (bit c = column c)."""
+        start = row * cols
+        chunk = bitmap[start >> 3:(start + cols + 7) >> 3]
+        return (int.from_bytes(chunk, "little") >> (start & 7)) & ((1 << cols) - 1)
+
+    def nearest_free(self, name, row, col, k, width=1):
+        """k free runs of `width` adjacent plots in a row closest to (row, col), 0-based.
+
+        Distance is Euclidean from the target to the closest plot of the run.
+        Rows are visited outwards from the target and each one is read as a
+        bitmask, so candidates come from bit tricks instead of per-plot checks;
+        the walk stops once the row offset alone exceeds the k-th best distance.
+        Returns [(distance, row, col)] sorted by distance; None for unknown sections.
+        """
+        self.ensure_ready()
+        key = section_key(name)
+        with self.lock:
+            if key not in self.grids:
+                return None
+            rows, cols = self.grids[key]
+            bitmap = self.bitmaps[key]
+            if not rows or width > cols:
+                return []
+
+            best = []
+
+            def offer(distance, r, c):
+                item = (-distance, -r, -c)
+                if len(best) < k:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+
+            for dr in range(max(abs(row), abs(rows - 1 - row)) + 1):
+                if len(best) >= k and -best[0][0] < dr:
+                    break
+                for r in {row - dr, row + dr}:
+                    if not 0 <= r < rows:
+                        continue
+                    free = ~self.row_mask(bitmap, r, cols) & ((1 << cols) - 1)
+                    # Bit c set when plots c .. c + width - 1 are all free
+                    runs = free
+                    for i in range(1, width):
+                        runs &= free >> i
+                    # Runs starting at or left of the target column, nearest first
+                    left = runs & ((1 << (col + 1)) - 1) if col >= 0 else 0
+                    for _ in range(k):
+                        if not left:
+                            break
+                        c = left.bit_length() - 1
+                        left &= ~(1 << c)
+                        offer(math.hypot(dr, max(0, col - (c + width - 1))), r, c)
+                    # Runs starting right of it, nearest first
+                    shift = max(col + 1, 0)
+                    right = runs >> shift
+                    for _ in range(k):
+                        if not right:
+                            break
+                        low = (right & -right).bit_length() - 1
+                        right &= right - 1
+                        offer(math.hypot(dr, shift + low - col), r, shift + low)
+            return sorted((-d, -r, -c) for d, r, c in best)
+
+
+section_occupancy_index = register_grave_index(SectionOccupancyIndex())
+
+
+@event.listens_for(db.session, "after_flush")
+def collect_section_changes(session, flush_context):
+    if not any(index.enabled and hasattr(index, "sections_changed") for index in grave_indexes):
+        return
+    # {section name: (rows, cols)}, None for names that went away (delete/rename)
+    changes = session.info.setdefault("section_changes", {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Section):
+            for old_name in inspect(obj).attrs.name.history.deleted:
+                changes.setdefault(old_name, None)
+    for obj in session.deleted:
+        if isinstance(obj, Section):
+            changes[obj.name] = None
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Section) and obj not in session.deleted:
+            changes[obj.name] = (obj.total_rows or 0, obj.total_cols or 0)
+
+
+@event.listens_for(db.session, "after_commit")
+def apply_section_changes(session):
+    changes = session.info.pop("section_changes", None)
+    if not changes:
+        return
+    for index in grave_indexes:
+        if index.enabled and hasattr(index, "sections_changed"):
+            index.sections_changed(changes)
+
+
+@event.listens_for(db.session, "after_rollback")
+def discard_section_changes(session):
+    session.info.pop("section_changes", None)
+
+# --- Backendy pamięci podręcznej (cache backends) ---
+
+ResponseCacheEntry = namedtuple("ResponseCacheEntry", ["body", "mimetype", "expires", "tables", "versions"])
+
+
+def encode_cache_entry(entry):
+    header = json.dumps({"mimetype": entry.mimetype, "expires": entry.expires,
+                         "tables": entry.tables, "versions": entry.versions})
+    return header.encode("utf-8") + b"\n" + entry.body
+
+
+def decode_cache_entry(blob):
+    header, _, body = bytes(blob).partition(b"\n")
+    meta = json.loads(header)
+    return ResponseCacheEntry(body, meta["mimetype"], meta["expires"], tuple(meta["tables"]), tuple(meta["versions"]))
+
+
+class LocalCacheBackend:
+    """Process-local LRU; entries of written tables are dropped eagerly.
+
+    Table versions never leave the process, so this is only correct with a
+    single worker.
+    """
+
+    name = "local"
+    shared = False
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.by_table = {}
+
+    def _drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            for table in entry.tables:
+                keys = self.by_table.get(table)
+                if keys is not None:
+                    keys.discard(key)
+        return entry
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, max_entries):
+        """Store the entry; returns how many least recently used ones were evicted."""
+        with self.lock:
+            self._drop(key)
+            self.entries[key] = entry
+            for table in entry.tables:
+                self.by_table.setdefault(table, set()).add(key)
+            evicted = 0
+            while len(self.entries) > max_entries:
+                self._drop(next(iter(self.entries)))
+                evicted += 1
+            return evicted
+
+    def delete(self, key):
+        with self.lock:
+            self._drop(key)
+
+    def invalidate(self, tables):
+        with self.lock:
+            dropped = 0
+            for table in tables:
+                for key in list(self.by_table.pop(table, ())):
+                    if self._drop(key) is not None:
+                        dropped += 1
+            return dropped
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.by_table.clear()
+
+    def usage(self):
+        with self.lock:
+            return len(self.entries), sum(len(e.body) for e in self.entries.values())
+
+
+class SQLiteCacheBackend:
+    """Cache file shared by the workers of one host (WAL, one connection per thread).
+
+    Besides the entries it holds the table version counters; stale entries
+    are detected by their recorded versions rather than deleted on write.
+    The change log keeps the last CHANGE_LOG_SIZE payloads per logged table.
+    """
+
+    name = "sqlite"
+    shared = True
+    # Hits refresh the LRU timestamp at most this often, so reads rarely write
+    TOUCH_SECONDS = 1.0
+    CHANGE_LOG_SIZE = 10000
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cache_entry (key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+        "expires REAL NOT NULL, accessed REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_cache_entry_accessed ON cache_entry (accessed)",
+        "CREATE TABLE IF NOT EXISTS table_version (name TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+        "modified INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS change_log (name TEXT NOT NULL, version INTEGER NOT NULL, "
+        "payload TEXT NOT NULL, PRIMARY KEY (name, version))",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        conn = self.connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+
+    def connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self.local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self.connect()
+        row = conn.execute("SELECT value, accessed FROM cache_entry WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > self.TOUCH_SECONDS:
+            conn.execute("UPDATE cache_entry SET accessed = ? WHERE key = ?", (now, key))
+        return decode_cache_entry(row[0])
+
+    def put(self, key, entry, max_entries):
+        conn = self.connect()
+        conn.execute("INSERT OR REPLACE INTO cache_entry VALUES (?, ?, ?, ?)",
+                     (key, encode_cache_entry(entry), entry.expires, time.time()))
+        excess = conn.execute("SELECT COUNT(*) FROM cache_entry").fetchone()[0] - max_entries
+        if excess <= 0:
+            return 0
+        conn.execute("DELETE FROM cache_entry WHERE key IN "
+                     "(SELECT key FROM cache_entry ORDER BY accessed LIMIT ?)", (excess,))
+        return excess
+
+    def delete(self, key):
+        self.connect().execute("DELETE FROM cache_entry WHERE key = ?", (key,))
+
+    def invalidate(self, tables):
+        return 0
+
+    def clear(self):
+        self.connect().execute("DELETE FROM cache_entry")
+
+    def usage(self):
+        count, size = self.connect().execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) "
+                                             "FROM cache_entry").fetchone()
+        return count, size
+
+    def boot_id(self, candidate):
+        conn = self.connect()
+        conn.execute("INSERT OR IGNORE INTO cache_meta VALUES ('boot', ?)", (candidate,))
+        return conn.execute("SELECT value FROM cache_meta WHERE name = 'boot'").fetchone()[0]
+
+    def incr_versions(self, tables, modified, changes=None):
+        """Bump the tables; `changes` ({table: payload}) is logged under the new version."""
+        conn = self.connect()
+        versions = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in tables:
+                version = versions[table] = conn.execute(
+                    "INSERT INTO table_version VALUES (?, 1, ?) ON CONFLICT(name) DO UPDATE "
+                    "SET version = version + 1, modified = excluded.modified RETURNING version",
+                    (table, modified)).fetchone()[0]
+                if changes and table in changes:
+                    conn.execute("INSERT OR REPLACE INTO change_log VALUES (?, ?, ?)",
+                                 (table, version, changes[table]))
+                    conn.execute("DELETE FROM change_log WHERE name = ? AND version <= ?",
+                                 (table, version - self.CHANGE_LOG_SIZE))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return versions
+
+    def load_versions(self):
+        rows = self.connect().execute("SELECT name, version, modified FROM table_version")
+        return {name: (version, modified) for name, version, modified in rows}
+
+    def load_changes(self, table, first, last):
+        """{version: payload} of the logged versions first..last (trimmed ones are absent)."""
+        rows = self.connect().execute("SELECT version, payload FROM change_log "
+                                      "WHERE name = ? AND version BETWEEN ? AND ?", (table, first, last))
+        return dict(rows)
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+class RespClient:
+    """Minimal RESP2 client (one socket per thread) for the few commands the cache uses."""
+
+    def __init__(self, host, port, db=0, password=None, timeout=2.0):
+        self.address = (host, port)
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.local = threading.local()
+
+    @staticmethod
+    def encode(command):
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    @classmethod
+    def read_reply(cls, reader):
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            return RespError(rest.decode("utf-8"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            return None if size < 0 else reader.read(size + 2)[:-2]
+        if kind == b"*":
+            size = int(rest)
+            return None if size < 0 else [cls.read_reply(reader) for _ in range(size)]
+        raise ConnectionError(f"unexpected reply from cache server: {line[:40]!r}")
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        self.local.conn = (sock, sock.makefile("rb"))
+        setup = [("AUTH", self.password)] if self.password else []
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self.pipeline(setup)
+        return self.local.conn
+
+    def pipeline(self, commands):
+        """Send all commands in one write and return their replies in order."""
+        conn = getattr(self.local, "conn", None) or self._connect()
+        sock, reader = conn
+        try:
+            sock.sendall(b"".join(self.encode(c) for c in commands))
+            replies = [self.read_reply(reader) for _ in commands]
+        except OSError:
+            self.local.conn = None
+            sock.close()
+            raise
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def execute(self, *command):
+        return self.pipeline([command])[0]
+
+
+class RedisCacheBackend:
+    """Entries and table versions in a Redis-protocol server shared by all workers.
+
+    The server expires entries itself (PX) and bounds memory with its own
+    eviction policy (allkeys-lru), not with RESPONSE_CACHE_SIZE. Change log
+    payloads are kept CHANGE_LOG_SECONDS.
+    """
+
+    name = "redis"
+    shared = True
+    SCAN_COUNT = 500
+    CHANGE_LOG_SECONDS = 3600
+
+    def __init__(self, client, prefix="cmentarz:"):
+        self.client = client
+        self.prefix = prefix
+        self.entry_prefix = prefix + "response:"
+
+    def get(self, key):
+        blob = self.client.execute("GET", self.entry_prefix + key)
+        return None if blob is None else decode_cache_entry(blob)
+
+    def put(self, key, entry, max_entries):
+        ttl_ms = max(int((entry.expires - time.time()) * 1000), 1)
+        self.client.execute("SET", self.entry_prefix + key, encode_cache_entry(entry), "PX", ttl_ms)
+        return 0
+
+    def delete(self, key):
+        self.client.execute("DEL", self.entry_prefix + key)
+
+    def invalidate(self, tables):
+        return 0
+
+    def entry_keys(self):
+        cursor = b"0"
+        while True:
+            cursor, keys = self.client.execute("SCAN", cursor, "MATCH", self.entry_prefix + "*",
+                                               "COUNT", self.SCAN_COUNT)
+            yield from keys
+            if cursor in (b"0", "0"):
+                return
+
+    def clear(self):
+        keys = list(self.entry_keys())
+        for start in range(0, len(keys), self.SCAN_COUNT):
+            self.client.execute("DEL", *keys[start:start + self.SCAN_COUNT])
+
+    def usage(self):
+        keys = list(self.entry_keys())
+        sizes = self.client.pipeline([("STRLEN", key) for key in keys]) if keys else []
+        return len(keys), sum(sizes)
+
+    def boot_id(self, candidate):
+        key = self.prefix + "boot"
+        return self.client.pipeline([("SET", key, candidate, "NX"), ("GET", key)])[1].decode("utf-8")
+
+    def change_key(self, table, version):
+        return f"{self.prefix}changes:{table}:{version}"
+
+    def incr_versions(self, tables, modified, changes=None):
+        """Bump the tables; `changes` ({table: payload}) is logged under the new version.
+
+        The payload is written right after the increment; a reader that
+        looks in between finds it missing and falls back to a full reload.
+        """
+        commands = []
+        for table in tables:
+            commands.append(("HINCRBY", self.prefix + "versions", table, 1))
+            commands.append(("HSET", self.prefix + "modified", table, modified))
+        versions = dict(zip(tables, self.client.pipeline(commands)[::2]))
+        if changes:
+            self.client.pipeline([
+                ("SET", self.change_key(table, versions[table]), payload, "PX", self.CHANGE_LOG_SECONDS * 1000)
+                for table, payload in changes.items() if table in versions])
+        return versions
+
+    def load_versions(self):
+        versions, modified = self.client.pipeline([("HGETALL", self.prefix + "versions"),
+                                                   ("HGETALL", self.prefix + "modified")])
+        modified = dict(zip(modified[::2], modified[1::2]))
+        return {name.decode("utf-8"): (int(version), int(modified.get(name, 0)))
+                for name, version in zip(versions[::2], versions[1::2])}
+
+    def load_changes(self, table, first, last):
+        """{version: payload} of the logged versions first..last (expired ones are absent)."""
+        versions = list(range(first, last + 1))
+        if not versions:
+            return {}
+        payloads = self.client.execute("MGET", *(self.change_key(table, v) for v in versions))
+        return {v: payload.decode("utf-8") for v, payload in zip(versions, payloads) if payload is not None}
+
+
+CACHE_BACKEND_ERRORS = (OSError, sqlite3.Error, RespError)
+
+
+def make_cache_backend(url):
+    """"local", "sqlite" / "sqlite:///<file>" or "redis://[:password@]host[:port][/db]"."""
+    if url in ("", "local"):
+        return LocalCacheBackend()
+    if url == "sqlite":
+        return SQLiteCacheBackend(os.path.join(basedir, "response_cache.db"))
+    if url.startswith("sqlite:///"):
+        return SQLiteCacheBackend(url[len("sqlite:///"):])
+    if url.startswith("redis://"):
+        parts = urlsplit(url)
+        client = RespClient(parts.hostname or "localhost", parts.port or 6379,
+                            int(parts.path.strip("/") or 0), parts.password)
+        return RedisCacheBackend(client)
+    raise ValueError(f"Unsupported CACHE_BACKEND: {url}")
+
+
+cache_backend = make_cache_backend(app.config["CACHE_BACKEND"])
+
+
+# --- Wersje tabel (ETag / Last-Modified) ---
+
+class TableVersions:
+    """Per-table write counters plus the time of the last committed write.
+
+    Bumped from the session events below, so every ORM write path (flush,
+    Query.update/delete, Core statements run through db.session) counts
+    without touching the endpoints. The boot id keeps tags from an earlier
+    process from matching after a restart.
+
+    With a shared backend the counters live there: bump() increments them
+    (logging `changes` payloads under the new versions) and sync() (run
+    before each API request) adopts other workers' writes. `listeners` get
+    the changed tables; `remote_listeners` get {table: (first, last)}, the
+    versions other workers wrote (first > last when that can't be told).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.boot = f"{os.getpid()}.{time.time_ns()}"
+        self.started = datetime.utcnow().replace(microsecond=0)
+        self.versions = {}
+        self.modified = {}
+        self.listeners = []
+        self.remote_listeners = []
+        self.synced = False
+
+    def bump(self, tables, changes=None):
+        tables = sorted(tables)
+        now = datetime.utcnow().replace(microsecond=0)
+        shared = None
+        if self.backend.shared:
+            try:
+                shared = self.backend.incr_versions(tables, int(now.replace(tzinfo=timezone.utc).timestamp()),
+                                                    changes)
+            except CACHE_BACKEND_ERRORS as e:
+                print(f"Warning: could not publish table versions to {self.backend.name} cache: {e}")
+        remote = {}
+        with self.lock:
+            for table in tables:
+                previous = self.versions.get(table, 0)
+                version = previous + 1
+                if shared is not None:
+                    # Anything beyond our own increment was written by another worker
+                    if shared[table] != version:
+                        remote[table] = (previous + 1, shared[table] - 1)
+                    version = shared[table]
+                self.versions[table] = version
+                self.modified[table] = now
+        for listener in self.listeners:
+            listener(tables)
+        if remote:
+            for listener in self.remote_listeners:
+                listener(remote)
+
+    def sync(self):
+        if not self.backend.shared:
+            return
+        try:
+            if not self.synced:
+                self.boot = self.backend.boot_id(self.boot)
+            remote = self.backend.load_versions()
+        except CACHE_BACKEND_ERRORS as e:
+            print(f"Warning: could not read table versions from {self.backend.name} cache: {e}")
+            return
+        changed = {}
+        with self.lock:
+            for table, (version, modified) in remote.items():
+                previous = self.versions.get(table, 0)
+                if previous != version:
+                    self.versions[table] = version
+                    self.modified[table] = datetime.fromtimestamp(modified, timezone.utc).replace(tzinfo=None)
+                    changed[table] = (previous + 1, version)
+        # The first sync only adopts the current state; nothing local was built from it yet
+        if changed and self.synced:
+            for listener in self.listeners:
+                listener(list(changed))
+            for listener in self.remote_listeners:
+                listener(changed)
+        self.synced = True
+
+    def get(self, table):
+        with self.lock:
+            return self.versions.get(table, 0), self.modified.get(table, self.started)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.versions)
+
+
+table_versions = TableVersions(cache_backend)
+
+
+@app.before_request
+def sync_table_versions():
+    if request.path.startswith("/api/"):
+        table_versions.sync()
+        replay_remote_grave_changes()
+
+
+# Tables whose committed changes are logged in a shared backend, so other
+# workers can replay them into their grave indexes
+CHANGE_LOG_TABLES = ("grave", "section")
+pending_remote_changes = {}
+pending_remote_lock = threading.Lock()
+
+
+def queue_remote_grave_changes(ranges):
+    """Another worker wrote graves or sections; replayed before the next API request.
+
+    Queued rather than applied here, as bump() runs in after_commit where the
+    session can't query.
+    """
+    with pending_remote_lock:
+        for table, (first, last) in ranges.items():
+            if table not in CHANGE_LOG_TABLES:
+                continue
+            if table in pending_remote_changes:
+                queued_first, queued_last = pending_remote_changes[table]
+                first, last = min(first, queued_first), max(last, queued_last)
+            pending_remote_changes[table] = (first, last)
+
+
+def load_logged_keys(table, first, last):
+    """Union of the keys logged for versions first..last, or None when any is unknown."""
+    if first > last:
+        return None
+    try:
+        payloads = table_versions.backend.load_changes(table, first, last)
+    except CACHE_BACKEND_ERRORS as e:
+        print(f"Warning: could not read the change log from {table_versions.backend.name} cache: {e}")
+        return None
+    keys = set()
+    for version in range(first, last + 1):
+        logged = json.loads(payloads[version]) if version in payloads else None
+        if logged is None:
+            return None
+        keys.update(logged)
+    return keys
+
+
+def replay_remote_grave_changes():
+    """Apply the queued remote grave/section changes to this process's indexes.
+
+    Only the logged grave ids and section names are re-read. A write that
+    wasn't logged by key (bulk statements, an expired or trimmed entry)
+    marks every index stale instead, and the next one used rebuilds them
+    all from a single snapshot.
+    """
+    with pending_remote_lock:
+        ranges = dict(pending_remote_changes)
+        pending_remote_changes.clear()
+    active = [index for index in grave_indexes if index.enabled]
+    if not ranges or not active:
+        return
+    keys = {table: load_logged_keys(table, first, last) for table, (first, last) in ranges.items()}
+    if any(logged is None for logged in keys.values()):
+        mark_grave_indexes_stale()
+        return
+
+    grave_ids = sorted(keys.get("grave", ()))
+    if grave_ids:
+        found = {g.id: grave_snapshot(g) for g in Grave.query.filter(Grave.id.in_(grave_ids))}
+        changes = {grave_id: found.get(grave_id) for grave_id in grave_ids}
+        for index in active:
+            index.apply(changes)
+    names = sorted(keys.get("section", ()))
+    if names:
+        grids = {name: (rows or 0, cols or 0) for name, rows, cols in db.session.query(
+            Section.name, Section.total_rows, Section.total_cols).filter(Section.name.in_(names))}
+        changes = {name: grids.get(name) for name in names}
+        for index in active:
+            if hasattr(index, "sections_changed"):
+                index.sections_changed(changes)
+
+
+table_versions.remote_listeners.append(queue_remote_grave_changes)
+
+
+def mark_tables_written(session, *models):
+    """Record writes that bypass session events (bulk_save_objects)."""
+    tables = {m.__table__.name for m in models}
+    session.info.setdefault("written_tables", set()).update(tables)
+    mark_changes_unknown(session, tables)
+    session.info.setdefault("stale_counters", set()).update(
+        name for table in tables for name in COUNTERS_BY_TABLE.get(table, ()))
+
+
+def mark_changes_unknown(session, tables):
+    """Rows written without the ORM: the change log can only say "everything"."""
+    changed = session.info.setdefault("changed_keys", {})
+    for table in tables:
+        if table in CHANGE_LOG_TABLES:
+            changed[table] = None
+
+
+def changed_keys(obj):
+    """Change log keys of a flushed object: grave id, or section names (old and new)."""
+    if isinstance(obj, Grave):
+        return [obj.id]
+    if isinstance(obj, Section):
+        names = list(inspect(obj).attrs.name.history.deleted) + [obj.name]
+        return [name for name in names if name is not None]
+    return []
+
+
+@event.listens_for(db.session, "after_flush")
+def collect_written_tables(session, flush_context):
+    tables = session.info.setdefault("written_tables", set())
+    changed = session.info.setdefault("changed_keys", {})
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            tables.add(table.name)
+            if table.name in CHANGE_LOG_TABLES and changed.get(table.name, ()) is not None:
+                changed.setdefault(table.name, set()).update(changed_keys(obj))
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def collect_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            orm_execute_state.session.info.setdefault("written_tables", set()).add(table.name)
+            mark_changes_unknown(orm_execute_state.session, [table.name])
+
+
+@event.listens_for(db.session, "after_commit")
+def bump_table_versions(session):
+    tables = session.info.pop("written_tables", None)
+    changed = session.info.pop("changed_keys", {})
+    if tables:
+        logged = {}
+        for table in tables:
+            if table in CHANGE_LOG_TABLES:
+                keys = changed.get(table)
+                logged[table] = json.dumps(None if keys is None else sorted(keys))
+        table_versions.bump(tables, logged)
+
+
+@event.listens_for(db.session, "after_rollback")
+def discard_written_tables(session):
+    session.info.pop("written_tables", None)
+    session.info.pop("changed_keys", None)
+
+
+def conditional_get(*models):
+    """Serve 304s for unchanged tables straight from table_versions (no DB access).
+
+    The strong ETag covers the table versions and the full request path, as
+    ?fields= and the like change the representation. Last-Modified has
+    one-second resolution, so it is only sent (and If-Modified-Since only
+    honoured) once the second of the last write is over; until then a later
+    write in the same second would carry the same date.
+    """
+    tables = [m.__table__.name for m in models]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            states = [table_versions.get(t) for t in tables]
+            last_modified = max(modified for _, modified in states)
+            tag_source = f"{table_versions.boot}|{states!r}|{request.full_path}"
+            etag = hashlib.sha1(tag_source.encode("utf-8")).hexdigest()[:20]
+            settled = last_modified < datetime.utcnow().replace(microsecond=0)
+            headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+            if settled:
+                headers["Last-Modified"] = http_date(last_modified.replace(tzinfo=timezone.utc))
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = settled and since is not None and last_modified <= since.replace(tzinfo=None)
+            if not_modified:
+                return Response(status=304, headers=headers)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.headers.update(headers)
+            return response
+        return wrapper
+    return decorator
+
+
+class ResponseCache:
+    """LRU + TTL cache of public GET response bodies.
+
+    Keys are the path plus the sorted, non-empty query args. Each entry
+    records the tables it was built from and their versions, re-checked on
+    every hit; the local backend also drops entries as soon as one of their
+    tables is written (TableVersions listener). Storage is `backend`;
+    counters are per process. Backend failures count as misses.
+    """
+
+    MAX_BODY_BYTES = 1 << 20
+
+    def __init__(self, backend, max_entries, ttl):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.counters = Counter()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(req):
+        args = sorted((k, v) for k, v in req.args.items(multi=True) if v != "")
+        # Escaped, so a value containing "&" or "=" can't pose as another parameter
+        return req.path + "?" + urlencode(args)
+
+    def count(self, *names):
+        with self.lock:
+            for name in names:
+                self.counters[name] += 1
+
+    def get(self, key):
+        try:
+            entry = self.backend.get(key)
+            if entry is None:
+                self.count("misses")
+                return None
+            if entry.expires <= time.time():
+                self.backend.delete(key)
+                self.count("expirations", "misses")
+                return None
+            if entry.versions != tuple(table_versions.get(t)[0] for t in entry.tables):
+                self.backend.delete(key)
+                self.count("invalidations", "misses")
+                return None
+        except CACHE_BACKEND_ERRORS:
+            self.count("errors", "misses")
+            return None
+        self.count("hits")
+        return entry
+
+    def put(self, key, body, mimetype, tables, versions):
+        if len(body) > self.MAX_BODY_BYTES:
+            return
+        entry = ResponseCacheEntry(body, mimetype, time.time() + self.ttl, tables, versions)
+        try:
+            evicted = self.backend.put(key, entry, self.max_entries)
+        except CACHE_BACKEND_ERRORS:
+            self.count("errors")
+            return
+        with self.lock:
+            self.counters["evictions"] += evicted
+
+    def invalidate_tables(self, tables):
+        dropped = self.backend.invalidate(tables)
+        with self.lock:
+            self.counters["invalidations"] += dropped
+
+    def clear(self):
+        try:
+            self.backend.clear()
+        except CACHE_BACKEND_ERRORS:
+            self.count("errors")
+
+    def stats(self):
+        try:
+            entries, size = self.backend.usage()
+        except CACHE_BACKEND_ERRORS:
+            entries = size = None
+        with self.lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                "enabled": self.enabled,
+                "backend": self.backend.name,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "bytes": size,
+                "hits": self.counters["hits"],
+                "misses": self.counters["misses"],
+                "hit_ratio": round(self.counters["hits"] / lookups, 3) if lookups else None,
+                "evictions": self.counters["evictions"],
+                "expirations": self.counters["expirations"],
+                "invalidations": self.counters["invalidations"],
+                "errors": self.counters["errors"],
+            }
+
+
+response_cache = ResponseCache(cache_backend, app.config["RESPONSE_CACHE_SIZE"], app.config["RESPONSE_CACHE_TTL"])
+table_versions.listeners.append(response_cache.invalidate_tables)
+# Tables recreated from scratch (tests, dev resets) make every cached body stale
+event.listen(db.metadata, "after_drop", lambda *args, **kwargs: response_cache.clear())
+
+
+def cached_response(*models):
+    """Serve the view from response_cache; `models` are the tables its output depends on."""
+    tables = tuple(m.__table__.name for m in models)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled:
+                return view(*args, **kwargs)
+            key = response_cache.key(request)
+            entry = response_cache.get(key)
+            if entry is not None:
+                return Response(entry.body, mimetype=entry.mimetype, headers={"X-Cache": "HIT"})
+
+            # Versions are read before the view runs, so a write racing with it leaves the entry stale
+            versions = tuple(table_versions.get(t)[0] for t in tables)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                response_cache.put(key, response.get_data(), response.mimetype, tables, versions)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
+
+
+
+# --- Liczniki dashboardu ---
+
+# Counter name -> (model, status column and the values counted, or None for every row)
+DASHBOARD_COUNTERS = {
+    "graves": (Grave, None),
+    "requests": (ServiceRequest, ("status_code", ["pending"])),
+    "requests_total": (ServiceRequest, None),
+    "messages": (ContactMessage, ("status", ["Nowa"])),
+    "reservations": (Reservation, ("status", ["Nowa"])),
+}
+COUNTERS_BY_TABLE = {}
+for _counter, (_model, _) in DASHBOARD_COUNTERS.items():
+    COUNTERS_BY_TABLE.setdefault(_model.__table__.name, []).append(_counter)
+
+event.listen(DashboardCounter.__table__, "after_create",
+             lambda target, connection, **kw: connection.execute(
+                 target.insert(), [{"name": name, "value": 0} for name in DASHBOARD_COUNTERS]))
+
+
+def count_dashboard_counter(conn, name):
+    model, condition = DASHBOARD_COUNTERS[name]
+    query = db.select(db.func.count()).select_from(model)
+    if condition is not None:
+        column, values = condition
+        query = query.where(getattr(model, column).in_(values))
+    return conn.execute(query).scalar()
+
+
+def store_dashboard_counter(conn, name, value=None, delta=None):
+    table = DashboardCounter.__table__
+    update = table.update().where(table.c.name == name)
+    update = update.values(value=table.c.value + delta) if delta is not None else update.values(value=value)
+    if conn.execute(update).rowcount == 0:
+        conn.execute(table.insert().values(name=name, value=value if delta is None else
+                                           count_dashboard_counter(conn, name)))
+
+
+def read_dashboard_counters():
+    """All counters in one primary-key read; missing rows read as 0."""
+    values = dict(db.session.query(DashboardCounter.name, DashboardCounter.value))
+    return {name: values.get(name, 0) for name in DASHBOARD_COUNTERS}
+
+
+def reconcile_dashboard_counters():
+    """Recount every counter, repair the stored values and return the drift found."""
+    stored = read_dashboard_counters()
+    conn = db.session.connection()
+    drift = {}
+    for name in DASHBOARD_COUNTERS:
+        actual = count_dashboard_counter(conn, name)
+        if stored[name] != actual:
+            drift[name] = {"stored": stored[name], "actual": actual}
+            store_dashboard_counter(conn, name, value=actual)
+    db.session.commit()
+    return drift
+
+
+@event.listens_for(db.session, "after_flush")
+def apply_counter_deltas(session, flush_context):
+    """Adjust the counters in the flush's own transaction.
+
+    Rows whose previous status isn't known (not loaded) fall back to a
+    recount at commit time.
+    """
+    deltas = Counter()
+    stale = session.info.setdefault("stale_counters", set())
+    changes = [(obj, 1) for obj in session.new] + [(obj, -1) for obj in session.deleted] + \
+              [(obj, 0) for obj in session.dirty]
+    for obj, sign in changes:
+        for name in COUNTERS_BY_TABLE.get(getattr(getattr(obj, "__table__", None), "name", None), ()):
+            condition = DASHBOARD_COUNTERS[name][1]
+            if condition is None:
+                deltas[name] += sign
+                continue
+            column, values = condition
+            attr = inspect(obj).attrs[column]
+            if sign:
+                if attr.loaded_value is NO_VALUE:
+                    stale.add(name)
+                elif attr.loaded_value in values:
+                    deltas[name] += sign
+                continue
+            history = attr.history
+            if not history.added:
+                continue
+            if not history.deleted:
+                stale.add(name)
+                continue
+            deltas[name] += (history.added[0] in values) - (history.deleted[0] in values)
+    conn = session.connection()
+    for name, delta in deltas.items():
+        if delta and name not in stale:
+            store_dashboard_counter(conn, name, delta=delta)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def collect_stale_counters(orm_execute_state):
+    """Bulk statements (Query.update/delete, Core inserts) are recounted at commit."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        names = COUNTERS_BY_TABLE.get(getattr(table, "name", None))
+        if names:
+            orm_execute_state.session.info.setdefault("stale_counters", set()).update(names)
+
+
+@event.listens_for(db.session, "before_commit")
+def recount_stale_counters(session):
+    # Flush first (commit would anyway): the final flush can mark counters stale too,
+    # and the recount must see its rows
+    session.flush()
+    names = session.info.pop("stale_counters", None)
+    if names:
+        conn = session.connection()
+        for name in names:
+            store_dashboard_counter(conn, name, value=count_dashboard_counter(conn, name))
+
+
+@event.listens_for(db.session, "after_rollback")
+def discard_stale_counters(session):
+    session.info.pop("stale_counters", None)
+
+
 # --- Trasy (Routes) ---
 
 @app.route("/")
@@ -501,77 +3072,143 @@ def login():
 
 # --- Admin API ---
 
+def parse_calendar_window(args):
+    """?from=&to= (YYYY-MM-DD, both inclusive) as a pair of dates; a missing bound is None."""
+    bounds = []
+    for arg in ("from", "to"):
+        raw = (args.get(arg) or "").strip()
+        if not raw:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(datetime.strptime(raw, "%Y-%m-%d").date())
+        except ValueError:
+            raise BadRequestError(f"Invalid '{arg}' date: {raw} (expected YYYY-MM-DD)")
+    first, last = bounds
+    if first and last and first > last:
+        raise BadRequestError("'from' must not be after 'to'")
+    return first, last
+
+
+def created_window(created, first, last):
+    """Conditions keeping `created` (a DATETIME column) within the inclusive date range."""
+    conditions = []
+    if first:
+        conditions.append(created >= datetime(first.year, first.month, first.day))
+    if last:
+        conditions.append(created < datetime(last.year, last.month, last.day) + timedelta(days=1))
+    return conditions
+
+
+def scheduled_event_rows(model, columns, first, last):
+    """Rows of `model` on the calendar, as two range scans of its (scheduled_on, created_at) index.
+
+    Rows with a scheduled day come first, then unscheduled ones on the day
+    they were created; each query is ordered by its `day`. Unscheduled rows
+    carry a non-empty scheduled_date that didn't parse as `unparsed_date`.
+    """
+    scheduled = db.session.query(*columns, model.scheduled_on.label("day"), db.null().label("unparsed_date")) \
+        .filter(model.scheduled_on.isnot(None))
+    if first:
+        scheduled = scheduled.filter(model.scheduled_on >= first)
+    if last:
+        scheduled = scheduled.filter(model.scheduled_on <= last)
+    unscheduled = db.session.query(*columns, model.created_at.label("day"),
+                                   model.scheduled_date.label("unparsed_date")).filter(
+        model.scheduled_on.is_(None), model.created_at.isnot(None),
+        *created_window(model.created_at, first, last))
+    return [scheduled.order_by(model.scheduled_on, model.created_at).all(),
+            unscheduled.order_by(model.created_at, model.id).all()]
+
+
+def event_day(value):
+    return (value.date() if isinstance(value, datetime) else value).isoformat()
+
+
+def with_unparsed_date(event, row):
+    """Keep a scheduled_date that isn't a date visible on an event placed on its creation day."""
+    raw = (row.unparsed_date or "").strip()
+    if raw:
+        event["scheduledDate"] = raw
+        event["details"] += f" (termin: {raw})"
+    return event
+
+
+def request_event(row):
+    return with_unparsed_date({
+        "id": f"req_{row.id}",
+        "title": f"Usługa: {row.service_type}",
+        "date": event_day(row.day),
+        "type": "request",
+        "status": row.status,
+        "details": f"Klient: {row.customer_name}"
+    }, row)
+
+
+def reservation_event(row):
+    return with_unparsed_date({
+        "id": f"res_{row.id}",
+        "title": f'Rezerwacja: {row.section or "Brak sekcji"}',
+        "date": event_day(row.day),
+        "type": "reservation",
+        "status": row.status,
+        "details": f"Klient: {row.name}"
+    }, row)
+
+
+def message_event(row):
+    return {
+        "id": f"msg_{row.id}",
+        "title": f"Wiadomość od {row.name}",
+        "date": event_day(row.day),
+        "type": "message",
+        "status": row.status,
+        "details": row.preview + "..." if row.preview else ""
+    }
+
+
+CALENDAR_TYPES = ("request", "reservation", "message")
+CALENDAR_MAX_DAYS = 366
+
+
+def calendar_events(first, last, types=CALENDAR_TYPES):
+    """Events of the given types between the inclusive bounds, merged in date order.
+
+    Every source query is already sorted by its day, so the streams are
+    merged rather than sorted; only the columns an event shows are read.
+    """
+    streams = []
+    if "request" in types:
+        columns = (ServiceRequest.id, ServiceRequest.service_type, ServiceRequest.status_code.label("status"),
+                   ServiceRequest.customer_name)
+        streams += [map(request_event, rows) for rows in scheduled_event_rows(ServiceRequest, columns, first, last)]
+    if "reservation" in types:
+        columns = (Reservation.id, Reservation.section, Reservation.status, Reservation.name)
+        streams += [map(reservation_event, rows) for rows in scheduled_event_rows(Reservation, columns, first, last)]
+    if "message" in types:
+        # Only a preview of the message body is shipped
+        messages = db.session.query(
+            ContactMessage.id, ContactMessage.name, ContactMessage.status,
+            ContactMessage.created_at.label("day"),
+            db.func.substr(ContactMessage.message, 1, 50).label("preview")
+        ).filter(ContactMessage.created_at.isnot(None), *created_window(ContactMessage.created_at, first, last))
+        streams.append(map(message_event, messages.order_by(ContactMessage.created_at, ContactMessage.id).all()))
+    return list(heapq.merge(*streams, key=lambda event: event["date"]))
+
+
 @app.route("/api/admin/dashboard", methods=["GET"])
 def get_dashboard_data():
+    """Stats plus calendar events; ?from=&to= limits the events to the visible range."""
+    first, last = parse_calendar_window(request.args)
     try:
-        # Stats
-        graves_count = Grave.query.count()
-        
-        # Count pending requests (handle various status strings)
-        pending_statuses = ["pending", "Nowe", "Oczekujące", "oczekujace", "new"]
-        requests_count = ServiceRequest.query.filter(ServiceRequest.status.in_(pending_statuses)).count()
-        
-        messages_count = ContactMessage.query.filter(ContactMessage.status == "Nowa").count()
-        reservations_count = Reservation.query.filter(Reservation.status == "Nowa").count()
-
-        # Calendar Events
-        events = []
-
-        # Service Requests
-        requests = ServiceRequest.query.all()
-        for req in requests:
-            # Prefer scheduled_date, fallback to created_at
-            date_str = req.scheduled_date
-            if not date_str and req.created_at:
-                date_str = req.created_at.strftime("%Y-%m-%d")
-            
-            if date_str:
-                # Normalize date format if needed, assuming YYYY-MM-DD stored
-                events.append({
-                    "id": f"req_{req.id}",
-                    "title": f"Usługa: {req.service_type}",
-                    "date": date_str,
-                    "type": "request",
-                    "status": req.status,
-                    "details": f"Klient: {req.customer_name}"
-                })
-
-        # Reservations
-        reservations = Reservation.query.all()
-        for res in reservations:
-            date_str = res.scheduled_date
-            if not date_str and res.created_at:
-                date_str = res.created_at.strftime("%Y-%m-%d")
-                
-            if date_str:
-                events.append({
-                    "id": f"res_{res.id}",
-                    "title": f'Rezerwacja: {res.section or "Brak sekcji"}',
-                    "date": date_str,
-                    "type": "reservation",
-                    "status": res.status,
-                    "details": f"Klient: {res.name}"
-                })
-
-        # Messages
-        messages = ContactMessage.query.all()
-        for msg in messages:
-            if msg.created_at:
-                events.append({
-                    "id": f"msg_{msg.id}",
-                    "title": f"Wiadomość od {msg.name}",
-                    "date": msg.created_at.strftime("%Y-%m-%d"),
-                    "type": "message",
-                    "status": msg.status,
-                    "details": msg.message[:50] + "..." if msg.message else ""
-                })
-
+        counters = read_dashboard_counters()
+        events = calendar_events(first, last)
         return jsonify({
             "stats": {
-                "graves": graves_count,
-                "requests": requests_count,
-                "messages": messages_count,
-                "reservations": reservations_count
+                "graves": counters["graves"],
+                "requests": counters["requests"],
+                "messages": counters["messages"],
+                "reservations": counters["reservations"]
             },
             "events": events
         })
@@ -579,6 +3216,23 @@ def get_dashboard_data():
         print(f"Dashboard Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/admin/calendar", methods=["GET"])
+def get_calendar():
+    """Request, reservation and message events for ?from=&to= (required), sorted by date.
+
+    ?type= narrows it to a comma-separated subset of CALENDAR_TYPES.
+    """
+    first, last = parse_calendar_window(request.args)
+    if not first or not last:
+        raise BadRequestError("'from' and 'to' are required")
+    if (last - first).days >= CALENDAR_MAX_DAYS:
+        raise BadRequestError(f"At most {CALENDAR_MAX_DAYS} days per request")
+    types = [t.strip() for t in (request.args.get("type") or "").split(",") if t.strip()] or CALENDAR_TYPES
+    unknown = [t for t in types if t not in CALENDAR_TYPES]
+    if unknown:
+        raise BadRequestError(f"Unknown type: {', '.join(unknown)} (expected {', '.join(CALENDAR_TYPES)})")
+    return jsonify(calendar_events(first, last, types))
+
 @app.route("/api/admin/users", methods=["GET"])
 def get_users():
     users = User.query.all()
@@ -646,45 +3300,584 @@ def delete_user(id):
     db.session.commit()
     return jsonify({"message": "User deleted"})
 
-@app.route("/api/graves", methods=["GET"])
-def get_graves():
-    query = Grave.query
-    
-    # Filter by name
-    name = request.args.get("name")
-    if name:
-        query = query.filter(Grave.name.ilike(f"%{name}%"))
-        
-    # Filter by year of death
-    year = request.args.get("year")
+# --- Keyset Pagination ---
+
+PAGE_DEFAULT_LIMIT = 100
+PAGE_MAX_LIMIT = 1000
+
+
+def encode_cursor(values):
+    """Encode last-row sort key as an opaque, URL-safe cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decode cursor produced by encode_cursor; raises ValueError when malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_page_limit(raw_limit):
+    """Clamp requested page size to 1..PAGE_MAX_LIMIT (default PAGE_DEFAULT_LIMIT)."""
+    if raw_limit in (None, ""):
+        return PAGE_DEFAULT_LIMIT
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid limit")
+    return max(1, min(limit, PAGE_MAX_LIMIT))
+
+
+def keyset_page(query, columns, cursor, limit):
+    """Fetch one page ordered by `columns` (last one must be unique, e.g. id).
+
+    Returns (rows, next_cursor). The WHERE clause is expanded to
+    (a > x) OR (a = x AND b > y) so it can be served by a composite index.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise ValueError("Invalid cursor")
+        conditions = []
+        for i, column in enumerate(columns):
+            equal_prefix = [columns[j] == values[j] for j in range(i)]
+            conditions.append(and_(*equal_prefix, column > values[i]))
+        query = query.filter(or_(*conditions))
+
+    rows = query.order_by(*columns).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
+
+
+def is_truthy(value):
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+# --- Projekcja pól (fields= / profile=compact) ---
+
+class BadRequestError(ValueError):
+    """Invalid client input; rendered as a JSON 400 by the error handler below."""
+
+
+@app.errorhandler(BadRequestError)
+def handle_bad_request(e):
+    return jsonify({"error": str(e)}), 400
+
+
+def requested_fields(model):
+    """Field list from ?fields=a,b or ?profile=compact; None means the full to_dict()."""
+    raw = request.args.get("fields")
+    if raw:
+        fields = [f.strip() for f in raw.split(",") if f.strip()]
+    elif request.args.get("profile") == "compact" and hasattr(model, "COMPACT_FIELDS"):
+        fields = list(model.COMPACT_FIELDS)
+    else:
+        return None
+    field_columns(model, fields)
+    return fields
+
+
+def empty_row(model):
+    return SimpleNamespace(**dict.fromkeys(model.__table__.columns.keys()))
+
+
+def field_columns(model, fields, extra=()):
+    """Columns to SELECT for the given API fields (plus `extra` columns, e.g. sort keys)."""
+    mapping = getattr(model, "API_FIELD_COLUMNS", {})
+    api_fields = model.to_dict(empty_row(model)).keys()
+    unknown = [field for field in fields if field not in api_fields]
+    if unknown:
+        raise BadRequestError(f"Unknown field: {', '.join(unknown)}")
+    needed = ["id"]
+    for field in list(fields) + list(extra):
+        columns = mapping.get(field, (field,))
+        needed.extend(c for c in columns if c not in needed)
+    return needed
+
+
+def project_row(model, row, fields):
+    """Serialize a partial row through the model's own to_dict(), keeping only `fields`.
+
+    Unselected columns read as None, so to_dict() never triggers lazy loads.
+    """
+    values = empty_row(model)
+    values.__dict__.update(row._mapping)
+    data = model.to_dict(values)
+    return {field: data[field] for field in fields}
+
+
+def project_query(query, model, fields, extra=()):
+    """Restrict `query` to the columns needed for `fields`."""
+    columns = field_columns(model, fields, extra)
+    return query.with_entities(*[getattr(model, c) for c in columns])
+
+
+def serialize_list(query, model):
+    """List endpoint body honouring ?fields= / ?profile=compact."""
+    fields = requested_fields(model)
+    if fields is None:
+        return [obj.to_dict() for obj in query.all()]
+    return [project_row(model, row, fields) for row in project_query(query, model, fields).all()]
+
+
+STREAM_BATCH_SIZE = 500
+
+
+def query_batches(query):
+    """Rows of `query` in lists of STREAM_BATCH_SIZE, read through a server-side cursor."""
+    batch = []
+    # Run on the session of the context the stream is iterated in: the view's
+    # session was removed at request teardown, and a query still bound to it
+    # would hold its connection until garbage collection.
+    for row in query.with_session(db.session()).yield_per(STREAM_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) == STREAM_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_json_array(query, serialize):
+    """Stream `query` as a JSON array: rows come in yield_per batches and each
+    batch is written out before the next is fetched, so memory stays flat and
+    the first bytes leave before the query is exhausted.
+
+    Results shorter than one batch are sent as a plain buffered response;
+    only the probe for them (LIMIT STREAM_BATCH_SIZE) is read twice.
+    """
+    rows = query.limit(STREAM_BATCH_SIZE).all()
+    if len(rows) < STREAM_BATCH_SIZE:
+        return jsonify([serialize(row) for row in rows])
+    return stream_json_batches(query_batches(query), serialize)
+
+
+def stream_json_sequence(items, serialize):
+    """stream_json_array for rows already in memory (the grave search index)."""
+    if len(items) < STREAM_BATCH_SIZE:
+        return jsonify([serialize(item) for item in items])
+    batches = (items[i:i + STREAM_BATCH_SIZE] for i in range(0, len(items), STREAM_BATCH_SIZE))
+    return stream_json_batches(batches, serialize)
+
+
+def stream_json_batches(batches, serialize):
+    """Streamed JSON array body, one chunk per batch of rows."""
+    def generate():
+        yield "["
+        separator = ""
+        for batch in batches:
+            yield separator + ",".join(app.json.dumps(serialize(row)) for row in batch)
+            separator = ","
+        yield "]"
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+def stream_list(query, model):
+    """Streaming counterpart of serialize_list for potentially large tables."""
+    fields = requested_fields(model)
+    if fields is None:
+        return stream_json_array(query, lambda obj: obj.to_dict())
+    return stream_json_array(project_query(query, model, fields), lambda row: project_row(model, row, fields))
+
+
+def parse_date_bound(raw):
+    """Parse range bound "YYYY" or "YYYY-MM-DD" into (date or None, year or None)."""
+    raw = raw.strip()
+    if YEAR_ONLY.match(raw):
+        return None, int(raw)
+    try:
+        return datetime.strptime(raw, "%Y-%m-%d").date(), None
+    except ValueError:
+        raise ValueError(f"Invalid date: {raw}")
+
+
+def filter_grave_dates(query, args):
+    """Apply year, died_from/died_to and born_from/born_to filters.
+
+    Year bounds compare the integer year column, so graves with only a
+    year recorded still match; full dates compare the DATE column, falling
+    back to the year for graves without a full date (their year counts as
+    within the bound when it is the bound's year).
+    """
+    year = args.get("year")
     if year:
-        query = query.filter(Grave.death_date.contains(year))
-        
-    # Filter by section
-    section = request.args.get("section")
+        if not YEAR_ONLY.match(year.strip()):
+            raise ValueError(f"Invalid year: {year}")
+        query = query.filter(Grave.death_year == int(year))
+
+    bounds = [
+        ("died_from", Grave.died_on, Grave.death_year, False),
+        ("died_to", Grave.died_on, Grave.death_year, True),
+        ("born_from", Grave.born_on, Grave.birth_year, False),
+        ("born_to", Grave.born_on, Grave.birth_year, True),
+    ]
+    for arg, date_column, year_column, upper in bounds:
+        raw = args.get(arg)
+        if not raw:
+            continue
+        bound_date, bound_year = parse_date_bound(raw)
+        if bound_year is not None:
+            query = query.filter(year_column <= bound_year if upper else year_column >= bound_year)
+        else:
+            query = query.filter(db.or_(
+                date_column <= bound_date if upper else date_column >= bound_date,
+                db.and_(date_column.is_(None),
+                        year_column <= bound_date.year if upper else year_column >= bound_date.year)
+            ))
+    return query
+
+
+def section_filter(section):
+    """Case-insensitive match on Grave.section through the folded, indexed search_section."""
+    return Grave.search_section == section_key(section)
+
+
+def graves_at(section, row, plot):
+    """Point lookup on (section, row, plot) served by ix_grave_location."""
+    return Grave.query.filter(
+        section_filter(section),
+        Grave.row == str(row).strip(),
+        Grave.plot == str(plot).strip()
+    ).order_by(Grave.id).all()
+
+
+def parse_bbox(args):
+    """Read minx/miny/maxx/maxy query params; raises BadRequestError when missing or inverted."""
+    bbox = {}
+    for key in ("minx", "miny", "maxx", "maxy"):
+        raw = args.get(key, "").strip()
+        try:
+            bbox[key] = float(raw)
+        except ValueError:
+            raise BadRequestError(f"{key} must be a number")
+        if not math.isfinite(bbox[key]):
+            raise BadRequestError(f"{key} must be a number")
+    if bbox["minx"] > bbox["maxx"] or bbox["miny"] > bbox["maxy"]:
+        raise BadRequestError("min values must not exceed max values")
+    return bbox
+
+
+def filter_grave_bbox(query, bbox):
+    """Restrict to graves whose (coord_x, coord_y) lies inside bbox (edges included).
+
+    On SQLite the R*Tree narrows candidates in O(log n + k); its 32-bit
+    float boxes are rounded outwards, so the exact comparison below trims
+    the few edge hits. On MySQL MBRContains over the SPATIAL index on
+    coord_point does the same, with the box widened by half a unit so points
+    on its edges (MBRContains excludes the boundary) stay in. Other
+    databases use the ix_grave_coords range scan.
+    """
+    dialect = db.engine.dialect.name
+    if SQLITE_RTREE and dialect == "sqlite":
+        candidates = db.select(grave_rtree.c.id).where(
+            grave_rtree.c.min_x <= bbox["maxx"], grave_rtree.c.max_x >= bbox["minx"],
+            grave_rtree.c.min_y <= bbox["maxy"], grave_rtree.c.max_y >= bbox["miny"]
+        )
+        query = query.filter(Grave.id.in_(candidates))
+    elif dialect == "mysql":
+        envelope = db.func.ST_MakeEnvelope(db.func.Point(bbox["minx"] - 0.5, bbox["miny"] - 0.5),
+                                           db.func.Point(bbox["maxx"] + 0.5, bbox["maxy"] + 0.5))
+        query = query.filter(db.func.MBRContains(envelope, grave_point))
+    return query.filter(
+        Grave.coord_x.between(bbox["minx"], bbox["maxx"]),
+        Grave.coord_y.between(bbox["miny"], bbox["maxy"])
+    )
+
+
+def page_from_list(items, sort_key, cursor, limit):
+    """Keyset pagination over an already sorted in-memory list (same cursors as keyset_page)."""
+    start = 0
+    if cursor:
+        values = tuple(decode_cursor(cursor))
+        if items and len(values) != len(sort_key(items[0])):
+            raise ValueError("Invalid cursor")
+        try:
+            start = bisect_right([sort_key(item) for item in items], values)
+        except TypeError:
+            raise ValueError("Invalid cursor")
+    page = items[start:start + limit]
+    next_cursor = None
+    if start + limit < len(items):
+        next_cursor = encode_cursor(list(sort_key(page[-1])))
+    return page, next_cursor
+
+
+DATE_RANGE_ARGS = ("died_from", "died_to", "born_from", "born_to")
+
+
+def filter_graves(query, args):
+    """Name, year/date-range and section filters shared by get_graves and the export."""
+    name = args.get("name")
+    if name:
+        query = filter_grave_name(query, name)
+
+    # Year of death and birth/death ranges (indexed typed columns)
+    query = filter_grave_dates(query, args)
+
+    section = args.get("section")
     if section:
-        query = query.filter(Grave.section.ilike(section))
+        query = query.filter(section_filter(section))
+    return query
+
+
+def get_graves_from_index():
+    """Serve get_graves from grave_search_index (same params and response shapes)."""
+    year = request.args.get("year")
+    if year and not YEAR_ONLY.match(year.strip()):
+        return jsonify({"error": f"Invalid year: {year}"}), 400
+
+    snaps = grave_search_index.search(
+        name=request.args.get("name"),
+        section=request.args.get("section"),
+        year=int(year) if year else None
+    )
+
+    if request.args.get("sort", "id") == "name":
+        sort_key = lambda snap: (snap.name, snap.id)
+    else:
+        sort_key = lambda snap: (snap.id,)
+    snaps.sort(key=sort_key)
+
+    fields = requested_fields(Grave)
+    if fields is None:
+        serialize = lambda snap: snap.doc
+    else:
+        serialize = lambda snap: {field: snap.doc.get(field) for field in fields}
+
+    if is_truthy(request.args.get("all", "")):
+        return stream_json_sequence(snaps, serialize)
 
-    graves = query.all()
-    return jsonify([g.to_dict() for g in graves])
+    try:
+        limit = parse_page_limit(request.args.get("limit"))
+        page, next_cursor = page_from_list(snaps, sort_key, request.args.get("cursor"), limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "items": [serialize(snap) for snap in page],
+        "next_cursor": next_cursor,
+        "limit": limit
+    })
+
+
+@app.route("/api/graves", methods=["GET"])
+@cached_response(Grave)
+def get_graves():
+    # Date ranges are only indexed in the DB; everything else can be served from memory
+    if grave_search_index.enabled and not any(request.args.get(a) for a in DATE_RANGE_ARGS) \
+            and grave_search_index.ensure_ready():
+        return get_graves_from_index()
+
+    try:
+        query = filter_graves(Grave.query, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    fields = requested_fields(Grave)
+    if fields is None:
+        serialize = lambda grave: grave.to_dict()
+    else:
+        query = project_query(query, Grave, fields, extra=["name"])
+        serialize = lambda row: project_row(Grave, row, fields)
+
+    # Legacy shape (plain list of every match) is opt-in via ?all=1
+    if is_truthy(request.args.get("all", "")):
+        return stream_json_array(query, serialize)
+
+    sort = request.args.get("sort", "id")
+    columns = [Grave.name, Grave.id] if sort == "name" else [Grave.id]
+    try:
+        limit = parse_page_limit(request.args.get("limit"))
+        graves, next_cursor = keyset_page(query, columns, request.args.get("cursor"), limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "items": [serialize(g) for g in graves],
+        "next_cursor": next_cursor,
+        "limit": limit
+    })
 
 @app.route("/api/admin/graves", methods=["GET"])
 def get_admin_graves():
     return get_graves()
 
+@app.route("/api/graves/fuzzy", methods=["GET"])
+@cached_response(Grave)
+def get_graves_fuzzy():
+    name = request.args.get("name", "")
+    if not fold_text(name):
+        return jsonify({"error": "name is required"}), 400
+    try:
+        limit = min(parse_page_limit(request.args.get("limit", 10)), 50)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    grave_fuzzy_index.ensure_ready()
+    result = grave_fuzzy_index.suggest(name, limit=limit)
+    ranked = result.pop("graves")
+    graves = {g.id: g for g in Grave.query.filter(Grave.id.in_([gid for gid, _ in ranked])).all()}
+    result["query"] = name
+    result["graves"] = [
+        dict(graves[gid].to_dict(), distance=distance)
+        for gid, distance in ranked if gid in graves
+    ]
+    return jsonify(result)
+
+@app.route("/api/graves/suggest", methods=["GET"])
+@cached_response(Grave)
+def get_graves_suggest():
+    q = request.args.get("q", "")
+    try:
+        limit = min(parse_page_limit(request.args.get("limit", 10)), 50)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    grave_suggest_index.ensure_ready()
+    return jsonify({
+        "query": q,
+        "suggestions": grave_suggest_index.suggest(q, limit=limit)
+    })
+
+@app.route("/api/graves/map", methods=["GET"])
+def get_graves_map():
+    fmt = request.args.get("format", "json")
+    if fmt not in ("json", "bin"):
+        return jsonify({"error": "format must be json or bin"}), 400
+
+    raw, gzipped, etag = grave_map_cache.get(fmt)
+    use_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+    if use_gzip:
+        # Each encoding is its own representation, so it needs its own strong tag
+        etag = f"{etag}-gz"
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+
+    body = raw
+    if use_gzip:
+        body = gzipped
+        headers["Content-Encoding"] = "gzip"
+    mimetype = "application/octet-stream" if fmt == "bin" else "application/json"
+    return Response(body, mimetype=mimetype, headers=headers)
+
+@app.route("/api/graves/clusters", methods=["GET"])
+@cached_response(Grave)
+def get_grave_clusters():
+    try:
+        zoom = int(request.args.get("zoom", 0))
+    except ValueError:
+        return jsonify({"error": "zoom must be an integer"}), 400
+    zoom = max(0, min(zoom, GraveClusterIndex.MAX_ZOOM))
+    bbox = parse_bbox(request.args) if "minx" in request.args else None
+
+    grave_cluster_index.ensure_ready()
+    return jsonify({
+        "zoom": zoom,
+        "maxZoom": GraveClusterIndex.MAX_ZOOM,
+        "cellSize": GraveClusterIndex.BASE_CELL / 2 ** zoom,
+        "clusters": grave_cluster_index.clusters(zoom, bbox)
+    })
+
+@app.route("/api/graves/at", methods=["GET"])
+@cached_response(Grave)
+def get_graves_at():
+    section = request.args.get("section", "")
+    row = request.args.get("row", "")
+    plot = request.args.get("plot", "")
+    if not (section.strip() and row.strip() and plot.strip()):
+        return jsonify({"error": "section, row and plot are required"}), 400
+
+    graves = graves_at(section, row, plot)
+    return jsonify({
+        "section": section,
+        "row": row,
+        "plot": plot,
+        "occupied": bool(graves),
+        "count": len(graves),
+        "graves": [g.to_dict() for g in graves]
+    })
+
+@app.route("/api/graves/in-bbox", methods=["GET"])
+@cached_response(Grave)
+def get_graves_in_bbox():
+    bbox = parse_bbox(request.args)
+    fields = requested_fields(Grave)
+    query = filter_grave_bbox(Grave.query, bbox)
+    if fields is not None:
+        query = project_query(query, Grave, fields)
+
+    try:
+        limit = parse_page_limit(request.args.get("limit"))
+        rows, next_cursor = keyset_page(query, [Grave.id], request.args.get("cursor"), limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if fields is None:
+        items = [g.to_dict() for g in rows]
+    else:
+        items = [project_row(Grave, row, fields) for row in rows]
+    return jsonify({
+        "bbox": bbox,
+        "items": items,
+        "next_cursor": next_cursor,
+        "limit": limit
+    })
+
+@app.route("/api/admin/graves/duplicates", methods=["GET"])
+def get_duplicate_plots():
+    # GROUP BY on the indexed (search_section, row, plot) prefix - no table scan of other columns;
+    # sections differing only in case are the same plot
+    rows = db.session.query(
+        db.func.min(Grave.section), Grave.row, Grave.plot, db.func.count(Grave.id)
+    ).filter(
+        Grave.search_section.isnot(None), Grave.row.isnot(None), Grave.plot.isnot(None)
+    ).group_by(Grave.search_section, Grave.row, Grave.plot).having(db.func.count(Grave.id) > 1).all()
+    return jsonify([{
+        "section": section,
+        "row": row,
+        "plot": plot,
+        "count": count
+    } for section, row, plot, count in rows])
+
+def parse_grave_coordinates(coordinates):
+    """(x, y) from {"x": .., "y": ..} or "x,y"; None or a string without a comma means (0, 0).
+
+    Raises ValueError for non-integer values and for any other type.
+    """
+    if coordinates is None:
+        return 0, 0
+    if not isinstance(coordinates, (dict, str)):
+        raise ValueError("coordinates must be an object or an \"x,y\" string")
+    try:
+        if isinstance(coordinates, dict):
+            return int(coordinates.get("x", 0)), int(coordinates.get("y", 0))
+        if "," in coordinates:
+            parts = coordinates.split(",")
+            return int(parts[0]), int(parts[1])
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid coordinates: {e}")
+    return 0, 0
+
+
 @app.route("/api/graves", methods=["POST"])
 def add_grave():
     data = request.json
-    coordinates = data.get("coordinates", "0,0")
-    cx, cy = 0, 0
-    if isinstance(coordinates, dict):
-        cx = int(coordinates.get("x", 0))
-        cy = int(coordinates.get("y", 0))
-    elif isinstance(coordinates, str) and "," in coordinates:
-        parts = coordinates.split(",")
-        if len(parts) >= 2:
-            cx = int(parts[0])
-            cy = int(parts[1])
+    try:
+        cx, cy = parse_grave_coordinates(data.get("coordinates", "0,0"))
+    except ValueError:
+        return jsonify({"error": "Invalid coordinates"}), 400
 
     new_grave = Grave(
         name=data.get("name"),
@@ -746,6 +3939,148 @@ def delete_grave(id):
 def delete_admin_grave(id):
     return delete_grave(id)
 
+# --- Import grobów (CSV / NDJSON) ---
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_ERRORS = 100
+# Input keys (API names, as produced by the export) -> grave columns
+IMPORT_TEXT_FIELDS = {
+    "name": "name",
+    "birthDate": "birth_date",
+    "deathDate": "death_date",
+    "section": "section",
+    "row": "row",
+    "plot": "plot",
+}
+
+
+def grave_import_values(data):
+    """Validate one input record and return the full grave column dict.
+
+    Derived columns are filled here because Core inserts skip the model validators.
+    """
+    values = {}
+    for key, column in IMPORT_TEXT_FIELDS.items():
+        value = data.get(key)
+        value = str(value).strip() if value is not None else ""
+        limit = Grave.__table__.columns[column].type.length
+        if len(value) > limit:
+            raise ValueError(f"{key} longer than {limit} characters")
+        values[column] = value or None
+    if not values["name"]:
+        raise ValueError("name is required")
+
+    coordinates = data.get("coordinates")
+    if not coordinates and (data.get("x") not in (None, "") or data.get("y") not in (None, "")):
+        coordinates = {"x": data.get("x") or 0, "y": data.get("y") or 0}
+    try:
+        values["coord_x"], values["coord_y"] = parse_grave_coordinates(coordinates or "0,0")
+    except ValueError:
+        raise ValueError(f"Invalid coordinates: {coordinates}")
+
+    values["search_name"] = fold_text(values["name"])
+    values["search_section"] = section_key(values["section"]) or None
+    values["born_on"], values["birth_year"] = parse_grave_date(values["birth_date"])
+    values["died_on"], values["death_year"] = parse_grave_date(values["death_date"])
+    return values
+
+
+def read_import_records(stream, fmt):
+    """Yield (line number, record dict or parse error) from a binary CSV/NDJSON stream."""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text_stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+            continue
+        yield line_number, record if isinstance(record, dict) else ValueError("Expected a JSON object")
+
+
+def import_graves(records, batch_size=IMPORT_BATCH_SIZE, dry_run=False, progress=None):
+    """Insert validated graves with one executemany INSERT and commit per batch.
+
+    Rejected records are reported (first IMPORT_MAX_ERRORS) and skipped;
+    batches committed before a database failure stay committed.
+    """
+    started = time.perf_counter()
+    report = {"inserted": 0, "rejected": 0, "batches": 0, "errors": [], "dry_run": dry_run}
+    insert = Grave.__table__.insert()
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            # On the connection, not session.execute: a bulk statement there would
+            # mark the counter stale and recount the whole table every batch
+            conn = db.session.connection()
+            conn.execute(insert, batch)
+            store_dashboard_counter(conn, "graves", delta=len(batch))
+            db.session.commit()
+        report["inserted"] += len(batch)
+        report["batches"] += 1
+        batch.clear()
+        if progress:
+            progress(report)
+
+    try:
+        for line_number, record in records:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                batch.append(grave_import_values(record))
+            except ValueError as e:
+                report["rejected"] += 1
+                if len(report["errors"]) < IMPORT_MAX_ERRORS:
+                    report["errors"].append({"line": line_number, "error": str(e)})
+                continue
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if report["inserted"] and not dry_run:
+            # Core inserts bypass the session change feed
+            rebuild_grave_indexes()
+
+    seconds = time.perf_counter() - started
+    report["seconds"] = round(seconds, 3)
+    report["rows_per_second"] = round(report["inserted"] / seconds, 1) if seconds else None
+    return report
+
+
+@app.route("/api/admin/graves/import", methods=["POST"])
+def import_graves_endpoint():
+    fmt = request.args.get("format")
+    if not fmt:
+        fmt = "csv" if request.mimetype == "text/csv" else "ndjson"
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    try:
+        batch_size = int(request.args.get("batch_size", IMPORT_BATCH_SIZE))
+    except ValueError:
+        return jsonify({"error": "batch_size must be an integer"}), 400
+    batch_size = max(1, min(batch_size, 10 * IMPORT_BATCH_SIZE))
+
+    stream = request.stream
+    if request.headers.get("Content-Encoding") == "gzip":
+        stream = gzip.GzipFile(fileobj=stream)
+    try:
+        report = import_graves(read_import_records(stream, fmt), batch_size,
+                               dry_run=is_truthy(request.args.get("dry_run", "")))
+    except UnicodeDecodeError:
+        return jsonify({"error": "Input must be UTF-8"}), 400
+    return jsonify(report), 200
+
 # --- Service Requests Endpoints ---
 
 @app.route("/api/service-requests", methods=["POST"])
@@ -788,10 +4123,16 @@ def add_service_request():
     db.session.commit()
     return jsonify({"message": "Zgłoszenie przyjęte"}), 201
 
+def filter_service_requests(query, args):
+    """Status filter shared by get_service_requests and the export."""
+    status = args.get("status")
+    if status:
+        query = query.filter(ServiceRequest.status_code == normalize_request_status(status))
+    return query
+
 @app.route("/api/admin/service-requests", methods=["GET"])
 def get_service_requests():
-    requests = ServiceRequest.query.all()
-    return jsonify([r.to_dict() for r in requests])
+    return stream_list(filter_service_requests(ServiceRequest.query, request.args), ServiceRequest)
 
 @app.route("/api/admin/service-requests/<int:id>", methods=["PUT", "PATCH"])
 def update_service_request(id):
@@ -860,8 +4201,7 @@ def add_reservation():
 
 @app.route("/api/admin/reservations", methods=["GET"])
 def get_reservations():
-    reservations = Reservation.query.all()
-    return jsonify([r.to_dict() for r in reservations])
+    return stream_list(Reservation.query, Reservation)
 
 @app.route("/api/admin/reservations/<int:id>", methods=["PUT"])
 def update_reservation(id):
@@ -892,16 +4232,16 @@ def delete_reservation(id):
 # --- Services Endpoints ---
 
 @app.route("/api/services", methods=["GET"])
+@conditional_get(Service)
+@cached_response(Service)
 def get_services():
     # Public endpoint: return only visible services
-    services = Service.query.filter_by(is_visible=True).all()
-    return jsonify([s.to_dict() for s in services])
+    return jsonify(serialize_list(Service.query.filter_by(is_visible=True), Service))
 
 @app.route("/api/admin/services", methods=["GET"])
 def get_admin_services():
     # Admin endpoint: return all services
-    services = Service.query.all()
-    return jsonify([s.to_dict() for s in services])
+    return jsonify(serialize_list(Service.query, Service))
 
 @app.route("/api/admin/services", methods=["POST"])
 def add_service():
@@ -911,7 +4251,6 @@ def add_service():
         slug=data.get("slug"),
         price=data.get("price"),
         category=data.get("category"),
-        type=data.get("type", "basic")
         type=data.get("type", "main"),
         is_visible=data.get("isVisible", True)
     )
@@ -980,8 +4319,7 @@ def submit_contact():
 
 @app.route("/api/admin/contact", methods=["GET"])
 def get_contact_messages():
-    messages = ContactMessage.query.all()
-    return jsonify([m.to_dict() for m in messages])
+    return stream_list(ContactMessage.query, ContactMessage)
 
 @app.route("/api/admin/contact/<int:id>", methods=["PUT"])
 def update_contact_message(id):
@@ -1002,9 +4340,10 @@ def delete_contact_message(id):
 # --- FAQ Endpoints ---
 
 @app.route("/api/faqs", methods=["GET"])
+@conditional_get(FAQ)
+@cached_response(FAQ)
 def get_faqs():
-    faqs = FAQ.query.order_by(FAQ.display_order.asc()).all()
-    return jsonify([f.to_dict() for f in faqs])
+    return jsonify(serialize_list(FAQ.query.order_by(FAQ.display_order.asc()), FAQ))
 
 @app.route("/api/admin/faqs", methods=["POST"])
 def add_faq():
@@ -1038,14 +4377,14 @@ def delete_faq(id):
 # --- Articles Endpoints ---
 
 @app.route("/api/articles", methods=["GET"])
+@conditional_get(Article)
+@cached_response(Article)
 def get_articles():
-    articles = Article.query.filter_by(is_visible=True).all()
-    return jsonify([a.to_dict() for a in articles])
+    return jsonify(serialize_list(Article.query.filter_by(is_visible=True), Article))
 
 @app.route("/api/admin/articles", methods=["GET"])
 def get_admin_articles():
-    articles = Article.query.all()
-    return jsonify([a.to_dict() for a in articles])
+    return jsonify(serialize_list(Article.query, Article))
 
 @app.route("/api/admin/articles", methods=["POST"])
 def add_article():
@@ -1088,9 +4427,202 @@ def delete_article(id):
 # --- Sections Endpoints ---
 
 @app.route("/api/sections", methods=["GET"])
+@conditional_get(Section)
+@cached_response(Section)
 def get_sections():
-    sections = Section.query.all()
-    return jsonify([s.to_dict() for s in sections])
+    return jsonify(serialize_list(Section.query, Section))
+
+@app.route("/api/sections/<int:id>/occupancy", methods=["GET"])
+@cached_response(Grave, Section)
+def get_section_occupancy(id):
+    section = Section.query.get_or_404(id)
+    rows, cols, bitmap, outside = section_occupancy_index.occupancy(section.name)
+    occupied = int.from_bytes(bitmap, "little").bit_count()
+    return jsonify({
+        "section": section.name,
+        "rows": rows,
+        "cols": cols,
+        "occupied": occupied,
+        "free": rows * cols - occupied,
+        "outsideGrid": outside,
+        # Bit (row - 1) * cols + (plot - 1), least significant bit first
+        "bitmap": base64.b64encode(bitmap).decode("ascii")
+    })
+
+@app.route("/api/sections/<int:id>/free-plots", methods=["GET"])
+@cached_response(Grave, Section)
+def get_section_free_plots(id):
+    section = Section.query.get_or_404(id)
+    rows, cols, bitmap, _ = section_occupancy_index.occupancy(section.name)
+    start, end = 0, rows * cols
+    row = request.args.get("row")
+    if row:
+        if not row.strip().isdigit() or not 1 <= int(row) <= rows:
+            return jsonify({"error": f"row must be between 1 and {rows}"}), 400
+        start, end = (int(row) - 1) * cols, int(row) * cols
+
+    try:
+        limit = parse_page_limit(request.args.get("limit"))
+        cursor = request.args.get("cursor")
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 1 or not isinstance(values[0], int):
+                raise ValueError("Invalid cursor")
+            start = max(start, values[0] + 1)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    free = []
+    next_cursor = None
+    for bit in SectionOccupancyIndex.free_cells(bitmap, end, start):
+        if len(free) == limit:
+            next_cursor = encode_cursor([free[-1]])
+            break
+        free.append(bit)
+    return jsonify({
+        "section": section.name,
+        "items": [{"row": str(bit // cols + 1), "plot": str(bit % cols + 1)} for bit in free],
+        "next_cursor": next_cursor,
+        "limit": limit
+    })
+
+NEAREST_FREE_DEFAULT = 5
+NEAREST_FREE_MAX = 50
+# Adjacent plots in one row needed per Reservation.plot_type (folded). Covers
+# the React ReservationDialog values and the Polish names typed in the admin panel.
+PLOT_TYPE_WIDTH = {
+    "single": 1, "cremation": 1, "companion": 2, "family": 3,
+    "pojedynczy": 1, "urna": 1, "urnowy": 1, "podwojny": 2, "rodzinny": 3,
+}
+
+
+def plot_type_width(plot_type):
+    """Width for a plot type, matched on the whole folded value or its first word ("Single Plot")."""
+    folded = fold_text(plot_type)
+    width = PLOT_TYPE_WIDTH.get(folded)
+    if width is None and folded:
+        width = PLOT_TYPE_WIDTH.get(folded.split()[0])
+    return width
+
+
+def nearest_free_plots(section, plot_type, args, strict=True):
+    """Shared body of the nearest-free endpoints; the target is ?grave_id= or ?row=&plot=.
+
+    An unknown plot_type is a 400 when `strict` (sent by the client), else a single plot.
+    """
+    width = 1
+    if plot_type:
+        width = plot_type_width(plot_type)
+        if width is None:
+            if strict:
+                raise BadRequestError(f"Unknown plot_type: {plot_type}")
+            width = 1
+    try:
+        k = int(args.get("k", NEAREST_FREE_DEFAULT))
+    except ValueError:
+        raise BadRequestError("k must be an integer")
+    k = max(1, min(k, NEAREST_FREE_MAX))
+
+    grave_id = args.get("grave_id")
+    if grave_id:
+        grave = db.session.get(Grave, int(grave_id)) if grave_id.isdigit() else None
+        if grave is None:
+            return jsonify({"error": "Grave not found"}), 404
+        section = section or grave.section
+        cell = plot_cell(grave.row, grave.plot)
+        if cell is None or section_key(section) != section_key(grave.section):
+            raise BadRequestError("Grave has no plot position in this section")
+    else:
+        cell = plot_cell(args.get("row"), args.get("plot"))
+        if cell is None:
+            raise BadRequestError("grave_id or positive integer row and plot are required")
+    if not section:
+        raise BadRequestError("section is required")
+
+    found = section_occupancy_index.nearest_free(section, cell[0], cell[1], k, width)
+    if found is None:
+        return jsonify({"error": "Section not found"}), 404
+    return jsonify({
+        "section": section,
+        "from": {"row": str(cell[0] + 1), "plot": str(cell[1] + 1)},
+        "plot_type": plot_type,
+        "items": [{
+            "row": str(r + 1),
+            "plot": str(c + 1),
+            "plots": [str(c + 1 + i) for i in range(width)],
+            "distance": round(distance, 3)
+        } for distance, r, c in found]
+    })
+
+@app.route("/api/plots/nearest-free", methods=["GET"])
+@cached_response(Grave, Section)
+def get_nearest_free_plots():
+    return nearest_free_plots(request.args.get("section"), request.args.get("plot_type"), request.args)
+
+@app.route("/api/admin/reservations/<int:id>/nearest-free", methods=["GET"])
+def get_reservation_nearest_free_plots(id):
+    reservation = Reservation.query.get_or_404(id)
+    section = request.args.get("section") or reservation.section
+    # The stored value is free text; only an explicit ?plot_type= must be known
+    if request.args.get("plot_type"):
+        return nearest_free_plots(section, request.args["plot_type"], request.args)
+    return nearest_free_plots(section, reservation.plot_type, request.args, strict=False)
+
+TILE_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+TILE_MAX_AGE = 365 * 24 * 3600
+
+
+def parse_tile_zoom(raw):
+    try:
+        zoom = int(raw)
+    except (TypeError, ValueError):
+        raise BadRequestError("z must be an integer")
+    if not 0 <= zoom <= GraveTileCache.MAX_ZOOM:
+        raise BadRequestError(f"z must be between 0 and {GraveTileCache.MAX_ZOOM}")
+    return zoom
+
+
+def tile_url(digest):
+    return f"/api/tiles/{digest}.svg"
+
+
+@app.route("/api/sections/<int:id>/tiles", methods=["GET"])
+def get_section_tiles(id):
+    section = Section.query.get_or_404(id)
+    zoom = parse_tile_zoom(request.args.get("z", 0))
+    cols, rows = grave_tile_cache.grid(section, zoom)
+    coords = [(tx, ty) for ty in range(rows) for tx in range(cols)]
+    digests = grave_tile_cache.tiles(section, zoom, coords)
+    return jsonify({
+        "section": section.name,
+        "zoom": zoom,
+        "maxZoom": GraveTileCache.MAX_ZOOM,
+        "tileSize": grave_tile_cache.tile_size(zoom),
+        "tiles": [{"x": tx, "y": ty, "url": tile_url(digests[(tx, ty)])} for tx, ty in coords]
+    })
+
+@app.route("/api/sections/<int:id>/tiles/<int:z>/<int:x>/<int:y>.svg", methods=["GET"])
+def get_section_tile(id, z, x, y):
+    section = Section.query.get_or_404(id)
+    zoom = parse_tile_zoom(z)
+    cols, rows = grave_tile_cache.grid(section, zoom)
+    if x >= cols or y >= rows:
+        return jsonify({"error": "Tile outside section"}), 404
+    digest = grave_tile_cache.tiles(section, zoom, [(x, y)])[(x, y)]
+    # The address is mutable, the content behind the redirect is not
+    response = redirect(tile_url(digest))
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route("/api/tiles/<digest>.svg", methods=["GET"])
+def get_tile(digest):
+    if not TILE_DIGEST.match(digest) or not os.path.exists(grave_tile_cache.path(digest)):
+        return jsonify({"error": "Tile not found"}), 404
+    response = send_from_directory(grave_tile_cache.directory(), f"{digest[:2]}/{digest}.svg",
+                                   mimetype="image/svg+xml", max_age=TILE_MAX_AGE)
+    response.headers["Cache-Control"] = f"public, max-age={TILE_MAX_AGE}, immutable"
+    response.set_etag(digest)
+    return response
 
 @app.route("/api/admin/sections", methods=["POST"])
 def add_section():
@@ -1126,9 +4658,10 @@ def delete_section(id):
 # --- Categories Endpoints ---
 
 @app.route("/api/categories", methods=["GET"])
+@conditional_get(Category)
+@cached_response(Category)
 def get_categories():
-    categories = Category.query.all()
-    return jsonify([c.to_dict() for c in categories])
+    return jsonify(serialize_list(Category.query, Category))
 
 @app.route("/api/admin/categories", methods=["POST"])
 def add_category():
@@ -1138,24 +4671,293 @@ def add_category():
     db.session.commit()
     return jsonify(new_category.to_dict()), 201
 
+# --- Eksport (CSV / NDJSON) ---
+
+# Tables exposed to the admin export and batch endpoints; users are left out on purpose (credentials)
+ADMIN_TABLES = {
+    "graves": Grave,
+    "service-requests": ServiceRequest,
+    "reservations": Reservation,
+    "contact": ContactMessage,
+    "sections": Section,
+    "articles": Article,
+    "services": Service,
+    "faqs": FAQ,
+    "categories": Category,
+}
+# Table-specific list filters (same semantics as the list endpoints)
+EXPORT_FILTERS = {
+    "graves": filter_graves,
+    "service-requests": filter_service_requests,
+}
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def export_lines(query, serialize, columns, fmt):
+    """Encoded CSV or NDJSON text, one chunk per query batch."""
+    if fmt == "csv":
+        # BOM so spreadsheet software detects UTF-8 (Polish diacritics)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\r\n")
+        writer.writerow(columns)
+        yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+        for batch in query_batches(query):
+            buffer.seek(0)
+            buffer.truncate()
+            for row in batch:
+                data = serialize(row)
+                writer.writerow([csv_value(data.get(c)) for c in columns])
+            yield buffer.getvalue().encode("utf-8")
+    else:
+        for batch in query_batches(query):
+            yield "".join(
+                json.dumps(serialize(row), ensure_ascii=False, default=str) + "\n" for row in batch
+            ).encode("utf-8")
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@app.route("/api/admin/export/<table>", methods=["GET"])
+def export_table(table):
+    model = ADMIN_TABLES.get(table)
+    if model is None:
+        return jsonify({"error": f"Unknown table: {table}", "tables": sorted(ADMIN_TABLES)}), 404
+    fmt = request.args.get("format", "csv")
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    query = model.query
+    if table in EXPORT_FILTERS:
+        try:
+            query = EXPORT_FILTERS[table](query, request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    query = query.order_by(model.id)
+
+    fields = requested_fields(model)
+    if fields is None:
+        columns = list(model.to_dict(empty_row(model)).keys())
+        serialize = lambda obj: obj.to_dict()
+    else:
+        columns = fields
+        query = project_query(query, model, fields)
+        serialize = lambda row: project_row(model, row, fields)
+
+    chunks = export_lines(query, serialize, columns, fmt)
+    filename = f"{table}-{datetime.utcnow():%Y%m%d}.{fmt}"
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    if is_truthy(request.args.get("gzip", "")):
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        mimetype = "application/gzip"
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    })
+
+# --- Batch API ---
+
+BATCH_MAX_OPERATIONS = 1000
+BATCH_ACTIONS = ("create", "update", "delete")
+# Maintained by Grave's validators, never written directly
+GRAVE_DERIVED_COLUMNS = ("search_name", "search_section", "born_on", "died_on", "birth_year", "death_year")
+
+
+class BatchFailed(Exception):
+    def __init__(self, status, error):
+        super().__init__(error)
+        self.status = status
+
+
+def batch_values(model, data):
+    """Map API field names (or column names) of one operation to column values."""
+    if not isinstance(data, dict):
+        raise BatchFailed(400, "data must be an object")
+    columns = model.__table__.columns
+    mapping = getattr(model, "API_FIELD_COLUMNS", {})
+    derived_from = getattr(model, "DERIVED_FROM", {})
+    derived = GRAVE_DERIVED_COLUMNS if model is Grave else tuple(derived_from)
+    values = {}
+    for key, value in data.items():
+        if model is Grave and key == "coordinates":
+            try:
+                values["coord_x"], values["coord_y"] = parse_grave_coordinates(value)
+            except ValueError:
+                raise BatchFailed(400, "Invalid coordinates")
+            continue
+        targets = mapping.get(key, (key,))
+        column = targets[0]
+        if len(targets) != 1 or column not in columns or column == "id" or column in derived:
+            raise BatchFailed(400, f"Unknown field: {key}")
+        values[column] = json.dumps(value) if isinstance(value, (list, dict)) else value
+    # Bulk UPDATEs bypass the validators that keep derived copies in sync
+    for column, (source, derive) in derived_from.items():
+        if source in values:
+            values[column] = derive(values[source])
+    return values
+
+
+def parse_batch_operation(op):
+    """Validate one operation -> (action, table, model, id, values)."""
+    if not isinstance(op, dict):
+        raise BatchFailed(400, "Operation must be an object")
+    action, table = op.get("op"), op.get("table")
+    if action not in BATCH_ACTIONS:
+        raise BatchFailed(400, f"op must be one of: {', '.join(BATCH_ACTIONS)}")
+    model = ADMIN_TABLES.get(table)
+    if model is None:
+        raise BatchFailed(400, f"Unknown table: {table}")
+    record_id = op.get("id")
+    if action != "create" and (not isinstance(record_id, int) or isinstance(record_id, bool)):
+        raise BatchFailed(400, "id must be an integer")
+    values = batch_values(model, op.get("data", {})) if action != "delete" else {}
+    return action, table, model, record_id, values
+
+
+def apply_batch_group(group, results):
+    """Apply a run of operations; consecutive same-table updates with identical
+    data (and consecutive deletes) become one UPDATE/DELETE ... WHERE id IN."""
+    action, table, model, _, values = group[0][1]
+    if action == "create":
+        index, _ = group[0]
+        obj = model(**values)
+        db.session.add(obj)
+        db.session.flush()
+        results[index] = {"index": index, "status": 201, "id": obj.id}
+        return
+
+    ids = [op[3] for _, op in group]
+    existing = {row.id for row in db.session.query(model.id).filter(model.id.in_(ids))}
+    for index, op in group:
+        if op[3] not in existing:
+            results[index] = {"index": index, "status": 404, "id": op[3], "error": "Not found"}
+    if len(existing) < len(set(ids)):
+        raise BatchFailed(404, "Not found")
+
+    if model in (Grave, Section):
+        # ORM path keeps the derived columns and the in-memory indexes in sync
+        # (grave writes and section resizes/renames reach them through the flush)
+        for row_id in ids:
+            obj = db.session.get(model, row_id)
+            if action == "delete":
+                db.session.delete(obj)
+            else:
+                for column, value in values.items():
+                    setattr(obj, column, value)
+        db.session.flush()
+    elif action == "delete":
+        db.session.execute(db.delete(model).where(model.id.in_(ids)))
+    else:
+        db.session.execute(db.update(model).where(model.id.in_(ids)).values(values))
+    for index, op in group:
+        results[index] = {"index": index, "status": 200, "id": op[3]}
+
+
+@app.route("/api/admin/batch", methods=["POST"])
+def admin_batch():
+    payload = request.get_json(silent=True)
+    operations = payload.get("operations") if isinstance(payload, dict) else payload
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "Expected a non-empty list of operations"}), 400
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify({"error": f"At most {BATCH_MAX_OPERATIONS} operations per batch"}), 400
+
+    results = [None] * len(operations)
+    parsed = []
+    for index, op in enumerate(operations):
+        try:
+            parsed.append((index, parse_batch_operation(op)))
+        except BatchFailed as e:
+            results[index] = {"index": index, "status": e.status, "error": str(e)}
+
+    error = None
+    if all(results[i] is None for i in range(len(operations))):
+        groups = []
+        for index, op in parsed:
+            last = groups[-1][-1][1] if groups else None
+            if last and op[0] != "create" and last[0] == op[0] and last[1] == op[1] and last[4] == op[4]:
+                groups[-1].append((index, op))
+            else:
+                groups.append([(index, op)])
+        for group in groups:
+            try:
+                apply_batch_group(group, results)
+            except BatchFailed as e:
+                error = str(e)
+                break
+            except SQLAlchemyError as e:
+                error = str(getattr(e, "orig", None) or e)
+                for index, _ in group:
+                    results[index] = {"index": index, "status": 400, "error": error}
+                break
+    else:
+        error = "Invalid operations"
+
+    if error is None:
+        db.session.commit()
+        return jsonify({"committed": True, "results": results})
+
+    db.session.rollback()
+    for index, result in enumerate(results):
+        if result is None or result["status"] < 300:
+            results[index] = {"index": index, "status": 424, "error": "Not applied (batch rolled back)"}
+    return jsonify({"committed": False, "error": error, "results": results}), 400
+
 # --- DevTools API ---
 
 @app.route("/api/admin/dev/system-info", methods=["GET"])
 def get_system_info():
     try:
+        counters = read_dashboard_counters()
         info = {
             "os": platform.system(),
             "os_release": platform.release(),
             "python_version": sys.version,
             "db_path": db_path,
-            "graves_count": Grave.query.count(),
+            "graves_count": counters["graves"],
             "users_count": User.query.count(),
-            "requests_count": ServiceRequest.query.count()
+            "requests_count": counters["requests_total"]
         }
         return jsonify(info)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/admin/dev/counters/reconcile", methods=["POST"])
+def reconcile_counters():
+    drift = reconcile_dashboard_counters()
+    return jsonify({"drift": drift, "counters": read_dashboard_counters()})
+
+@app.route("/api/admin/dev/search-index", methods=["GET"])
+def get_search_index_stats():
+    return jsonify(grave_search_index.stats())
+
+@app.route("/api/admin/dev/search-index/rebuild", methods=["POST"])
+def rebuild_search_index():
+    rebuild_grave_indexes()
+    return jsonify(grave_search_index.stats())
+
+@app.route("/api/admin/dev/response-cache", methods=["GET"])
+def get_response_cache_stats():
+    return jsonify(response_cache.stats())
+
+@app.route("/api/admin/dev/response-cache/clear", methods=["POST"])
+def clear_response_cache():
+    response_cache.clear()
+    return jsonify(response_cache.stats())
+
 @app.route("/api/admin/dev/run-tests", methods=["GET"])
 def run_tests():
     def generate():
@@ -1279,6 +5081,7 @@ def seed_data():
                 Section(name="C", description="Sektor nowy", total_rows=10, total_cols=15),
                 Section(name="D", description="Urny", total_rows=5, total_cols=10)
             ]
+             mark_tables_written(db.session, Section)
              db.session.bulk_save_objects(sections_data)
              db.session.commit()
              sections = Section.query.all()
@@ -1312,6 +5115,7 @@ def seed_data():
             )
             new_graves.append(grave)
         
+        mark_tables_written(db.session, Grave)
         db.session.bulk_save_objects(new_graves)
         db.session.commit()
         graves = Grave.query.all()
@@ -1325,12 +5129,8 @@ def seed_data():
 
         # 3. Services
         services_data = [
-            Service(name="Sprzątanie grobu (mały)", slug="cleaning-small", price=100.0, category="Sprzątanie", type="basic"),
-            Service(name="Sprzątanie grobu (duży)", slug="cleaning-large", price=150.0, category="Sprzątanie", type="basic"),
-            Service(name="Mycie nagrobka", slug="washing", price=80.0, category="Konserwacja", type="basic"),
             Service(name="Znicz duży", slug="candle-large", price=35.0, category="Produkty", type="additional"),
             Service(name="Wiązanka kwiatów", slug="flowers", price=120.0, category="Produkty", type="additional"),
-            Service(name="Opieka całoroczna", slug="year-care", price=1200.0, category="Opieka", type="basic")
             Service(name="Sprzątanie grobu (mały)", slug="cleaning-small", price=100.0, category="Sprzątanie", type="main", is_visible=True),
             Service(name="Sprzątanie grobu (duży)", slug="cleaning-large", price=150.0, category="Sprzątanie", type="main", is_visible=True),
             Service(name="Mycie nagrobka", slug="washing", price=80.0, category="Konserwacja", type="main", is_visible=True),
@@ -1340,6 +5140,7 @@ def seed_data():
         ]
         # Check if services exist to avoid duplicates if run multiple times (though clear-data is usually run first)
         if Service.query.count() == 0:
+            mark_tables_written(db.session, Service)
             db.session.bulk_save_objects(services_data)
             db.session.commit()
         
@@ -1375,6 +5176,7 @@ def seed_data():
             )
             requests.append(req)
         
+        mark_tables_written(db.session, ServiceRequest)
         db.session.bulk_save_objects(requests)
 
         # 5. Reservations (Some in December)
@@ -1398,6 +5200,7 @@ def seed_data():
             )
             reservations.append(res)
         
+        mark_tables_written(db.session, Reservation)
         db.session.bulk_save_objects(reservations)
 
         # 6. Messages
@@ -1415,6 +5218,7 @@ def seed_data():
             )
             messages.append(msg)
         
+        mark_tables_written(db.session, ContactMessage)
         db.session.bulk_save_objects(messages)
 
         # 7. Articles
@@ -1425,6 +5229,7 @@ def seed_data():
             Article(title="Msza Święta w Wigilię", content="Zapraszamy na mszę w kaplicy cmentarnej.", category="Wydarzenia", date="2025-12-24", excerpt="Harmonogram mszy.", read_time="1 min", is_visible=True)
         ]
         if Article.query.count() == 0:
+            mark_tables_written(db.session, Article)
             db.session.bulk_save_objects(articles_data)
 
         # 8. FAQ
@@ -1434,6 +5239,7 @@ def seed_data():
             FAQ(question="Czy można wjechać samochodem?", answer="Wjazd możliwy tylko dla osób niepełnosprawnych po kontakcie z biurem.", display_order=3)
         ]
         if FAQ.query.count() == 0:
+            mark_tables_written(db.session, FAQ)
             db.session.bulk_save_objects(faq_data)
 
         # 9. Extra Users
@@ -1443,6 +5249,7 @@ def seed_data():
             db.session.add(worker)
 
         db.session.commit()
+        rebuild_grave_indexes()
         
         return jsonify({"message": "Baza danych została wypełniona przykładowymi danymi (Grudzień 2025)"})
     except Exception as e:
@@ -1468,6 +5275,7 @@ def clear_data():
         User.query.filter(User.username != "admin").delete()
         
         db.session.commit()
+        rebuild_grave_indexes()
         return jsonify({"message": "Baza danych wyczyszczona (zachowano konto admin)"})
     except Exception as e:
         db.session.rollback()
@@ -1503,6 +5311,23 @@ def static_proxy(path):
 # Initialize database and seed admin on startup
 init_db_and_seed()
 
+# A shared cache file outlives the workers: bodies stored before this start may
+# predate writes made while none ran (scripts, another deployment). A worker
+# restarting next to running ones only costs them a refill.
+response_cache.clear()
+
+with app.app_context():
+    try:
+        rebuild_grave_indexes()
+    except Exception as e:
+        print(f"Search index build error: {e}")
+    try:
+        for name, counts in reconcile_dashboard_counters().items():
+            print(f"Dashboard counter '{name}' repaired: {counts['stored']} -> {counts['actual']}")
+    except Exception as e:
+        db.session.rollback()
+        print(f"Dashboard counter reconcile error: {e}")
+
 if __name__ == "__main__":
     # Wykrywanie środowiska Azure (zmienna WEBSITE_SITE_NAME jest dostępna w Azure App Service)
     if "WEBSITE_SITE_NAME" in os.environ:
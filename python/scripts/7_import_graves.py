@@ -0,0 +1,46 @@
+import argparse
+import gzip
+import os
+import sys
+
+def run():
+    parser = argparse.ArgumentParser(description="Bulk import graves from a CSV or NDJSON file.")
+    parser.add_argument("path", help="Input file (.csv, .ndjson, optionally .gz)")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Input format (default: from file extension)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT/commit (default: 1000)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only, do not write")
+    args = parser.parse_args()
+
+    fmt = args.format
+    if not fmt:
+        name = args.path[:-3] if args.path.endswith(".gz") else args.path
+        fmt = "csv" if name.endswith(".csv") else "ndjson"
+
+    # Add api directory to path
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../api")))
+
+    print(f"Importing graves from {args.path} ({fmt})...")
+    try:
+        from app import app, import_graves, read_import_records
+
+        def progress(report):
+            print(f"  batch {report['batches']}: {report['inserted']} rows, {report['rejected']} rejected")
+
+        opener = gzip.open if args.path.endswith(".gz") else open
+        with opener(args.path, "rb") as stream, app.app_context():
+            report = import_graves(read_import_records(stream, fmt), max(1, args.batch_size),
+                                   dry_run=args.dry_run, progress=progress)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    verb = "Validated" if args.dry_run else "Imported"
+    print(f"SUCCESS: {verb} {report['inserted']} graves in {report['seconds']}s "
+          f"({report['rows_per_second']} rows/s), rejected {report['rejected']}.")
+    for error in report["errors"]:
+        print(f"  line {error['line']}: {error['error']}")
+    if report["rejected"] > len(report["errors"]):
+        print(f"  ... and {report['rejected'] - len(report['errors'])} more")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,24 @@
+import os
+import sys
+
+def run():
+    # Add api directory to path
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../api")))
+
+    print("Reconciling dashboard counters...")
+    try:
+        # Importing the app already reconciles once at startup (repairs are printed there)
+        from app import app, reconcile_dashboard_counters, read_dashboard_counters
+        with app.app_context():
+            drift = reconcile_dashboard_counters()
+            counters = read_dashboard_counters()
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    for name, counts in drift.items():
+        print(f"  repaired {name}: {counts['stored']} -> {counts['actual']}")
+    print("SUCCESS: " + ", ".join(f"{name}={value}" for name, value in counters.items()))
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,11 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# The app binds its engine (and seeds it) at import time, so the scratch
+# database has to be chosen before any test module imports python.api.app.
+if not os.getenv("DATABASE_URI"):
+    _tmpdir = tempfile.mkdtemp(prefix="cemetery-tests-")
+    atexit.register(shutil.rmtree, _tmpdir, ignore_errors=True)
+    os.environ["DATABASE_URI"] = "sqlite:///" + os.path.join(_tmpdir, "cemetery.db")
@@ -11,7 +11,6 @@ from python.api.app import app, db, Grave
 class TestPerformance(unittest.TestCase):
     def setUp(self):
         app.config['TESTING'] = True
-        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
         self.app = app.test_client()
         with app.app_context():
             db.create_all()
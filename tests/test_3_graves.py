@@ -2,6 +2,7 @@ import unittest
 import os
 import json
 import urllib.request
+import urllib.parse
 import urllib.error
 
 class TestGraves(unittest.TestCase):
@@ -12,12 +13,138 @@ class TestGraves(unittest.TestCase):
     def test_get_graves(self):
         """Test fetching graves list"""
         try:
-            with urllib.request.urlopen(f"{self.BASE_URL}/admin/graves") as response:
+            with urllib.request.urlopen(f"{self.BASE_URL}/admin/graves?all=1") as response:
                 self.assertEqual(response.status, 200)
                 data = json.loads(response.read().decode())
                 self.assertIsInstance(data, list)
         except urllib.error.URLError as e:
             self.fail(f"Could not connect to server: {e}")
 
+    def test_get_graves_paginated(self):
+        """Test keyset pagination walks the list without duplicates"""
+        created_ids = []
+        for i in range(3):
+            payload = json.dumps({"name": f"Paging Test {i}", "section": "T"}).encode('utf-8')
+            req = urllib.request.Request(
+                f"{self.BASE_URL}/admin/graves",
+                data=payload,
+                headers={'Content-Type': 'application/json'},
+                method='POST'
+            )
+            with urllib.request.urlopen(req) as response:
+                created_ids.append(json.loads(response.read().decode())['id'])
+
+        try:
+            seen = []
+            url = f"{self.BASE_URL}/graves?name=Paging%20Test&sort=name&limit=2"
+            with urllib.request.urlopen(url) as response:
+                self.assertEqual(response.status, 200)
+                page = json.loads(response.read().decode())
+            self.assertEqual(len(page['items']), 2)
+            self.assertIsNotNone(page['next_cursor'])
+            seen.extend(g['id'] for g in page['items'])
+
+            with urllib.request.urlopen(f"{url}&cursor={page['next_cursor']}") as response:
+                page = json.loads(response.read().decode())
+            seen.extend(g['id'] for g in page['items'])
+            self.assertIsNone(page['next_cursor'])
+            self.assertEqual(seen, created_ids)
+
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(f"{self.BASE_URL}/graves?cursor=not-a-cursor")
+            self.assertEqual(ctx.exception.code, 400)
+        finally:
+            for grave_id in created_ids:
+                req = urllib.request.Request(f"{self.BASE_URL}/admin/graves/{grave_id}", method='DELETE')
+                urllib.request.urlopen(req).close()
+
+    def test_search_ignores_diacritics(self):
+        """Test name search matches with and without Polish diacritics"""
+        payload = json.dumps({"name": "Zofia Wiśniewska-Testowa", "section": "T"}).encode('utf-8')
+        req = urllib.request.Request(
+            f"{self.BASE_URL}/admin/graves",
+            data=payload,
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(req) as response:
+            grave_id = json.loads(response.read().decode())['id']
+
+        try:
+            for term in ["wisniewska-test", "WIŚNIEWSKA-TEST", "Zofia Wisn"]:
+                url = f"{self.BASE_URL}/graves?all=1&name={urllib.parse.quote(term)}"
+                with urllib.request.urlopen(url) as response:
+                    data = json.loads(response.read().decode())
+                self.assertIn(grave_id, [g['id'] for g in data], term)
+        finally:
+            req = urllib.request.Request(f"{self.BASE_URL}/admin/graves/{grave_id}", method='DELETE')
+            urllib.request.urlopen(req).close()
+
+    def test_date_range_filters(self):
+        """Test year and died_from/died_to filters use parsed dates"""
+        payload = json.dumps({
+            "name": "Date Range Test",
+            "birthDate": "1901-02-03",
+            "deathDate": "1950-06-15",
+            "section": "T"
+        }).encode('utf-8')
+        req = urllib.request.Request(
+            f"{self.BASE_URL}/admin/graves",
+            data=payload,
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(req) as response:
+            grave_id = json.loads(response.read().decode())['id']
+
+        def ids(query):
+            with urllib.request.urlopen(f"{self.BASE_URL}/graves?all=1&name=Date%20Range%20Test&{query}") as response:
+                return [g['id'] for g in json.loads(response.read().decode())]
+
+        try:
+            self.assertIn(grave_id, ids("year=1950"))
+            self.assertNotIn(grave_id, ids("year=1901"))
+            self.assertIn(grave_id, ids("died_from=1950-06-01&died_to=1950-06-30"))
+            self.assertNotIn(grave_id, ids("died_from=1950-07-01"))
+            self.assertIn(grave_id, ids("born_from=1900&born_to=1901"))
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(f"{self.BASE_URL}/graves?died_from=yesterday")
+            self.assertEqual(ctx.exception.code, 400)
+        finally:
+            req = urllib.request.Request(f"{self.BASE_URL}/admin/graves/{grave_id}", method='DELETE')
+            urllib.request.urlopen(req).close()
+
+    def test_location_lookup(self):
+        """Test point lookup by section/row/plot and duplicate reporting"""
+        created_ids = []
+        for name in ["Location Test 1", "Location Test 2"]:
+            payload = json.dumps({"name": name, "section": "T", "row": "9", "plot": "99"}).encode('utf-8')
+            req = urllib.request.Request(
+                f"{self.BASE_URL}/admin/graves",
+                data=payload,
+                headers={'Content-Type': 'application/json'},
+                method='POST'
+            )
+            with urllib.request.urlopen(req) as response:
+                created_ids.append(json.loads(response.read().decode())['id'])
+
+        try:
+            with urllib.request.urlopen(f"{self.BASE_URL}/graves/at?section=t&row=9&plot=99") as response:
+                data = json.loads(response.read().decode())
+            self.assertTrue(data['occupied'])
+            self.assertEqual([g['id'] for g in data['graves']], created_ids)
+
+            with urllib.request.urlopen(f"{self.BASE_URL}/admin/graves/duplicates") as response:
+                duplicates = json.loads(response.read().decode())
+            self.assertIn({"section": "T", "row": "9", "plot": "99", "count": 2}, duplicates)
+
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(f"{self.BASE_URL}/graves/at?section=T")
+            self.assertEqual(ctx.exception.code, 400)
+        finally:
+            for grave_id in created_ids:
+                req = urllib.request.Request(f"{self.BASE_URL}/admin/graves/{grave_id}", method='DELETE')
+                urllib.request.urlopen(req).close()
+
 if __name__ == '__main__':
     unittest.main()
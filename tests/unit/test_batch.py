@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Grave, Reservation
+
+class TestBatchEndpoint(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            reservations = [Reservation(name=f"Klient {i}", email=f"k{i}@example.com", phone="500100200")
+                            for i in range(5)]
+            db.session.add_all(reservations)
+            db.session.commit()
+            self.ids = [r.id for r in reservations]
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def batch(self, operations, status=200):
+        response = self.app.post('/api/admin/batch', data=json.dumps({"operations": operations}),
+                                 content_type='application/json')
+        self.assertEqual(response.status_code, status)
+        return json.loads(response.data)
+
+    def statuses(self):
+        with app.app_context():
+            return [r.status for r in Reservation.query.order_by(Reservation.id)]
+
+    def test_mixed_operations(self):
+        ops = [{"op": "update", "table": "reservations", "id": i, "data": {"status": "Potwierdzona"}}
+               for i in self.ids[:4]]
+        ops.append({"op": "delete", "table": "reservations", "id": self.ids[4]})
+        ops.append({"op": "create", "table": "graves", "data": {"name": "Zofia Wiśniewska", "coordinates": "3,4"}})
+        data = self.batch(ops)
+
+        self.assertTrue(data['committed'])
+        self.assertEqual([r['status'] for r in data['results']], [200] * 5 + [201])
+        self.assertEqual(self.statuses(), ["Potwierdzona"] * 4)
+        with app.app_context():
+            grave = db.session.get(Grave, data['results'][-1]['id'])
+            self.assertEqual((grave.search_name, grave.coord_x), ("zofia wisniewska", 3))
+
+        data = self.batch([{"op": "update", "table": "graves", "id": grave.id, "data": {"name": "Zofia Nowak"}}])
+        with app.app_context():
+            self.assertEqual(db.session.get(Grave, grave.id).search_name, "zofia nowak")
+
+    def test_failure_rolls_back_everything(self):
+        data = self.batch([
+            {"op": "update", "table": "reservations", "id": self.ids[0], "data": {"status": "Anulowana"}},
+            {"op": "update", "table": "reservations", "id": 9999, "data": {"status": "Anulowana"}},
+            {"op": "delete", "table": "reservations", "id": self.ids[1]},
+        ], status=400)
+        self.assertFalse(data['committed'])
+        self.assertEqual([r['status'] for r in data['results']], [424, 404, 424])
+        self.assertEqual(self.statuses(), ["Nowa"] * 5)
+
+    def test_validation(self):
+        data = self.batch([
+            {"op": "update", "table": "user", "id": 1, "data": {"role": "admin"}},
+            {"op": "update", "table": "reservations", "id": self.ids[0], "data": {"password": "x"}},
+            {"op": "merge", "table": "reservations"},
+        ], status=400)
+        self.assertEqual([r['status'] for r in data['results']], [400, 400, 400])
+        self.assertIn("password", data['results'][1]['error'])
+        self.batch([], status=400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Grave, SQLITE_RTREE
+from sqlalchemy import text
+
+class TestBoundingBoxQueries(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_grave(self, name, x, y):
+        payload = {"name": name, "coordinates": {"x": x, "y": y}}
+        response = self.app.post('/api/graves', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return json.loads(response.data)['id']
+
+    def in_bbox(self, query):
+        response = self.app.get(f'/api/graves/in-bbox?{query}')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)
+
+    def test_viewport_query(self):
+        inside = self.add_grave("Jan Kowalski", 11, 21)
+        edge = self.add_grave("Anna Nowak", 30, 40)
+        self.add_grave("Ewa Woźniak", 31, 40)
+        with app.app_context():
+            db.session.add(Grave(name="Bez współrzędnych"))
+            db.session.commit()
+
+        data = self.in_bbox('minx=10&miny=20&maxx=30&maxy=40')
+        self.assertEqual([g['id'] for g in data['items']], [inside, edge])
+        self.assertIsNone(data['next_cursor'])
+
+        data = self.in_bbox('minx=10.5&miny=20.5&maxx=11.5&maxy=21.5&fields=id,x,y')
+        self.assertEqual(data['items'], [{"id": inside, "x": 11, "y": 21}])
+
+    def test_index_follows_writes(self):
+        grave_id = self.add_grave("Jan Kowalski", 5, 5)
+        self.app.put(f'/api/admin/graves/{grave_id}', data=json.dumps({"coordinates": "50,50"}),
+                     content_type='application/json')
+        self.assertEqual(self.in_bbox('minx=0&miny=0&maxx=10&maxy=10')['items'], [])
+        self.assertEqual(len(self.in_bbox('minx=40&miny=40&maxx=60&maxy=60')['items']), 1)
+
+        self.app.delete(f'/api/graves/{grave_id}')
+        self.assertEqual(self.in_bbox('minx=40&miny=40&maxx=60&maxy=60')['items'], [])
+        if SQLITE_RTREE:
+            with app.app_context():
+                count = db.session.execute(text("SELECT count(*) FROM grave_rtree")).scalar()
+            self.assertEqual(count, 0)
+
+    def test_pagination(self):
+        ids = [self.add_grave(f"Person {i}", i, i) for i in range(5)]
+        page = self.in_bbox('minx=0&miny=0&maxx=10&maxy=10&limit=3')
+        self.assertEqual([g['id'] for g in page['items']], ids[:3])
+        page = self.in_bbox(f"minx=0&miny=0&maxx=10&maxy=10&limit=3&cursor={page['next_cursor']}")
+        self.assertEqual([g['id'] for g in page['items']], ids[3:])
+
+    def test_invalid_bbox(self):
+        self.assertEqual(self.app.get('/api/graves/in-bbox?minx=0&miny=0&maxx=1').status_code, 400)
+        self.assertEqual(self.app.get('/api/graves/in-bbox?minx=5&miny=0&maxx=1&maxy=1').status_code, 400)
+        self.assertEqual(self.app.get('/api/graves/in-bbox?minx=a&miny=0&maxx=1&maxy=1').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,258 @@
+import unittest
+import sys
+import os
+import json
+import fnmatch
+import socketserver
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import (app, db, table_versions, response_cache, LocalCacheBackend, SQLiteCacheBackend,
+                            RedisCacheBackend, RespClient, ResponseCache, ResponseCacheEntry, TableVersions,
+                            make_cache_backend, Grave, grave_search_index, rebuild_grave_indexes)
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Just enough of the Redis protocol for RedisCacheBackend."""
+
+    def reply(self, value):
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, str):
+            return b"+%s\r\n" % value.encode()
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(self.reply(v) for v in value)
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self):
+        while True:
+            try:
+                command = RespClient.read_reply(self.rfile)
+            except ConnectionError:
+                return
+            self.wfile.write(self.reply(self.server.run(*command)))
+
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.lock = threading.Lock()
+        self.data = {}
+        self.expires = {}
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def run(self, name, *args):
+        with self.lock:
+            for key, at in list(self.expires.items()):
+                if at <= time.time():
+                    self.data.pop(key, None)
+                    del self.expires[key]
+            name = name.upper()
+            if name == b"GET":
+                return self.data.get(args[0])
+            if name == b"MGET":
+                return [self.data.get(key) for key in args]
+            if name == b"SET":
+                if b"NX" in args[2:] and args[0] in self.data:
+                    return None
+                self.data[args[0]] = args[1]
+                if b"PX" in args[2:]:
+                    self.expires[args[0]] = time.time() + int(args[args.index(b"PX") + 1]) / 1000
+                return "OK"
+            if name == b"DEL":
+                return sum(self.data.pop(key, None) is not None for key in args)
+            if name == b"STRLEN":
+                return len(self.data.get(args[0], b""))
+            if name == b"SCAN":
+                pattern = args[args.index(b"MATCH") + 1].decode()
+                return [b"0", [k for k in self.data if fnmatch.fnmatchcase(k.decode(), pattern)]]
+            if name == b"HINCRBY":
+                table = self.data.setdefault(args[0], {})
+                table[args[1]] = int(table.get(args[1], 0)) + int(args[2])
+                return table[args[1]]
+            if name == b"HSET":
+                self.data.setdefault(args[0], {})[args[1]] = args[2]
+                return 1
+            if name == b"HGETALL":
+                return [str(v).encode() if isinstance(v, int) else v
+                        for pair in self.data.get(args[0], {}).items() for v in pair]
+            return "OK"
+
+
+class TestCacheBackends(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.redis = FakeRedis()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.redis.shutdown()
+        cls.redis.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sqlite_path = os.path.join(self.tmp.name, "cache.db")
+        with self.redis.lock:
+            self.redis.data.clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def redis_backend(self):
+        host, port = self.redis.server_address
+        return make_cache_backend(f"redis://{host}:{port}/0")
+
+    def entry(self, body, tables=("faq",), versions=(0,)):
+        return ResponseCacheEntry(body, "application/json", time.time() + 60, tables, versions)
+
+    def test_storage_contract(self):
+        for backend in (LocalCacheBackend(), SQLiteCacheBackend(self.sqlite_path), self.redis_backend()):
+            with self.subTest(backend=backend.name):
+                self.assertIsNone(backend.get("/api/faqs?"))
+                backend.put("/api/faqs?", self.entry(b'[{"id": 1}]'), 10)
+                entry = backend.get("/api/faqs?")
+                self.assertEqual((entry.body, entry.tables, entry.versions), (b'[{"id": 1}]', ("faq",), (0,)))
+                backend.put("/api/sections?", self.entry(b"[]", ("section",)), 10)
+                entries, size = backend.usage()
+                self.assertEqual(entries, 2)
+                self.assertGreaterEqual(size, 13)
+                backend.delete("/api/faqs?")
+                self.assertIsNone(backend.get("/api/faqs?"))
+                backend.clear()
+                self.assertEqual(backend.usage()[0], 0)
+
+        self.assertIsInstance(make_cache_backend("local"), LocalCacheBackend)
+        self.assertIsInstance(self.redis_backend(), RedisCacheBackend)
+        with self.assertRaises(ValueError):
+            make_cache_backend("memcached://localhost")
+
+    def test_sqlite_lru_eviction(self):
+        backend = SQLiteCacheBackend(self.sqlite_path)
+        backend.TOUCH_SECONDS = 0
+        backend.put("a", self.entry(b"1"), 2)
+        backend.put("b", self.entry(b"2"), 2)
+        time.sleep(0.01)
+        backend.get("a")
+        self.assertEqual(backend.put("c", self.entry(b"3"), 2), 1)
+        self.assertIsNone(backend.get("b"))
+        self.assertIsNotNone(backend.get("a"))
+
+    def test_cross_worker_invalidation(self):
+        for make in (lambda: SQLiteCacheBackend(self.sqlite_path), self.redis_backend):
+            with self.subTest(backend=make().name):
+                workers = []
+                for _ in range(2):
+                    versions = TableVersions(make())
+                    seen = []
+                    versions.remote_listeners.append(seen.extend)
+                    versions.sync()
+                    workers.append((versions, seen))
+                (first, first_seen), (second, second_seen) = workers
+                self.assertEqual(first.boot, second.boot)
+
+                first.bump({"faq"})
+                second.sync()
+                self.assertEqual(second.get("faq")[0], first.get("faq")[0])
+                self.assertEqual(second_seen, ["faq"])
+
+                # A write after an unseen remote one is noticed on bump as well
+                second.bump({"section"})
+                first.bump({"section"})
+                self.assertEqual(first.get("section")[0], 2)
+                self.assertEqual(first_seen, ["section"])
+
+    def test_change_log(self):
+        for make in (lambda: SQLiteCacheBackend(self.sqlite_path), self.redis_backend):
+            with self.subTest(backend=make().name):
+                writer, reader = TableVersions(make()), TableVersions(make())
+                seen = []
+                reader.remote_listeners.append(seen.append)
+                reader.sync()
+                writer.bump({"grave", "faq"}, {"grave": "[1, 2]"})
+                writer.bump({"grave"}, {"grave": "null"})
+                reader.sync()
+                self.assertEqual(seen, [{"grave": (1, 2), "faq": (1, 1)}])
+                self.assertEqual(reader.backend.load_changes("grave", 1, 3), {1: "[1, 2]", 2: "null"})
+                self.assertEqual(reader.backend.load_changes("faq", 1, 1), {})
+
+    def test_unreachable_backend_degrades_to_misses(self):
+        server = socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler)
+        port = server.server_address[1]
+        server.server_close()
+        cache = ResponseCache(RedisCacheBackend(RespClient("127.0.0.1", port, timeout=0.2)), 10, 60)
+        self.assertIsNone(cache.get("/api/faqs?"))
+        cache.put("/api/faqs?", b"[]", "application/json", ("faq",), (0,))
+        stats = cache.stats()
+        self.assertEqual((stats['misses'], stats['errors'], stats['entries']), (1, 2, None))
+
+
+class TestSharedResponseCache(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "cache.db")
+        self.saved = (table_versions.backend, table_versions.synced, response_cache.backend, table_versions.versions)
+        table_versions.backend = response_cache.backend = SQLiteCacheBackend(path)
+        table_versions.synced, table_versions.versions = False, {}
+        self.other_worker = TableVersions(SQLiteCacheBackend(path))
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        table_versions.backend, table_versions.synced, response_cache.backend, table_versions.versions = self.saved
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+        self.tmp.cleanup()
+
+    def test_remote_grave_writes_are_replayed(self):
+        was_enabled, grave_search_index.enabled = grave_search_index.enabled, True
+        try:
+            self.app.get('/api/faqs')
+            with app.app_context():
+                rebuild_grave_indexes([grave_search_index])
+                # Another worker's insert: not seen by this process's session events
+                with db.engine.begin() as conn:
+                    grave_id = conn.execute(Grave.__table__.insert().values(
+                        name="Anna Kowalska", search_name="anna kowalska")).inserted_primary_key[0]
+            built_at = grave_search_index.built_at
+
+            self.other_worker.bump({"grave"}, {"grave": json.dumps([grave_id])})
+            data = json.loads(self.app.get('/api/graves?all=1&name=kowalsk').data)
+            self.assertEqual([g['id'] for g in data], [grave_id])
+            # Replayed in place, not rebuilt
+            self.assertEqual(grave_search_index.built_at, built_at)
+
+            # A write without logged ids leaves the index to a full rebuild on next use
+            self.other_worker.bump({"grave"}, {"grave": json.dumps(None)})
+            self.app.get('/api/faqs')
+            self.assertFalse(grave_search_index.ready)
+            self.assertEqual(len(json.loads(self.app.get('/api/graves?all=1').data)), 1)
+            self.assertTrue(grave_search_index.ready)
+        finally:
+            grave_search_index.enabled = was_enabled
+            grave_search_index.ready = False
+
+    def test_write_in_another_worker_invalidates(self):
+        self.assertEqual(self.app.get('/api/faqs').headers['X-Cache'], "MISS")
+        self.assertEqual(self.app.get('/api/faqs').headers['X-Cache'], "HIT")
+        etag = self.app.get('/api/faqs').headers['ETag']
+
+        self.other_worker.bump({"faq"})
+        response = self.app.get('/api/faqs', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-Cache'], "MISS")
+        self.assertEqual(json.loads(self.app.get('/api/admin/dev/response-cache').data)['backend'], "sqlite")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime, date
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Grave, ServiceRequest, Reservation, ContactMessage
+from sqlalchemy import text
+
+class TestCalendar(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            grave = Grave(name="Jan Kowalski")
+            db.session.add(grave)
+            db.session.flush()
+            db.session.add_all([
+                ServiceRequest(grave_id=grave.id, service_type="Znicze", scheduled_date="1990-05-20",
+                               created_at=datetime(1990, 1, 1)),
+                ServiceRequest(grave_id=grave.id, service_type="Kwiaty", scheduled_date="03.05.1990",
+                               created_at=datetime(1990, 1, 2)),
+                ServiceRequest(grave_id=grave.id, service_type="Sprzątanie", created_at=datetime(1990, 5, 10, 18)),
+                Reservation(name="Anna", email="a@example.com", phone="500", scheduled_date="1990-05-10",
+                            created_at=datetime(1990, 4, 1)),
+                Reservation(name="Piotr", email="p@example.com", phone="500", scheduled_date="kiedyś",
+                            created_at=datetime(1990, 5, 15)),
+                ContactMessage(name="Ola", message="Pytanie", created_at=datetime(1990, 5, 31, 23, 59)),
+                ContactMessage(name="Adam", message="Poza zakresem", created_at=datetime(1990, 6, 1)),
+            ])
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def calendar(self, query, status=200):
+        response = self.app.get(f'/api/admin/calendar{query}')
+        self.assertEqual(response.status_code, status, response.data)
+        return json.loads(response.data)
+
+    def test_merged_sorted_window(self):
+        events = self.calendar('?from=1990-05-01&to=1990-05-31')
+        self.assertEqual([(e['date'], e['type']) for e in events], [
+            ("1990-05-03", "request"),
+            ("1990-05-10", "request"),
+            ("1990-05-10", "reservation"),
+            ("1990-05-15", "reservation"),
+            ("1990-05-20", "request"),
+            ("1990-05-31", "message"),
+        ])
+        events = self.calendar('?from=1990-05-01&to=1990-05-31&type=reservation,message')
+        self.assertEqual({e['type'] for e in events}, {"reservation", "message"})
+
+    def test_unparsed_scheduled_date_is_kept(self):
+        events = {(e['type'], e['date']): e for e in self.calendar('?from=1990-05-10&to=1990-05-15')}
+        # Not a date: placed on the creation day, with the stored value alongside
+        unparsed = events[("reservation", "1990-05-15")]
+        self.assertEqual(unparsed['scheduledDate'], "kiedyś")
+        self.assertIn("kiedyś", unparsed['details'])
+        # No scheduled date at all, or a parsed one: nothing extra
+        self.assertNotIn('scheduledDate', events[("request", "1990-05-10")])
+        self.assertNotIn('scheduledDate', events[("reservation", "1990-05-10")])
+
+    def test_writes_keep_typed_date_in_sync(self):
+        with app.app_context():
+            reservation_id = Reservation.query.filter_by(name="Anna").one().id
+        response = self.app.post('/api/admin/batch', data=json.dumps({"operations": [
+            {"op": "update", "table": "reservations", "id": reservation_id, "data": {"scheduled_date": "1990-07-04"}}
+        ]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e['id'] for e in self.calendar('?from=1990-07-01&to=1990-07-31')],
+                         [f"res_{reservation_id}"])
+
+        self.app.put(f'/api/admin/reservations/{reservation_id}', data=json.dumps({"scheduled_date": ""}),
+                     content_type='application/json')
+        self.assertEqual(self.calendar('?from=1990-07-01&to=1990-07-31'), [])
+        self.assertIn(f"res_{reservation_id}", [e['id'] for e in self.calendar('?from=1990-04-01&to=1990-04-01')])
+
+    def test_range_queries_use_calendar_index(self):
+        with app.app_context():
+            plan = db.session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT id FROM reservation WHERE scheduled_on IS NULL "
+                "AND created_at >= '1990-05-01' AND created_at < '1990-06-01' ORDER BY created_at"
+            )).all()
+        self.assertIn("ix_reservation_calendar", " ".join(row[-1] for row in plan))
+
+    def test_invalid_requests(self):
+        self.calendar('?from=1990-05-01', status=400)
+        self.calendar('?from=1990-01-01&to=1991-12-31', status=400)
+        self.calendar('?from=1990-05-01&to=1990-05-31&type=grave', status=400)
+
+if __name__ == '__main__':
+    unittest.main()
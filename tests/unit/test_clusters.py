@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, grave_cluster_index, GraveClusterIndex
+
+class TestGraveClusters(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        grave_cluster_index.enabled = grave_cluster_index.ready = False
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_grave(self, name, section, x, y):
+        payload = {"name": name, "section": section, "coordinates": {"x": x, "y": y}}
+        response = self.app.post('/api/graves', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return json.loads(response.data)['id']
+
+    def clusters(self, query):
+        response = self.app.get(f'/api/graves/clusters?{query}')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)['clusters']
+
+    def test_zoom_levels(self):
+        self.add_grave("Jan Kowalski", "A", 10, 10)
+        self.add_grave("Anna Nowak", "A", 20, 30)
+        lone = self.add_grave("Ewa Woźniak", "B", 90, 90)
+
+        self.assertEqual(self.clusters('zoom=0'), [
+            {"x": 15, "y": 20, "count": 2, "section": "A"},
+            {"x": 90, "y": 90, "count": 1, "section": "B", "id": lone}
+        ])
+        # Cells of 256 / 2**4 = 16 units split section A apart
+        self.assertEqual(len(self.clusters('zoom=4')), 3)
+        self.assertEqual(len(self.clusters(f'zoom={GraveClusterIndex.MAX_ZOOM + 5}')), 3)
+
+        data = self.clusters('zoom=0&minx=50&miny=50&maxx=100&maxy=100')
+        self.assertEqual([c['section'] for c in data], ["B"])
+
+        # Narrow box: only the overlapping cells are visited; wide box: occupied cells are filtered
+        self.assertEqual(len(self.clusters('zoom=4&minx=0&miny=0&maxx=40&maxy=40')), 2)
+        self.assertEqual(len(self.clusters('zoom=8&minx=-5000&miny=-5000&maxx=5000&maxy=5000')), 3)
+        cells = grave_cluster_index._cells_in(4, {"minx": 80, "miny": 80, "maxx": 95, "maxy": 95})
+        self.assertEqual([list(clusters) for clusters in cells], [["B"]])
+
+    def test_incremental_updates(self):
+        first = self.add_grave("Jan Kowalski", "A", 10, 10)
+        self.clusters('zoom=0')
+        second = self.add_grave("Anna Nowak", "A", 30, 10)
+        self.assertEqual(self.clusters('zoom=0'), [{"x": 20, "y": 10, "count": 2, "section": "A"}])
+
+        self.app.put(f'/api/admin/graves/{second}', data=json.dumps({"section": "C"}),
+                     content_type='application/json')
+        self.assertEqual(sorted(c['section'] for c in self.clusters('zoom=0')), ["A", "C"])
+
+        self.app.delete(f'/api/graves/{second}')
+        self.assertEqual(self.clusters('zoom=0'), [{"x": 10, "y": 10, "count": 1, "section": "A", "id": first}])
+        self.app.delete(f'/api/graves/{first}')
+        self.assertEqual(self.clusters('zoom=0'), [])
+        self.assertTrue(all(not level for level in grave_cluster_index.levels))
+
+    def test_invalid_zoom(self):
+        self.assertEqual(self.app.get('/api/graves/clusters?zoom=far').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
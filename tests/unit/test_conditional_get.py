@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, table_versions
+from sqlalchemy import event
+from werkzeug.http import http_date
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            self.engine = db.engine
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self.count_statement)
+
+    def tearDown(self):
+        event.remove(self.engine, "before_cursor_execute", self.count_statement)
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def count_statement(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def add_faq(self, question):
+        response = self.app.post('/api/admin/faqs', data=json.dumps({"question": question, "answer": "Tak"}),
+                                 content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+    def backdate(self, table, seconds=5):
+        table_versions.modified[table] = datetime.utcnow().replace(microsecond=0) - timedelta(seconds=seconds)
+
+    def test_etag_revalidation(self):
+        self.backdate("faq")
+        first = self.app.get('/api/faqs')
+        etag = first.headers['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', first.headers)
+
+        self.statements.clear()
+        response = self.app.get('/api/faqs', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.statements, [])
+
+        self.add_faq("Czy cmentarz jest otwarty w nocy?")
+        response = self.app.get('/api/faqs', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+        # Writes to other tables leave the tag alone
+        etag = response.headers['ETag']
+        self.app.post('/api/admin/categories', data=json.dumps({"name": "Nowa"}),
+                      content_type='application/json')
+        self.assertEqual(self.app.get('/api/faqs', headers={"If-None-Match": etag}).status_code, 304)
+
+    def test_representation_and_last_modified(self):
+        full = self.app.get('/api/sections').headers['ETag']
+        projected = self.app.get('/api/sections?fields=name').headers['ETag']
+        self.assertNotEqual(full, projected)
+
+        self.backdate("service")
+        last_modified = self.app.get('/api/services').headers['Last-Modified']
+        response = self.app.get('/api/services', headers={"If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 304)
+
+        version = table_versions.get("service")[0]
+        self.app.post('/api/admin/services', data=json.dumps({"name": "Znicz", "slug": "znicz", "price": 10}),
+                      content_type='application/json')
+        self.assertEqual(table_versions.get("service")[0], version + 1)
+
+    def test_same_second_write_is_not_revalidated_by_date(self):
+        self.add_faq("Czy można parkować przy bramie?")
+        # A date the client got earlier in the second of the write looks current
+        now = datetime.utcnow().replace(microsecond=0)
+        table_versions.modified["faq"] = now
+        response = self.app.get('/api/faqs', headers={"If-Modified-Since": http_date(now.replace(tzinfo=timezone.utc))})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response.headers)
+
+if __name__ == '__main__':
+    unittest.main()
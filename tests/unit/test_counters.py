@@ -0,0 +1,117 @@
+import unittest
+import sys
+import os
+import json
+from sqlalchemy import event
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import (app, db, Grave, Reservation, ContactMessage, DashboardCounter,
+                            read_dashboard_counters)
+
+class TestDashboardCounters(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def counters(self):
+        with app.app_context():
+            return read_dashboard_counters()
+
+    def send(self, method, path, body=None):
+        response = self.app.open(path, method=method, data=json.dumps(body or {}), content_type='application/json')
+        self.assertLess(response.status_code, 300, response.data)
+        return response
+
+    def test_endpoint_writes_adjust_counters(self):
+        self.send('POST', '/api/graves', {"name": "Jan Kowalski"})
+        self.send('POST', '/api/service-requests', {"graveId": 1, "serviceType": "Znicze"})
+        self.send('POST', '/api/service-requests', {"graveId": 1, "serviceType": "Kwiaty", "status": "done"})
+        self.send('POST', '/api/reservations', {"name": "Anna", "email": "a@example.com", "phone": "500"})
+        self.send('POST', '/api/contact', {"name": "Ola", "email": "o@example.com", "message": "Pytanie"})
+        self.assertEqual(self.counters(), {"graves": 1, "requests": 1, "requests_total": 2,
+                                           "messages": 1, "reservations": 1})
+
+        with app.app_context():
+            reservation_id = Reservation.query.one().id
+            message_id = ContactMessage.query.one().id
+        self.send('PUT', f'/api/admin/reservations/{reservation_id}', {"status": "Potwierdzona"})
+        self.send('PATCH', '/api/admin/service-requests/2/status', {"status": "Nowe"})
+        self.send('PATCH', '/api/admin/service-requests/1/status', {"status": "pending"})
+        self.send('DELETE', f'/api/admin/contact/{message_id}')
+        self.assertEqual(self.counters(), {"graves": 1, "requests": 2, "requests_total": 2,
+                                           "messages": 0, "reservations": 0})
+
+        # Rolled back writes leave the counters alone
+        with app.app_context():
+            db.session.add(Grave(name="Rollback"))
+            db.session.flush()
+            db.session.rollback()
+        self.assertEqual(self.counters()["graves"], 1)
+
+    def test_bulk_writes_are_recounted(self):
+        csv_body = "name,section\n" + "\n".join(f"Osoba {i},A" for i in range(30))
+        response = self.app.post('/api/admin/graves/import?batch_size=7', data=csv_body, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counters()["graves"], 30)
+
+        self.send('POST', '/api/admin/batch', {"operations": [
+            {"op": "delete", "table": "graves", "id": 1},
+            {"op": "create", "table": "reservations",
+             "data": {"name": "Jan", "email": "j@example.com", "phone": "500"}},
+        ]})
+        self.assertEqual((self.counters()["graves"], self.counters()["reservations"]), (29, 1))
+
+        self.send('POST', '/api/admin/dev/clear-data')
+        self.assertEqual(set(self.counters().values()), {0})
+
+    def test_stale_in_final_flush_is_recounted(self):
+        self.send('POST', '/api/reservations', {"name": "Anna", "email": "a@example.com", "phone": "500"})
+        with app.app_context():
+            reservation = Reservation.query.first()
+            # Previous status unknown, and only flushed by commit itself
+            db.session.expire(reservation, ["status"])
+            reservation.status = "Zamknięta"
+            db.session.commit()
+        self.assertEqual(self.counters()["reservations"], 0)
+
+    def test_import_applies_deltas_without_recounting(self):
+        statements = []
+        with app.app_context():
+            engine = db.engine
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            csv_body = "name,section\n" + "\n".join(f"Osoba {i},A" for i in range(10))
+            self.app.post('/api/admin/graves/import?batch_size=4', data=csv_body, content_type='text/csv')
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        self.assertEqual(self.counters()["graves"], 10)
+        self.assertFalse([s for s in statements if "count(" in s.lower() and "FROM grave" in s])
+
+    def test_reconcile_repairs_drift(self):
+        self.send('POST', '/api/graves', {"name": "Jan Kowalski"})
+        with app.app_context():
+            db.session.execute(DashboardCounter.__table__.update()
+                               .where(DashboardCounter.name == "graves").values(value=42))
+            db.session.execute(DashboardCounter.__table__.delete().where(DashboardCounter.name == "messages"))
+            db.session.commit()
+
+        data = json.loads(self.send('POST', '/api/admin/dev/counters/reconcile').data)
+        self.assertEqual(data['drift'], {"graves": {"stored": 42, "actual": 1}})
+        self.assertEqual(data['counters']['graves'], 1)
+        data = json.loads(self.send('POST', '/api/admin/dev/counters/reconcile').data)
+        self.assertEqual(data['drift'], {})
+
+        info = json.loads(self.app.get('/api/admin/dev/system-info').data)
+        self.assertEqual(info['graves_count'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Grave, ServiceRequest, Reservation, ContactMessage
+from sqlalchemy import event
+
+class TestDashboard(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            grave = Grave(name="Jan Kowalski")
+            db.session.add(grave)
+            db.session.flush()
+            db.session.add_all([
+                ServiceRequest(grave_id=grave.id, service_type="Sprzątanie", status="Nowe", customer_name="Anna",
+                               scheduled_date="1990-03-10", created_at=datetime(1990, 1, 5)),
+                # No scheduled date: falls on the creation day
+                ServiceRequest(grave_id=grave.id, service_type="Znicze", status="done", customer_name="Piotr",
+                               scheduled_date="", created_at=datetime(1990, 3, 31, 23, 30)),
+                ServiceRequest(grave_id=grave.id, service_type="Kwiaty", status="pending", customer_name="Ewa",
+                               scheduled_date="1990-04-01", created_at=datetime(1990, 3, 15)),
+                Reservation(name="Marek", email="m@example.com", phone="500", section="B",
+                            created_at=datetime(1990, 3, 1)),
+                ContactMessage(name="Ola", message="Pytanie o godziny otwarcia cmentarza " * 3,
+                               created_at=datetime(1990, 3, 20, 12)),
+                ContactMessage(name="Adam", message="Dziękuję", status="Przeczytana",
+                               created_at=datetime(1990, 2, 28, 23, 59)),
+            ])
+            db.session.commit()
+            self.engine = db.engine
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self.count_statement)
+
+    def tearDown(self):
+        event.remove(self.engine, "before_cursor_execute", self.count_statement)
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def count_statement(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def dashboard(self, query="", status=200):
+        response = self.app.get(f'/api/admin/dashboard{query}')
+        self.assertEqual(response.status_code, status)
+        return json.loads(response.data)
+
+    def test_window_selects_visible_events(self):
+        data = self.dashboard('?from=1990-03-01&to=1990-03-31')
+        events = {e['id']: e for e in data['events']}
+        self.assertEqual(sorted(e['date'] for e in events.values()),
+                         ["1990-03-01", "1990-03-10", "1990-03-20", "1990-03-31"])
+        preview = next(e['details'] for e in events.values() if e['type'] == "message")
+        self.assertEqual(len(preview), 53)
+
+        self.assertEqual(len(self.dashboard()['events']), 6)
+        self.assertEqual([e['date'] for e in self.dashboard('?from=1990-04-01')['events']], ["1990-04-01"])
+
+    def test_stats_read_from_counters(self):
+        self.statements.clear()
+        stats = self.dashboard('?from=2000-01-01&to=2000-01-31')['stats']
+        self.assertEqual(stats, {"graves": 1, "requests": 2, "messages": 1, "reservations": 1})
+        self.assertFalse(any("count(" in s.lower() for s in self.statements))
+
+    def test_invalid_window(self):
+        self.dashboard('?from=03/01/1990', status=400)
+        self.dashboard('?from=1990-04-01&to=1990-03-01', status=400)
+
+if __name__ == '__main__':
+    unittest.main()
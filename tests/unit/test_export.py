@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import csv
+import gzip
+import io
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Grave, ServiceRequest, STREAM_BATCH_SIZE
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            graves = [Grave(name=f"Person {i}", section="A", death_date="1950-01-01")
+                      for i in range(STREAM_BATCH_SIZE + 3)]
+            graves.append(Grave(name="Zofia Wiśniewska", section="B", death_date="1999-05-05"))
+            db.session.add_all(graves)
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_csv_export(self):
+        response = self.app.get('/api/admin/export/graves?format=csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertIn('attachment; filename="graves-', response.headers['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(response.data.decode("utf-8-sig"))))
+        self.assertEqual(len(rows), STREAM_BATCH_SIZE + 4)
+        self.assertEqual(rows[-1]['name'], "Zofia Wiśniewska")
+        self.assertEqual(rows[-1]['deathDate'], "1999-05-05")
+
+    def test_ndjson_gzip_with_filters(self):
+        response = self.app.get('/api/admin/export/graves?format=ndjson&gzip=1&name=wisniew&fields=name,section')
+        self.assertEqual(response.mimetype, "application/gzip")
+        lines = gzip.decompress(response.data).decode("utf-8").splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [{"name": "Zofia Wiśniewska", "section": "B"}])
+
+        response = self.app.get('/api/admin/export/graves?format=ndjson&died_to=1960')
+        self.assertEqual(len(response.data.decode("utf-8").splitlines()), STREAM_BATCH_SIZE + 3)
+
+    def test_service_request_status_filter(self):
+        with app.app_context():
+            grave_id = Grave.query.first().id
+            db.session.add_all([ServiceRequest(grave_id=grave_id, service_type="cleaning", status=status)
+                                for status in ("pending", "Zakończone", "anulowane")])
+            db.session.commit()
+        response = self.app.get('/api/admin/export/service-requests?format=ndjson&status=completed&fields=status')
+        self.assertEqual([json.loads(line) for line in response.data.decode("utf-8").splitlines()],
+                         [{"status": "completed"}])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.app.get('/api/admin/export/user').status_code, 404)
+        self.assertEqual(self.app.get('/api/admin/export/graves?format=xlsx').status_code, 400)
+        self.assertEqual(self.app.get('/api/admin/export/graves?year=abc').status_code, 400)
+        self.assertEqual(self.app.get('/api/admin/export/sections?fields=password').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import gzip
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Grave
+
+class TestGraveImport(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def post(self, query, body, content_type, **headers):
+        response = self.app.post(f'/api/admin/graves/import?{query}', data=body,
+                                 content_type=content_type, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)
+
+    def test_csv_import_in_batches(self):
+        lines = ["name,deathDate,section,row,plot,coordinates"]
+        lines += [f"Person {i},1950-01-0{i % 9 + 1},A,1,{i},\"{i},{i * 2}\"" for i in range(25)]
+        lines += [",1950,A,1,1,", "Bad Coordinates,,A,1,1,\"x,1\""]
+        report = self.post('batch_size=10', "\n".join(lines).encode("utf-8"), 'text/csv')
+
+        self.assertEqual((report['inserted'], report['rejected'], report['batches']), (25, 2, 3))
+        self.assertEqual([e['line'] for e in report['errors']], [27, 28])
+        self.assertIn('rows_per_second', report)
+
+        with app.app_context():
+            grave = Grave.query.filter_by(name="Person 3").one()
+            self.assertEqual((grave.coord_x, grave.coord_y, grave.death_year), (3, 6, 1950))
+            self.assertEqual(grave.search_name, "person 3")
+
+        # Imported rows are visible through the normal (indexed) search paths
+        data = json.loads(self.app.get('/api/graves?all=1&name=person%202&year=1950').data)
+        self.assertEqual(len(data), 6)
+
+    def test_ndjson_gzip_and_export_round_trip(self):
+        body = "\n".join(json.dumps(r) for r in [
+            {"name": "Zofia Wiśniewska", "section": "B", "x": 5, "y": 7},
+            {"name": "Jan Kowalski", "coordinates": {"x": 1, "y": 2}},
+            "not an object",
+            {"name": "Null X", "coordinates": {"x": None, "y": 1}},
+            {"name": "List", "coordinates": [1, 2]},
+        ]).encode("utf-8")
+        report = self.post('', gzip.compress(body), 'application/x-ndjson', **{"Content-Encoding": "gzip"})
+        self.assertEqual((report['inserted'], report['rejected']), (2, 3))
+        self.assertEqual([e['line'] for e in report['errors']], [3, 4, 5])
+
+        exported = self.app.get('/api/admin/export/graves?format=csv').data
+        report = self.post('format=csv&dry_run=1', exported, 'text/csv')
+        self.assertEqual((report['inserted'], report['rejected'], report['dry_run']), (2, 0, True))
+        with app.app_context():
+            self.assertEqual(Grave.query.count(), 2)
+
+    def test_add_grave_rejects_bad_coordinates(self):
+        for coordinates in ("a,b", {"x": "a"}, {"x": None, "y": 1}, [1, 2], 7):
+            response = self.app.post('/api/graves', data=json.dumps({"name": "Jan", "coordinates": coordinates}),
+                                     content_type='application/json')
+            self.assertEqual(response.status_code, 400, coordinates)
+
+if __name__ == '__main__':
+    unittest.main()
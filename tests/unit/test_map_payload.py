@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import json
+import gzip
+import struct
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Grave, grave_map_cache
+
+class TestMapPayload(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            db.session.add(Grave(name="Jan Kowalski", section="A", coord_x=10, coord_y=20))
+            db.session.add(Grave(name="Anna Nowak", section="B", coord_x=30, coord_y=40))
+            db.session.add(Grave(name="Bez Sekcji"))
+            db.session.commit()
+        grave_map_cache.invalidate()
+
+    def tearDown(self):
+        grave_map_cache.invalidate()
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_columnar_json(self):
+        data = json.loads(self.app.get('/api/graves/map').data)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['xs'], [10, 30, 0])
+        self.assertEqual(data['ys'], [20, 40, 0])
+        self.assertEqual(data['sections'], ["A", "B", None])
+
+    def test_binary_layout(self):
+        response = self.app.get('/api/graves/map?format=bin', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        body = gzip.decompress(response.data)
+        magic, count, section_count, names_length = struct.unpack_from('<4sIII', body)
+        self.assertEqual((magic, count, section_count), (b'GMP1', 3, 2))
+        offset = 16
+        ids = struct.unpack_from(f'<{count}i', body, offset)
+        xs = struct.unpack_from(f'<{count}i', body, offset + 4 * count)
+        codes = struct.unpack_from(f'<{count}H', body, offset + 12 * count)
+        names = json.loads(body[-names_length:].decode('utf-8'))
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(xs, (10, 30, 0))
+        self.assertEqual([names[c] if c != 0xFFFF else None for c in codes], ["A", "B", None])
+
+    def test_etag_per_encoding(self):
+        plain = self.app.get('/api/graves/map').headers['ETag']
+        gzipped = self.app.get('/api/graves/map', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotEqual(gzipped.headers['ETag'], plain)
+        self.assertEqual(gzipped.headers['Vary'], 'Accept-Encoding')
+        # A tag for the plain body must not revalidate the gzipped one
+        response = self.app.get('/api/graves/map', headers={'Accept-Encoding': 'gzip', 'If-None-Match': plain})
+        self.assertEqual(response.status_code, 200)
+        response = self.app.get('/api/graves/map', headers={'Accept-Encoding': 'gzip',
+                                                             'If-None-Match': gzipped.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_cache_invalidated_by_grave_write(self):
+        first = self.app.get('/api/graves/map')
+        etag = first.headers['ETag']
+        self.assertEqual(self.app.get('/api/graves/map', headers={'If-None-Match': etag}).status_code, 304)
+
+        self.app.post('/api/graves', data=json.dumps({"name": "Nowy Grób", "section": "C"}),
+                      content_type='application/json')
+        second = self.app.get('/api/graves/map', headers={'If-None-Match': etag})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(json.loads(second.data)['count'], 4)
+
+if __name__ == '__main__':
+    unittest.main()
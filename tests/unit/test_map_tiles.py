@@ -0,0 +1,134 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Section, grave_tile_cache
+
+class TestSectionMapTiles(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.tile_dir = tempfile.mkdtemp()
+        self.old_tile_dir = app.config['MAP_TILE_DIR']
+        app.config['MAP_TILE_DIR'] = self.tile_dir
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            section = Section(name="A", description="Sektor zabytkowy", total_rows=20, total_cols=40)
+            db.session.add(section)
+            db.session.commit()
+            self.section_id = section.id
+
+    def tearDown(self):
+        grave_tile_cache.enabled = grave_tile_cache.ready = False
+        app.config['MAP_TILE_DIR'] = self.old_tile_dir
+        shutil.rmtree(self.tile_dir, ignore_errors=True)
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_grave(self, name, row, plot):
+        payload = {"name": name, "section": "A", "row": row, "plot": plot}
+        response = self.app.post('/api/graves', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return json.loads(response.data)['id']
+
+    def tile_urls(self, zoom):
+        response = self.app.get(f'/api/sections/{self.section_id}/tiles?z={zoom}')
+        self.assertEqual(response.status_code, 200)
+        return {(t['x'], t['y']): t['url'] for t in json.loads(response.data)['tiles']}
+
+    def test_tiles_are_content_addressed_and_immutable(self):
+        self.add_grave("Jan Kowalski", "2", "3")
+        urls = self.tile_urls(2)
+        # 40 x 20 plots in tiles of 16 x 16
+        self.assertEqual(len(urls), 6)
+
+        response = self.app.get(urls[(0, 0)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "image/svg+xml")
+        self.assertIn("immutable", response.headers['Cache-Control'])
+        body = response.get_data(as_text=True)
+        self.assertIn("<title>Jan Kowalski</title>", body)
+        self.assertIn('x="2" y="1"', body)
+        response.close()
+
+        redirect = self.app.get(f'/api/sections/{self.section_id}/tiles/2/0/0.svg')
+        self.assertEqual(redirect.status_code, 302)
+        self.assertTrue(redirect.headers['Location'].endswith(urls[(0, 0)]))
+
+        self.assertEqual(self.app.get('/api/tiles/../secret.svg').status_code, 404)
+        self.assertEqual(self.app.get(f'/api/sections/{self.section_id}/tiles?z=9').status_code, 400)
+
+    def test_grave_write_invalidates_only_its_tiles(self):
+        grave_id = self.add_grave("Jan Kowalski", "2", "3")
+        before = self.tile_urls(2)
+
+        self.app.put(f'/api/admin/graves/{grave_id}', data=json.dumps({"plot": "35"}),
+                     content_type='application/json')
+        after = self.tile_urls(2)
+        self.assertNotEqual(before[(0, 0)], after[(0, 0)])
+        self.assertNotEqual(before[(2, 0)], after[(2, 0)])
+        self.assertEqual(before[(1, 0)], after[(1, 0)])
+        self.assertEqual(before[(0, 1)], after[(0, 1)])
+
+        # Same content, same address: moving back restores the original tile
+        self.app.put(f'/api/admin/graves/{grave_id}', data=json.dumps({"plot": "3"}),
+                     content_type='application/json')
+        self.assertEqual(self.tile_urls(2), before)
+
+    def test_garbage_collection_keeps_referenced_tiles(self):
+        grave_id = self.add_grave("Jan Kowalski", "2", "3")
+        before = self.tile_urls(2)
+        self.app.put(f'/api/admin/graves/{grave_id}', data=json.dumps({"plot": "4"}),
+                     content_type='application/json')
+        after = self.tile_urls(2)
+
+        # Only the replaced tile is unreferenced; nothing is collected inside the grace period
+        self.assertEqual(grave_tile_cache.collect_garbage(), 0)
+        old = time.time() - 2 * grave_tile_cache.GC_GRACE
+        for folder, _, files in os.walk(self.tile_dir):
+            for name in files:
+                os.utime(os.path.join(folder, name), (old, old))
+        self.assertEqual(grave_tile_cache.collect_garbage(), 1)
+        self.assertEqual(self.app.get(before[(0, 0)]).status_code, 404)
+        response = self.app.get(after[(0, 0)])
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+        # A manifest entry whose file is gone (collected by a peer) is rendered again
+        os.remove(grave_tile_cache.path(after[(0, 0)].rsplit('/', 1)[1][:-4]))
+        self.assertEqual(self.tile_urls(2), after)
+        response = self.app.get(after[(0, 0)])
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_render_racing_a_write_is_not_kept(self):
+        self.add_grave("Jan Kowalski", "2", "3")
+        read_graves = grave_tile_cache.section_graves
+
+        def read_then_write(section):
+            graves = read_graves(section)
+            grave_tile_cache.sections_changed(["A"])
+            return graves
+
+        grave_tile_cache.section_graves = read_then_write
+        try:
+            self.assertEqual(len(self.tile_urls(0)), 1)
+        finally:
+            del grave_tile_cache.section_graves
+        self.assertEqual(grave_tile_cache.manifest.get("a", {}), {})
+
+    def test_section_resize_invalidates_section(self):
+        self.tile_urls(0)
+        self.app.put(f'/api/admin/sections/{self.section_id}', data=json.dumps({"cols": 80}),
+                     content_type='application/json')
+        self.assertEqual(len(self.tile_urls(0)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,18 @@
 import unittest
 import sys
 import os
+import json
 from datetime import datetime
 
 # Add project root to path to allow importing python.api.app
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from python.api.app import app, db, User, Grave, ServiceRequest
+from python.api.app import app, db, User, Grave, ServiceRequest, fold_text, parse_grave_date, graves_at
+from sqlalchemy import text
 
 class TestModels(unittest.TestCase):
     def setUp(self):
         app.config['TESTING'] = True
-        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
         self.app = app.test_client()
         with app.app_context():
             db.create_all()
@@ -42,6 +43,48 @@ class TestModels(unittest.TestCase):
         self.assertEqual(data['name'], "Jan Kowalski")
         self.assertEqual(data['coordinates'], "10,20")
 
+    def test_grave_search_name_folding(self):
+        self.assertEqual(fold_text("  Łukasz  ŻÓŁTOWSKI "), "lukasz zoltowski")
+        g = Grave(name="Anna Wiśniewska")
+        self.assertEqual(g.search_name, "anna wisniewska")
+        g.name = "Jan Dąbrowski"
+        self.assertEqual(g.search_name, "jan dabrowski")
+
+    def test_grave_section_matches_any_case(self):
+        with app.app_context():
+            db.session.add_all([Grave(name="Jan", section=" Aa ", row="1", plot="2"),
+                                Grave(name="Anna", section="aA", row="1", plot="2"),
+                                Grave(name="Ewa", section="B", row="1", plot="2")])
+            db.session.commit()
+            self.assertEqual([g.name for g in graves_at("aa", "1", "2")], ["Jan", "Anna"])
+            plan = db.session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT id FROM grave WHERE search_section = 'aa' AND row = '1' AND plot = '2'"
+            )).all()
+            self.assertIn("ix_grave_location", " ".join(row[-1] for row in plan))
+
+            duplicates = json.loads(self.app.get('/api/admin/graves/duplicates').data)
+            self.assertEqual([(d['row'], d['plot'], d['count']) for d in duplicates], [("1", "2", 2)])
+
+    def test_grave_date_parsing(self):
+        self.assertEqual(parse_grave_date("1950-06-15"), (datetime(1950, 6, 15).date(), 1950))
+        self.assertEqual(parse_grave_date("15.06.1950"), (datetime(1950, 6, 15).date(), 1950))
+        self.assertEqual(parse_grave_date("1950"), (None, 1950))
+        self.assertEqual(parse_grave_date("ok. 1950"), (None, None))
+        g = Grave(name="Jan Kowalski", death_date="1980-01-01")
+        self.assertEqual(g.death_year, 1980)
+
+    def test_date_bounds_include_year_only_graves(self):
+        with app.app_context():
+            db.session.add_all([Grave(name="Full", death_date="1950-06-15"),
+                                Grave(name="Year", death_date="1950"),
+                                Grave(name="Earlier", death_date="1949")])
+            db.session.commit()
+        def names(query):
+            return sorted(g['name'] for g in json.loads(self.app.get(f'/api/graves?all=1&{query}').data))
+        self.assertEqual(names('died_from=1950-06-01&died_to=1950-06-30'), ["Full", "Year"])
+        self.assertEqual(names('died_from=1950-07-01'), ["Year"])
+        self.assertEqual(names('died_to=1949-12-31'), ["Earlier"])
+
     def test_service_request_status_normalization(self):
         req = ServiceRequest(
             grave_id=1,
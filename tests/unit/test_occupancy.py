@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import json
+import base64
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Section, Reservation, section_occupancy_index
+
+class TestSectionOccupancy(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            section = Section(name="T1", description="Sektor testowy", total_rows=2, total_cols=5)
+            db.session.add(section)
+            db.session.commit()
+            self.section_id = section.id
+
+    def tearDown(self):
+        section_occupancy_index.enabled = section_occupancy_index.ready = False
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_grave(self, row, plot, section="T1"):
+        payload = {"name": "Jan Kowalski", "section": section, "row": row, "plot": plot}
+        response = self.app.post('/api/graves', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return json.loads(response.data)['id']
+
+    def get(self, path):
+        response = self.app.get(f'/api/sections/{self.section_id}/{path}')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)
+
+    def free_plots(self, query=""):
+        return [(p['row'], p['plot']) for p in self.get(f'free-plots?{query}')['items']]
+
+    def test_bitmap(self):
+        self.add_grave("1", "2")
+        self.add_grave("2", "5", section="t1")
+        self.add_grave("9", "9")
+        data = self.get('occupancy')
+        self.assertEqual((data['rows'], data['cols']), (2, 5))
+        self.assertEqual((data['occupied'], data['free'], data['outsideGrid']), (2, 8, 1))
+        # bits 1 and 9
+        self.assertEqual(base64.b64decode(data['bitmap']), bytes([0b10, 0b10]))
+
+    def test_free_plots_follow_writes(self):
+        first = self.add_grave("1", "1")
+        self.add_grave("1", "1")
+        self.assertEqual(self.free_plots('row=1'), [("1", "2"), ("1", "3"), ("1", "4"), ("1", "5")])
+
+        # Plot stays occupied while another grave remains on it
+        self.app.delete(f'/api/graves/{first}')
+        self.assertEqual(self.free_plots('row=1')[0], ("1", "2"))
+
+        grave_id = self.add_grave("2", "1")
+        self.app.put(f'/api/admin/graves/{grave_id}', data=json.dumps({"plot": "2"}),
+                     content_type='application/json')
+        self.assertEqual(self.free_plots('row=2')[:2], [("2", "1"), ("2", "3")])
+
+    def test_pagination(self):
+        page = self.get('free-plots?limit=4')
+        self.assertEqual(len(page['items']), 4)
+        page = self.get(f"free-plots?limit=4&cursor={page['next_cursor']}")
+        self.assertEqual(page['items'][0], {"row": "1", "plot": "5"})
+        page = self.get(f"free-plots?limit=4&cursor={page['next_cursor']}")
+        self.assertEqual(len(page['items']), 2)
+        self.assertIsNone(page['next_cursor'])
+
+    def test_resize_rebuilds_bitmap(self):
+        self.add_grave("3", "1")
+        self.assertEqual(self.get('occupancy')['outsideGrid'], 1)
+        self.app.put(f'/api/admin/sections/{self.section_id}', data=json.dumps({"rows": 3}),
+                     content_type='application/json')
+        data = self.get('occupancy')
+        self.assertEqual((data['rows'], data['occupied'], data['outsideGrid']), (3, 1, 0))
+        self.assertEqual(self.app.get(f'/api/sections/{self.section_id}/free-plots?row=4').status_code, 400)
+
+    def test_batch_resize_rebuilds_bitmap(self):
+        self.add_grave("3", "1")
+        self.assertEqual(self.get('occupancy')['outsideGrid'], 1)
+        response = self.app.post('/api/admin/batch', data=json.dumps({"operations": [
+            {"op": "update", "table": "sections", "id": self.section_id, "data": {"rows": 3}}
+        ]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = self.get('occupancy')
+        self.assertEqual((data['rows'], data['occupied'], data['outsideGrid']), (3, 1, 0))
+
+    def nearest(self, query):
+        response = self.app.get(f'/api/plots/nearest-free?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [(p['row'], p['plot']) for p in json.loads(response.data)['items']]
+
+    def test_nearest_free_plots(self):
+        parents = self.add_grave("1", "3")
+        self.add_grave("1", "4")
+        self.assertEqual(self.nearest(f'grave_id={parents}&k=3'), [("1", "2"), ("2", "3"), ("2", "2")])
+        self.assertEqual(self.nearest('section=T1&row=1&plot=4&k=2'), [("1", "5"), ("2", "4")])
+
+        # A double plot needs two adjacent free plots in the row
+        self.add_grave("2", "3")
+        data = json.loads(self.app.get('/api/plots/nearest-free?section=T1&row=1&plot=3&k=1&plot_type=Podwójny').data)
+        self.assertEqual(data['items'][0]['plots'], ["1", "2"])
+
+        self.assertEqual(self.app.get('/api/plots/nearest-free?section=T1&row=1&plot=1&plot_type=Grobowiec').status_code, 400)
+        self.assertEqual(self.app.get('/api/plots/nearest-free?section=Z&row=1&plot=1').status_code, 404)
+        self.assertEqual(self.app.get('/api/plots/nearest-free?section=T1&row=0&plot=1').status_code, 400)
+        self.assertEqual(self.app.get('/api/plots/nearest-free?section=T1&row=1&plot=-2').status_code, 400)
+
+        # React dialog and free-text admin values
+        for plot_type in ("companion", "Companion Plot (2 person)"):
+            data = json.loads(self.app.get(f'/api/plots/nearest-free?section=T1&row=1&plot=3&k=1&plot_type={plot_type}').data)
+            self.assertEqual(data['items'][0]['plots'], ["1", "2"])
+
+    def test_nearest_free_for_reservation(self):
+        with app.app_context():
+            reservation = Reservation(name="Anna Nowak", email="anna@example.com", phone="500100200",
+                                      section="T1", plot_type="Pojedynczy")
+            db.session.add(reservation)
+            db.session.commit()
+            reservation_id = reservation.id
+        self.add_grave("2", "5")
+        response = self.app.get(f'/api/admin/reservations/{reservation_id}/nearest-free?row=2&plot=5&k=1')
+        data = json.loads(response.data)
+        self.assertEqual((data['section'], data['plot_type']), ("T1", "Pojedynczy"))
+        self.assertEqual(data['items'][0]['row'], "1")
+
+        # An unmappable stored value falls back to one plot; an explicit one is rejected
+        with app.app_context():
+            db.session.get(Reservation, reservation_id).plot_type = "przy alejce"
+            db.session.commit()
+        response = self.app.get(f'/api/admin/reservations/{reservation_id}/nearest-free?row=2&plot=5&k=1')
+        self.assertEqual(json.loads(response.data)['items'][0]['plots'], ["5"])
+        response = self.app.get(f'/api/admin/reservations/{reservation_id}/nearest-free?row=2&plot=5&plot_type=przy+alejce')
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Grave, Section, project_query
+
+class TestFieldProjection(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            db.session.add(Grave(name="Jan Kowalski", birth_date="1900-01-01", death_date="1980-01-01",
+                                 section="A", row="1", plot="2", coord_x=10, coord_y=20))
+            db.session.add(Section(name="A", description="Sektor zabytkowy", total_rows=10, total_cols=10))
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_grave_fields(self):
+        response = self.app.get('/api/graves?all=1&fields=id,name,x,y')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data[0], {"id": data[0]["id"], "name": "Jan Kowalski", "x": 10, "y": 20})
+
+    def test_grave_fields_paginated(self):
+        response = self.app.get('/api/graves?fields=name,coordinates&sort=name&limit=1')
+        page = json.loads(response.data)
+        self.assertEqual(page['items'], [{"name": "Jan Kowalski", "coordinates": "10,20"}])
+
+    def test_only_needed_columns_selected(self):
+        with app.app_context():
+            sql = str(project_query(Grave.query, Grave, ["id", "x"]).statement)
+        self.assertIn("coord_x", sql)
+        self.assertNotIn("birth_date", sql)
+        self.assertNotIn("coord_y", sql)
+
+    def test_compact_profile_drops_aliases(self):
+        data = json.loads(self.app.get('/api/graves?all=1&profile=compact').data)
+        self.assertEqual(set(data[0]), set(Grave.COMPACT_FIELDS))
+        self.assertNotIn("lat", data[0])
+        self.assertNotIn("location", data[0])
+
+    def test_other_list_endpoints(self):
+        data = json.loads(self.app.get('/api/sections?fields=name,rows').data)
+        self.assertEqual(data, [{"name": "A", "rows": 10}])
+
+    def test_unknown_field_rejected(self):
+        response = self.app.get('/api/sections?fields=name,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", json.loads(response.data)["error"])
+
+if __name__ == '__main__':
+    unittest.main()
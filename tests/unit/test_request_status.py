@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import (app, db, Grave, ServiceRequest, backfill_request_status_codes,
+                            read_dashboard_counters)
+from sqlalchemy import text
+
+class TestRequestStatus(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            grave = Grave(name="Jan Kowalski")
+            db.session.add(grave)
+            db.session.commit()
+            self.grave_id = grave.id
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_request(self, status=None):
+        body = {"graveId": self.grave_id, "serviceType": "Znicze"}
+        if status:
+            body["status"] = status
+        self.assertEqual(self.app.post('/api/service-requests', data=json.dumps(body),
+                                       content_type='application/json').status_code, 201)
+        with app.app_context():
+            return db.session.query(db.func.max(ServiceRequest.id)).scalar()
+
+    def listed(self, query=""):
+        with self.app.get(f'/api/admin/service-requests{query}') as response:
+            return {r['id']: r['status'] for r in json.loads(response.data)}
+
+    def test_write_time_normalisation(self):
+        first = self.add_request("Oczekujące")
+        second = self.add_request()
+        third = self.add_request("wstrzymane")
+        self.app.put(f'/api/admin/service-requests/{second}', data=json.dumps({"status": "W trakcie"}),
+                     content_type='application/json')
+        self.app.patch(f'/api/admin/service-requests/{third}/status', data=json.dumps({"status": "zakonczone"}),
+                       content_type='application/json')
+        self.assertEqual(self.listed(), {first: "pending", second: "in_progress", third: "completed"})
+        with app.app_context():
+            self.assertEqual(db.session.get(ServiceRequest, second).status, "W trakcie")
+
+        unknown = self.add_request("wstrzymane")
+        self.assertEqual(self.listed('?status=wstrzymane'), {unknown: "wstrzymane"})
+        self.assertEqual(self.listed('?status=Nowe'), {first: "pending"})
+        self.assertEqual(self.listed('?status=in_progress&fields=id,status'), {second: "in_progress"})
+
+        response = self.app.post('/api/admin/batch', data=json.dumps({"operations": [
+            {"op": "update", "table": "service-requests", "id": first, "data": {"status": "Anulowane"}}
+        ]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.listed()[first], "cancelled")
+        with app.app_context():
+            self.assertEqual(read_dashboard_counters()["requests"], 0)
+
+    def test_backfill_and_index(self):
+        for status in ("Oczekujące", "new", "Zakończone", "Wstrzymane", "wstrzymane", None):
+            self.add_request(status)
+        with app.app_context():
+            db.session.execute(text("UPDATE service_request SET status = NULL, status_code = NULL "
+                                    "WHERE id = (SELECT MAX(id) FROM service_request)"))
+            db.session.execute(text("UPDATE service_request SET status_code = NULL"))
+            backfill_request_status_codes(db.session.connection(), batch_size=4)
+            codes = [r[0] for r in db.session.execute(text("SELECT status_code FROM service_request ORDER BY id"))]
+            # Unknown spellings keep their own case
+            self.assertEqual(codes, ["pending", "pending", "completed", "Wstrzymane", "wstrzymane", "pending"])
+
+            plan = db.session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM service_request WHERE status_code = 'pending'"
+            )).all()
+            self.assertIn("ix_service_request_status_code", " ".join(row[-1] for row in plan))
+            db.session.rollback()
+
+if __name__ == '__main__':
+    unittest.main()
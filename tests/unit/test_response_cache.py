@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, response_cache
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        self.limits = (response_cache.max_entries, response_cache.ttl)
+        response_cache.max_entries, response_cache.ttl = 512, 60
+        response_cache.clear()
+        response_cache.counters.clear()
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        response_cache.max_entries, response_cache.ttl = self.limits
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def cache_status(self, path):
+        response = self.app.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.headers['X-Cache']
+
+    def test_hit_and_write_invalidation(self):
+        self.assertEqual(self.cache_status('/api/faqs'), "MISS")
+        self.assertEqual(self.cache_status('/api/faqs'), "HIT")
+        self.assertEqual(self.cache_status('/api/graves?sort=id&name='), "MISS")
+        self.assertEqual(self.cache_status('/api/graves?name=&sort=id'), "HIT")
+
+        self.app.post('/api/admin/faqs', data=json.dumps({"question": "Godziny otwarcia?", "answer": "7-20"}),
+                      content_type='application/json')
+        response = self.app.get('/api/faqs')
+        self.assertEqual(response.headers['X-Cache'], "MISS")
+        self.assertEqual(len(json.loads(response.data)), 1)
+        # Unrelated entries survive the write
+        self.assertEqual(self.cache_status('/api/graves?sort=id'), "HIT")
+
+        self.app.post('/api/graves', data=json.dumps({"name": "Jan Kowalski"}), content_type='application/json')
+        self.assertEqual(self.cache_status('/api/graves?sort=id'), "MISS")
+
+        stats = json.loads(self.app.get('/api/admin/dev/response-cache').data)
+        self.assertEqual((stats['hits'], stats['invalidations']), (3, 2))
+
+        # An escaped "&" is part of the value, not a second parameter
+        self.assertEqual(self.cache_status('/api/graves?name=a&sort=name'), "MISS")
+        self.assertEqual(self.cache_status('/api/graves?name=a%26sort%3Dname'), "MISS")
+
+    def test_lru_eviction_and_ttl(self):
+        response_cache.max_entries = 2
+        self.cache_status('/api/faqs')
+        self.cache_status('/api/sections')
+        self.cache_status('/api/faqs')
+        self.cache_status('/api/categories')
+        self.assertEqual(self.cache_status('/api/faqs'), "HIT")
+        self.assertEqual(self.cache_status('/api/sections'), "MISS")
+        self.assertEqual(response_cache.stats()['evictions'], 2)
+
+        response_cache.ttl = 0
+        self.cache_status('/api/articles')
+        self.assertEqual(self.cache_status('/api/articles'), "MISS")
+        self.assertGreater(response_cache.stats()['expirations'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
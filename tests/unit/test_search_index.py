@@ -0,0 +1,147 @@
+import unittest
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import (app, db, Grave, grave_search_index, grave_fuzzy_index, grave_suggest_index,
+                            rebuild_grave_indexes, mark_grave_indexes_stale, bounded_levenshtein)
+
+class TestGraveSearchIndex(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+        self.was_enabled = grave_search_index.enabled
+        grave_search_index.enabled = True
+        with app.app_context():
+            rebuild_grave_indexes()
+
+    def tearDown(self):
+        grave_search_index.enabled = self.was_enabled
+        grave_search_index.ready = False
+        grave_fuzzy_index.enabled = grave_fuzzy_index.ready = False
+        grave_suggest_index.enabled = grave_suggest_index.ready = False
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_grave(self, **payload):
+        response = self.app.post('/api/graves', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return json.loads(response.data)['id']
+
+    def search(self, query):
+        response = self.app.get(f'/api/graves?all=1&{query}')
+        self.assertEqual(response.status_code, 200)
+        return [g['id'] for g in json.loads(response.data)]
+
+    def test_write_paths_update_index(self):
+        jan = self.add_grave(name="Jan Wiśniewski", section="A", deathDate="1950-01-02")
+        anna = self.add_grave(name="Anna Nowak", section="B", deathDate="1950-05-05")
+        self.assertEqual(grave_search_index.stats()['documents'], 2)
+
+        self.assertEqual(self.search("name=wisniew"), [jan])
+        self.assertEqual(self.search("year=1950"), [jan, anna])
+        self.assertEqual(self.search("section=b&year=1950"), [anna])
+        # Same key as section_filter: surrounding whitespace is ignored on both sides
+        padded = self.add_grave(name="Ewa Lis", section=" C ")
+        self.assertEqual(self.search("section=c%20"), [padded])
+
+        self.app.put(f'/api/admin/graves/{jan}', data=json.dumps({"name": "Jan Kowalski"}),
+                     content_type='application/json')
+        self.assertEqual(self.search("name=wisniew"), [])
+        self.assertEqual(self.search("name=kowal"), [jan])
+
+        self.app.delete(f'/api/graves/{anna}')
+        self.assertEqual(self.search("section=B"), [])
+
+    def test_pagination_matches_database_shape(self):
+        ids = [self.add_grave(name=f"Person {i}", section="A") for i in range(5)]
+        response = self.app.get('/api/graves?name=person&limit=3')
+        page = json.loads(response.data)
+        self.assertEqual([g['id'] for g in page['items']], ids[:3])
+        response = self.app.get(f"/api/graves?name=person&limit=3&cursor={page['next_cursor']}")
+        page = json.loads(response.data)
+        self.assertEqual([g['id'] for g in page['items']], ids[3:])
+        self.assertIsNone(page['next_cursor'])
+
+    def test_stale_indexes_rebuild_together(self):
+        jan = self.add_grave(name="Jan Kowalski")
+        with app.app_context():
+            grave_fuzzy_index.ensure_ready()
+            # A write this process can't replay (another worker's bulk statement)
+            db.session.execute(Grave.__table__.insert().values(name="Anna Kowalska", search_name="anna kowalska"))
+            db.session.commit()
+        mark_grave_indexes_stale()
+        self.assertFalse(grave_search_index.ready or grave_fuzzy_index.ready)
+        self.assertEqual(self.search("name=kowalsk"), [jan, jan + 1])
+        # One rebuild, from one snapshot, for every stale index
+        self.assertTrue(grave_search_index.ready and grave_fuzzy_index.ready)
+        self.assertEqual(grave_fuzzy_index.token_display.get("kowalska"), "Kowalska")
+
+    def test_stats_report_size_and_build_time(self):
+        self.add_grave(name="Jan Kowalski")
+        stats = json.loads(self.app.get('/api/admin/dev/search-index').data)
+        self.assertTrue(stats['ready'])
+        self.assertGreater(stats['memory_bytes'], 0)
+        self.assertIn('build_seconds', stats)
+
+    def test_fuzzy_suggestions(self):
+        kowalski = self.add_grave(name="Jan Kowalski")
+        self.add_grave(name="Anna Kowalska")
+        wozniak = self.add_grave(name="Ewa Woźniak")
+
+        data = json.loads(self.app.get('/api/graves/fuzzy?name=Kowalsky').data)
+        self.assertEqual(data['didYouMean'], "Kowalski")
+        self.assertEqual(data['graves'][0]['id'], kowalski)
+
+        # Index follows writes after the first (lazy) build
+        dabrowski = self.add_grave(name="Piotr Dąbrowski")
+        data = json.loads(self.app.get('/api/graves/fuzzy?name=piotr%20dabrowsky').data)
+        self.assertEqual(data['didYouMean'], "Piotr Dąbrowski")
+        self.assertEqual([g['id'] for g in data['graves']], [dabrowski])
+
+        data = json.loads(self.app.get('/api/graves/fuzzy?name=Wozniak').data)
+        self.assertEqual(data['graves'][0]['id'], wozniak)
+        self.assertEqual(data['graves'][0]['distance'], 0)
+
+        # A sound-alike keeps its edit distance and ranks after the exact spelling
+        kowalsky = self.add_grave(name="Adam Kowalsky")
+        data = json.loads(self.app.get('/api/graves/fuzzy?name=Kowalsky').data)
+        self.assertEqual([(g['id'], g['distance']) for g in data['graves'][:2]], [(kowalsky, 0), (kowalski, 1)])
+        self.assertEqual(data['suggestions'][0], {"query": "Kowalsky", "term": "Kowalsky", "distance": 0, "count": 1})
+
+        self.assertEqual(self.app.get('/api/graves/fuzzy').status_code, 400)
+
+    def test_prefix_suggestions(self):
+        self.add_grave(name="Jan Kowalski")
+        self.add_grave(name="Anna Kowalski")
+        self.add_grave(name="Piotr Kowalczyk")
+
+        data = json.loads(self.app.get('/api/graves/suggest?q=kow').data)
+        self.assertEqual(data['suggestions'], [
+            {"term": "Kowalski", "count": 2},
+            {"term": "Kowalczyk", "count": 1}
+        ])
+
+        zofia = self.add_grave(name="Zofia Kowalczyk")
+        data = json.loads(self.app.get('/api/graves/suggest?q=KOWALC').data)
+        self.assertEqual(data['suggestions'], [{"term": "Kowalczyk", "count": 2}])
+
+        data = json.loads(self.app.get('/api/graves/suggest?q=zofia%20k').data)
+        self.assertEqual(data['suggestions'], [{"term": "Zofia Kowalczyk", "count": 1}])
+
+        self.app.delete(f'/api/graves/{zofia}')
+        data = json.loads(self.app.get('/api/graves/suggest?q=zof').data)
+        self.assertEqual(data['suggestions'], [])
+
+    def test_bounded_levenshtein(self):
+        self.assertEqual(bounded_levenshtein("kowalsky", "kowalski", 2), 1)
+        self.assertEqual(bounded_levenshtein("nowak", "nowakowski", 2), 3)
+        self.assertEqual(bounded_levenshtein("abc", "abc", 0), 0)
+
+if __name__ == '__main__':
+    unittest.main()
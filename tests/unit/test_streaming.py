@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from python.api.app import app, db, Grave, Reservation, STREAM_BATCH_SIZE, grave_search_index, rebuild_grave_indexes
+
+class TestStreamingLists(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+        with app.app_context():
+            db.create_all()
+            graves = [Grave(name=f"Person {i}", section="A", row="1", plot=str(i))
+                      for i in range(STREAM_BATCH_SIZE * 2 + 7)]
+            db.session.bulk_save_objects(graves)
+            db.session.add(Reservation(name="Anna Nowak", email="anna@example.com", phone="500100200"))
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_graves_streamed_in_batches(self):
+        response = self.app.get('/api/graves?all=1&fields=id,name')
+        self.assertTrue(response.is_streamed)
+        self.assertNotIn('Content-Length', response.headers)
+        chunks = list(response.response)
+        # "[" + one chunk per batch + "]"
+        self.assertEqual(len(chunks), 5)
+        data = json.loads(b"".join(chunks))
+        self.assertEqual(len(data), STREAM_BATCH_SIZE * 2 + 7)
+        self.assertEqual(data[0], {"id": data[0]["id"], "name": "Person 0"})
+        response.close()
+
+    def test_index_results_streamed_in_batches(self):
+        was_enabled, grave_search_index.enabled = grave_search_index.enabled, True
+        try:
+            with app.app_context():
+                rebuild_grave_indexes([grave_search_index])
+            response = self.app.get('/api/graves?all=1&section=a&fields=id,name')
+            self.assertNotIn('Content-Length', response.headers)
+            chunks = list(response.response)
+            self.assertEqual(len(chunks), 5)
+            self.assertEqual(len(json.loads(b"".join(chunks))), STREAM_BATCH_SIZE * 2 + 7)
+            response.close()
+        finally:
+            grave_search_index.enabled = was_enabled
+            grave_search_index.ready = False
+
+    def test_admin_lists_keep_shape(self):
+        # Shorter than one batch: buffered, same body
+        response = self.app.get('/api/admin/reservations')
+        self.assertIn('Content-Length', response.headers)
+        data = json.loads(response.data)
+        self.assertEqual([r['name'] for r in data], ["Anna Nowak"])
+
+        self.assertEqual(json.loads(self.app.get('/api/admin/contact').data), [])
+        self.assertEqual(self.app.get('/api/admin/service-requests?fields=nope').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()